@@ -324,6 +324,14 @@ def cars_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Outputs dsm as a netCDF file embedding quality statistics.",
     )
+    compute_dsm_parser.add_argument(
+        "--output_layers",
+        nargs="+",
+        default=None,
+        choices=("dsm", "clr", "msk", "mean", "std", "n_pts", "pts_in_cell"),
+        help="Output layers to compute and write "
+        "(default: dsm, clr, msk and statistics if --output_stats is set).",
+    )
     compute_dsm_parser.add_argument(
         "--use_geoid_as_alt_ref",
         action="store_true",
@@ -691,6 +699,7 @@ def run_compute_dsm(args, dry_run=False):  # noqa: C901
             msk_no_data=args.msk_no_data,
             corr_config=corr_config,
             output_stats=args.output_stats,
+            output_layers=args.output_layers,
             mode=args.mode,
             nb_workers=args.nb_workers,
             walltime=args.walltime,
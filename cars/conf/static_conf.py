@@ -34,7 +34,7 @@ from numpy import dtype
 
 # CARS imports
 from cars.core import inputs
-from cars.steps import points_cloud
+from cars.steps import points_cloud, rasterization
 
 # TODO : Refacto Conf with unitary and independent steps
 # TODO : not use a global cfg variable ?
@@ -119,7 +119,21 @@ tiling_conf_schema = {
 # rasterization tags and schema
 rasterization_tag = "rasterization"
 grid_points_division_factor_tag = "grid_points_division_factor"
-rasterization_schema = {grid_points_division_factor_tag: Or(None, int)}
+neighbors_search_tag = "neighbors_search"
+nb_threads_tag = "nb_threads"
+accumulator_mode_tag = "accumulator_mode"
+reduced_precision_tag = "reduced_precision"
+neighbors_cache_dir_tag = "neighbors_cache_dir"
+decimation_voxel_size_tag = "decimation_voxel_size"
+rasterization_schema = {
+    grid_points_division_factor_tag: Or(None, int),
+    neighbors_search_tag: Or(*rasterization.NEIGHBORS_SEARCH_ENGINES),
+    nb_threads_tag: Or(None, int),
+    accumulator_mode_tag: bool,
+    reduced_precision_tag: bool,
+    neighbors_cache_dir_tag: Or(None, str),
+    decimation_voxel_size_tag: Or(None, int, float),
+}
 
 # cloud filtering tags and schema
 cloud_filtering_tag = "cloud_filtering"
@@ -130,6 +144,7 @@ small_cpnts_nb_points_threshold_tag = "nb_points_threshold"
 small_cpnts_clusters_dist_threshold_tag = "clusters_distance_threshold"
 small_cpnts_removed_elt_mask_tag = "removed_elt_mask"
 small_cpnts_mask_value_tag = "mask_value"
+small_cpnts_connectivity_tag = "connectivity"
 small_cpnts_schema = {
     small_cpnts_on_ground_margin_tag: int,
     small_cpnts_connection_dist_tag: float,
@@ -137,6 +152,9 @@ small_cpnts_schema = {
     small_cpnts_clusters_dist_threshold_tag: None,
     small_cpnts_removed_elt_mask_tag: bool,
     small_cpnts_mask_value_tag: int,
+    small_cpnts_connectivity_tag: Or(
+        *points_cloud.SMALL_COMPONENTS_CONNECTIVITIES
+    ),
 }
 stat_outliers_filter_tag = "statistical_outliers"
 stat_outliers_k_tag = "k"
@@ -149,15 +167,18 @@ stat_outliers_schema = {
     stat_outliers_removed_elt_mask_tag: bool,
     stat_outliers_mask_value_tag: int,
 }
+epipolar_filtering_halo_tag = "epipolar_filtering_halo"
 cloud_filtering_schema = {
     small_cpnts_filter_tag: Or(None, small_cpnts_schema),
     stat_outliers_filter_tag: Or(None, stat_outliers_schema),
+    epipolar_filtering_halo_tag: Or(None, int),
 }
 
 # output tags and schema
 output_tag = "output"
 color_image_encoding_tag = "color_image_encoding"
-output_schema = {color_image_encoding_tag: str}
+overviews_tag = "overviews"
+output_schema = {color_image_encoding_tag: str, overviews_tag: bool}
 
 # compute dsm params schema
 compute_dsm_params_schema = {
@@ -408,6 +429,22 @@ def get_statistical_outliers_filter_params() \
         *stat_filter_dict.values()
     )
     return stat_filter_params
+
+
+def get_epipolar_filtering_halo() -> int:
+    """
+    Get the halo (in epipolar pixels) of the epipolar tiles
+    filtered before the rasterization
+
+    :return: the epipolar filtering halo, or None if the clouds are
+        filtered in each terrain tile
+    """
+    if cfg is None:
+        load_cfg()
+
+    return cfg[compute_dsm_tag][cloud_filtering_tag][
+        epipolar_filtering_halo_tag
+    ]
 # fmt: on
 
 
@@ -427,6 +464,18 @@ def get_color_image_encoding() -> dtype:
     return dtype(color_image_encoding)
 
 
+def get_overviews() -> bool:
+    """
+    Get the activation of the output rasters internal overviews
+
+    :returns: True if the overviews are written
+    """
+    if cfg is None:
+        load_cfg()
+
+    return cfg[compute_dsm_tag][output_tag][overviews_tag]
+
+
 def get_geometry_plugin() -> str:
     """
     Get the geometry plugin to use
@@ -71,6 +71,10 @@ POINTS_CLOUD_CLR_KEY_ROOT = "clr"
 POINTS_CLOUD_COORD_EPI_GEOM_I = "coord_epi_geom_i"
 POINTS_CLOUD_COORD_EPI_GEOM_J = "coord_epi_geom_j"
 POINTS_CLOUD_IDX_IM_EPI = "idx_im_epi"
+POINTS_CLOUD_WEIGHT = "weight"
+
+# points cloud attributes (pandas Dataframe)
+POINTS_CLOUD_ORIGIN = "origin"
 
 # raster fields (xarray Dataset)
 RASTER_HGT = "hgt"
@@ -0,0 +1,525 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Geodesy module:
+contains compiled kernels converting points between the WGS84 geographic,
+ECEF and UTM referentials, the most common conversions of CARS
+(the other ones are done by the projection module transformers)
+"""
+
+# Standard imports
+import math
+from typing import Tuple, Union
+
+# Third party imports
+import numpy as np
+from numba import float64, int64, njit, prange
+from numba.types import UniTuple
+
+# CARS imports
+from cars.core import utils
+
+# WGS84 ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+WGS84_E = math.sqrt(WGS84_E2)
+
+# UTM projection
+UTM_K0 = 0.9996
+UTM_FALSE_EASTING = 500000.0
+UTM_SOUTH_FALSE_NORTHING = 10000000.0
+
+# referentials kinds handled by the kernels
+GEOGRAPHIC = 0
+ECEF = 1
+UTM = 2
+
+# EPSG codes of the WGS84 geographic (2D and 3D) and ECEF referentials
+GEOGRAPHIC_EPSG_CODES = (4326, 4979)
+ECEF_EPSG_CODE = 4978
+
+
+def get_krueger_coefficients() -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Compute the Krüger series coefficients of the WGS84 transverse Mercator
+    projection, to the sixth order of the third flattening (accuracy of a few
+    nanometers inside the UTM zones, see Karney, Transverse Mercator with an
+    accuracy of a few nanometers, 2011)
+
+    :return: the rectifying radius, the forward (alpha)
+        and inverse (beta) series coefficients
+    """
+    n = WGS84_F / (2 - WGS84_F)
+    n2 = n * n
+    n3 = n2 * n
+    n4 = n3 * n
+    n5 = n4 * n
+    n6 = n5 * n
+
+    radius = WGS84_A / (1 + n) * (1 + n2 / 4 + n4 / 64 + n6 / 256)
+    alpha = np.array(
+        [
+            n / 2
+            - 2 * n2 / 3
+            + 5 * n3 / 16
+            + 41 * n4 / 180
+            - 127 * n5 / 288
+            + 7891 * n6 / 37800,
+            13 * n2 / 48
+            - 3 * n3 / 5
+            + 557 * n4 / 1440
+            + 281 * n5 / 630
+            - 1983433 * n6 / 1935360,
+            61 * n3 / 240
+            - 103 * n4 / 140
+            + 15061 * n5 / 26880
+            + 167603 * n6 / 181440,
+            49561 * n4 / 161280 - 179 * n5 / 168 + 6601661 * n6 / 7257600,
+            34729 * n5 / 80640 - 3418889 * n6 / 1995840,
+            212378941 * n6 / 319334400,
+        ]
+    )
+    beta = np.array(
+        [
+            n / 2
+            - 2 * n2 / 3
+            + 37 * n3 / 96
+            - n4 / 360
+            - 81 * n5 / 512
+            + 96199 * n6 / 604800,
+            n2 / 48
+            + n3 / 15
+            - 437 * n4 / 1440
+            + 46 * n5 / 105
+            - 1118711 * n6 / 3870720,
+            17 * n3 / 480 - 37 * n4 / 840 - 209 * n5 / 4480 + 5569 * n6 / 90720,
+            4397 * n4 / 161280 - 11 * n5 / 504 - 830251 * n6 / 7257600,
+            4583 * n5 / 161280 - 108847 * n6 / 3991680,
+            20648693 * n6 / 638668800,
+        ]
+    )
+
+    return radius, alpha, beta
+
+
+UTM_RADIUS, UTM_ALPHA, UTM_BETA = get_krueger_coefficients()
+
+
+def get_referential(epsg: int) -> Union[None, Tuple[int, float, float]]:
+    """
+    Get the kind of a referential handled by the kernels, with its UTM
+    parameters
+
+    :param epsg: EPSG code of the referential
+    :return: the referential kind (GEOGRAPHIC, ECEF or UTM), the central
+        meridian (in degrees) and the false northing of the UTM zone
+        (0 otherwise), or None if the referential is not handled
+    """
+    epsg = int(epsg)
+    if epsg in GEOGRAPHIC_EPSG_CODES:
+        return GEOGRAPHIC, 0.0, 0.0
+    if epsg == ECEF_EPSG_CODE:
+        return ECEF, 0.0, 0.0
+    if 32601 <= epsg <= 32660 or 32701 <= epsg <= 32760:
+        zone = epsg % 100
+        false_northing = UTM_SOUTH_FALSE_NORTHING if epsg > 32700 else 0.0
+        return UTM, 6.0 * zone - 183.0, false_northing
+
+    return None
+
+
+def geodetic_conversion(
+    x_coords: np.ndarray,
+    y_coords: np.ndarray,
+    z_coords: np.ndarray,
+    epsg_in: int,
+    epsg_out: int,
+    nb_threads: int = None,
+) -> bool:
+    """
+    Convert points coordinates (in place) between the WGS84 geographic
+    (longitude, latitude, ellipsoidal height), ECEF and UTM referentials
+    with the compiled kernels
+
+    :param x_coords: x coordinates of the points (contiguous float64 array)
+    :param y_coords: y coordinates of the points (contiguous float64 array)
+    :param z_coords: z coordinates of the points (contiguous float64 array)
+    :param epsg_in: EPSG code of the input referential
+    :param epsg_out: EPSG code of the output referential
+    :param nb_threads: number of threads of the multi-threaded kernel
+        (-1 for all the numba threads, see utils.numba_threads).
+        If None or 1, the serial kernel is used
+    :return: True if the points are converted,
+        False if a referential is not handled by the kernels
+    """
+    referential_in = get_referential(epsg_in)
+    referential_out = get_referential(epsg_out)
+    if referential_in is None or referential_out is None:
+        return False
+
+    with utils.numba_threads(nb_threads) as parallel:
+        kernel = (
+            geodetic_conversion_parallel
+            if parallel
+            else geodetic_conversion_serial
+        )
+        kernel(
+            x_coords.reshape(-1),
+            y_coords.reshape(-1),
+            z_coords.reshape(-1),
+            *referential_in,
+            *referential_out,
+            UTM_ALPHA,
+            UTM_BETA,
+        )
+
+    return True
+
+
+@njit(
+    UniTuple(float64, 3)(float64, float64, float64),
+    nogil=True,
+    cache=True,
+)
+def geographic_to_ecef(lon, lat, alt):
+    """
+    Convert a point from WGS84 geographic coordinates to ECEF
+
+    :param lon: longitude (degrees)
+    :param lat: latitude (degrees)
+    :param alt: height above the ellipsoid (meters)
+    :return: the x, y, z ECEF coordinates (meters)
+    """
+    lon = math.radians(lon)
+    lat = math.radians(lat)
+    sin_lat = math.sin(lat)
+    cos_lat = math.cos(lat)
+    normal = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+
+    return (
+        (normal + alt) * cos_lat * math.cos(lon),
+        (normal + alt) * cos_lat * math.sin(lon),
+        (normal * (1 - WGS84_E2) + alt) * sin_lat,
+    )
+
+
+@njit(
+    UniTuple(float64, 3)(float64, float64, float64),
+    nogil=True,
+    cache=True,
+)
+def ecef_to_geographic(x_ecef, y_ecef, z_ecef):
+    """
+    Convert a point from ECEF to WGS84 geographic coordinates
+    (fixed point iterations on the latitude from Bowring's initial value,
+    converged to the double precision after a few iterations)
+
+    :param x_ecef: x ECEF coordinate (meters)
+    :param y_ecef: y ECEF coordinate (meters)
+    :param z_ecef: z ECEF coordinate (meters)
+    :return: the longitude, latitude (degrees) and height
+        above the ellipsoid (meters)
+    """
+    dist = math.hypot(x_ecef, y_ecef)
+    polar_radius = WGS84_A * (1 - WGS84_F)
+    second_e2 = WGS84_E2 / (1 - WGS84_E2)
+
+    # Bowring's initial value
+    theta = math.atan2(z_ecef * WGS84_A, dist * polar_radius)
+    lat = math.atan2(
+        z_ecef + second_e2 * polar_radius * math.sin(theta) ** 3,
+        dist - WGS84_E2 * WGS84_A * math.cos(theta) ** 3,
+    )
+    for _ in range(3):
+        sin_lat = math.sin(lat)
+        normal = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+        lat = math.atan2(z_ecef + WGS84_E2 * normal * sin_lat, dist)
+
+    sin_lat = math.sin(lat)
+    alt = (
+        dist * math.cos(lat)
+        + z_ecef * sin_lat
+        - WGS84_A * math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+    )
+
+    return (
+        math.degrees(math.atan2(y_ecef, x_ecef)),
+        math.degrees(lat),
+        alt,
+    )
+
+
+@njit(
+    UniTuple(float64, 2)(float64, float64, float64, float64, float64[:]),
+    nogil=True,
+    cache=True,
+)
+def geographic_to_utm(lon, lat, central_meridian, false_northing, alpha):
+    """
+    Project a point from WGS84 geographic coordinates to an UTM zone
+    (Krüger series)
+
+    :param lon: longitude (degrees)
+    :param lat: latitude (degrees)
+    :param central_meridian: central meridian of the zone (degrees)
+    :param false_northing: false northing of the zone (meters)
+    :param alpha: forward Krüger series coefficients
+    :return: the easting and northing (meters)
+    """
+    lon = math.radians(lon - central_meridian)
+    lat = math.radians(lat)
+
+    # conformal latitude
+    sin_lat = math.sin(lat)
+    tau = math.sinh(
+        math.atanh(sin_lat) - WGS84_E * math.atanh(WGS84_E * sin_lat)
+    )
+    xi_prime = math.atan2(tau, math.cos(lon))
+    eta_prime = math.asinh(math.sin(lon) / math.hypot(tau, math.cos(lon)))
+
+    xi = xi_prime
+    eta = eta_prime
+    for j in range(alpha.size):
+        order = 2.0 * (j + 1)
+        xi += (
+            alpha[j] * math.sin(order * xi_prime) * math.cosh(order * eta_prime)
+        )
+        eta += (
+            alpha[j] * math.cos(order * xi_prime) * math.sinh(order * eta_prime)
+        )
+
+    return (
+        UTM_FALSE_EASTING + UTM_K0 * UTM_RADIUS * eta,
+        false_northing + UTM_K0 * UTM_RADIUS * xi,
+    )
+
+
+@njit(
+    UniTuple(float64, 2)(float64, float64, float64, float64, float64[:]),
+    nogil=True,
+    cache=True,
+)
+def utm_to_geographic(
+    easting, northing, central_meridian, false_northing, beta
+):
+    """
+    Convert a point from an UTM zone to WGS84 geographic coordinates
+    (Krüger series, then Newton iterations from the conformal latitude)
+
+    :param easting: easting (meters)
+    :param northing: northing (meters)
+    :param central_meridian: central meridian of the zone (degrees)
+    :param false_northing: false northing of the zone (meters)
+    :param beta: inverse Krüger series coefficients
+    :return: the longitude and latitude (degrees)
+    """
+    xi = (northing - false_northing) / (UTM_K0 * UTM_RADIUS)
+    eta = (easting - UTM_FALSE_EASTING) / (UTM_K0 * UTM_RADIUS)
+
+    xi_prime = xi
+    eta_prime = eta
+    for j in range(beta.size):
+        order = 2.0 * (j + 1)
+        xi_prime -= beta[j] * math.sin(order * xi) * math.cosh(order * eta)
+        eta_prime -= beta[j] * math.cos(order * xi) * math.sinh(order * eta)
+
+    # tangent of the conformal latitude, then of the latitude
+    tau_prime = math.sin(xi_prime) / math.hypot(
+        math.sinh(eta_prime), math.cos(xi_prime)
+    )
+    tau = tau_prime
+    for _ in range(4):
+        sqrt_tau = math.sqrt(1 + tau * tau)
+        sigma = math.sinh(WGS84_E * math.atanh(WGS84_E * tau / sqrt_tau))
+        tau_i = tau * math.sqrt(1 + sigma * sigma) - sigma * sqrt_tau
+        tau += (
+            (tau_prime - tau_i)
+            / math.sqrt(1 + tau_i * tau_i)
+            * (1 + (1 - WGS84_E2) * tau * tau)
+            / ((1 - WGS84_E2) * sqrt_tau)
+        )
+
+    return (
+        central_meridian
+        + math.degrees(math.atan2(math.sinh(eta_prime), math.cos(xi_prime))),
+        math.degrees(math.atan(tau)),
+    )
+
+
+@njit(
+    UniTuple(float64, 3)(
+        float64,
+        float64,
+        float64,
+        int64,
+        float64,
+        float64,
+        int64,
+        float64,
+        float64,
+        float64[:],
+        float64[:],
+    ),
+    nogil=True,
+    cache=True,
+)
+def convert_point(
+    x_coord,
+    y_coord,
+    z_coord,
+    kind_in,
+    central_meridian_in,
+    false_northing_in,
+    kind_out,
+    central_meridian_out,
+    false_northing_out,
+    alpha,
+    beta,
+):
+    """
+    Convert a point between two referentials, through its WGS84 geographic
+    coordinates (see geodetic_conversion)
+
+    :return: the converted x, y, z coordinates
+    """
+    # to geographic coordinates
+    if kind_in == ECEF:
+        x_coord, y_coord, z_coord = ecef_to_geographic(
+            x_coord, y_coord, z_coord
+        )
+    elif kind_in == UTM:
+        x_coord, y_coord = utm_to_geographic(
+            x_coord, y_coord, central_meridian_in, false_northing_in, beta
+        )
+
+    # from geographic coordinates
+    if kind_out == ECEF:
+        x_coord, y_coord, z_coord = geographic_to_ecef(
+            x_coord, y_coord, z_coord
+        )
+    elif kind_out == UTM:
+        x_coord, y_coord = geographic_to_utm(
+            x_coord, y_coord, central_meridian_out, false_northing_out, alpha
+        )
+
+    return x_coord, y_coord, z_coord
+
+
+@njit(
+    (
+        float64[:],
+        float64[:],
+        float64[:],
+        int64,
+        float64,
+        float64,
+        int64,
+        float64,
+        float64,
+        float64[:],
+        float64[:],
+    ),
+    nogil=True,
+    cache=True,
+)
+def geodetic_conversion_serial(
+    x_coords,
+    y_coords,
+    z_coords,
+    kind_in,
+    central_meridian_in,
+    false_northing_in,
+    kind_out,
+    central_meridian_out,
+    false_northing_out,
+    alpha,
+    beta,
+):
+    """
+    Convert points between two referentials in place (serial kernel,
+    see geodetic_conversion)
+    """
+    for idx in range(x_coords.size):
+        x_coords[idx], y_coords[idx], z_coords[idx] = convert_point(
+            x_coords[idx],
+            y_coords[idx],
+            z_coords[idx],
+            kind_in,
+            central_meridian_in,
+            false_northing_in,
+            kind_out,
+            central_meridian_out,
+            false_northing_out,
+            alpha,
+            beta,
+        )
+
+
+@njit(
+    (
+        float64[:],
+        float64[:],
+        float64[:],
+        int64,
+        float64,
+        float64,
+        int64,
+        float64,
+        float64,
+        float64[:],
+        float64[:],
+    ),
+    nogil=True,
+    parallel=True,
+    cache=True,
+)
+def geodetic_conversion_parallel(
+    x_coords,
+    y_coords,
+    z_coords,
+    kind_in,
+    central_meridian_in,
+    false_northing_in,
+    kind_out,
+    central_meridian_out,
+    false_northing_out,
+    alpha,
+    beta,
+):
+    """
+    Convert points between two referentials in place (multi-threaded kernel,
+    see geodetic_conversion)
+    """
+    for idx in prange(x_coords.size):  # pylint: disable=not-an-iterable
+        x_coords[idx], y_coords[idx], z_coords[idx] = convert_point(
+            x_coords[idx],
+            y_coords[idx],
+            z_coords[idx],
+            kind_in,
+            central_meridian_in,
+            false_northing_in,
+            kind_out,
+            central_meridian_out,
+            false_northing_out,
+            alpha,
+            beta,
+        )
@@ -144,3 +144,37 @@ class AbstractGeometry(metaclass=ABCMeta):
             (x-axis size is given with the index 0, y-axis size with index 1)
             - the disparity to altitude ratio as a float
         """
+
+    @staticmethod
+    @abstractmethod
+    def direct_loc(
+        img: str,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray,
+        z_coords: Union[None, float, np.ndarray] = None,
+        dem: Union[None, str] = None,
+        geoid: Union[None, str] = None,
+        default_elevation: Union[None, float] = None,
+    ) -> np.ndarray:
+        """
+        Localizes sensor positions of an image on the ground, in one call
+
+        The altitude of the points is given by z_coords if defined, else by
+        the dem, else by the geoid, else by the default elevation.
+
+        :param img: path to the image
+        :param x_coords: x coordinates of the points in the image sensor
+        :param y_coords: y coordinates of the points in the image sensor
+        :param z_coords: altitudes of the points (scalar or array)
+        :param dem: path to the dem folder
+        :param geoid: path to the geoid file
+        :param default_elevation: default altitude of the points
+        :return: the latitude, longitude and altitude of the points
+            as a numpy array of shape (nb_points, 3)
+        """
+
+
+# The OTB geometry plugin is registered with the geometry package, so that
+# the plugins can be instantiated by name as soon as the package is loaded
+# pylint: disable=wrong-import-position,cyclic-import
+from cars.core.geometry.otb_geometry import OTBGeometry  # noqa: E402,F401
@@ -40,8 +40,8 @@ class OTBGeometry(AbstractGeometry):
     OTB geometry class
     """
 
-    # TODO: remove the hard-coded import in the steps/__init__.py if this class
-    # is removed from CARS
+    # TODO: remove the hard-coded import in the geometry/__init__.py if this
+    # class is removed from CARS
 
     @staticmethod
     def triangulate(
@@ -218,3 +218,76 @@ class OTBGeometry(AbstractGeometry):
             [epipolar_size_x, epipolar_size_y],
             disp_to_alt_ratio,
         )
+
+    @staticmethod
+    def direct_loc(
+        img: str,
+        x_coords: np.ndarray,
+        y_coords: np.ndarray,
+        z_coords: Union[None, float, np.ndarray] = None,
+        dem: Union[None, str] = None,
+        geoid: Union[None, str] = None,
+        default_elevation: Union[None, float] = None,
+    ) -> np.ndarray:
+        """
+        Localizes sensor positions of an image on the ground, in one call
+
+        The altitude of the points is given by z_coords if defined, else by
+        the dem, else by the geoid, else by the default elevation.
+
+        A single ConvertSensorToGeoPointFast application is created and
+        executed for each point.
+
+        :param img: path to the image
+        :param x_coords: x coordinates of the points in the image sensor
+        :param y_coords: y coordinates of the points in the image sensor
+        :param z_coords: altitudes of the points (scalar or array)
+        :param dem: path to the dem folder
+        :param geoid: path to the geoid file
+        :param default_elevation: default altitude of the points
+        :return: the latitude, longitude and altitude of the points
+            as a numpy array of shape (nb_points, 3)
+        """
+        x_coords = np.atleast_1d(np.asarray(x_coords, dtype=np.float64))
+        y_coords = np.atleast_1d(np.asarray(y_coords, dtype=np.float64))
+        if z_coords is not None:
+            x_coords, y_coords, z_coords = np.broadcast_arrays(
+                x_coords, y_coords, np.asarray(z_coords, dtype=np.float64)
+            )
+        else:
+            x_coords, y_coords = np.broadcast_arrays(x_coords, y_coords)
+
+        s2c_app = otbApplication.Registry.CreateApplication(
+            "ConvertSensorToGeoPointFast"
+        )
+        s2c_app.SetParameterString("in", img)
+
+        if z_coords is None:
+            if dem is not None:
+                s2c_app.SetParameterString("elevation.dem", dem)
+            elif geoid is not None:
+                s2c_app.SetParameterString("elevation.geoid", geoid)
+            elif default_elevation is not None:
+                s2c_app.SetParameterFloat(
+                    "elevation.default", default_elevation
+                )
+            # else only the OTB configured geoid is used
+
+        llh = np.empty((x_coords.size, 3), dtype=np.float64)
+        for idx, (x_coord, y_coord) in enumerate(
+            zip(x_coords.flat, y_coords.flat)
+        ):
+            s2c_app.SetParameterFloat("input.idx", float(x_coord))
+            s2c_app.SetParameterFloat("input.idy", float(y_coord))
+            if z_coords is not None:
+                s2c_app.SetParameterFloat(
+                    "input.idz", float(z_coords.flat[idx])
+                )
+
+            s2c_app.Execute()
+
+            llh[idx, 0] = s2c_app.GetParameterFloat("output.idy")
+            llh[idx, 1] = s2c_app.GetParameterFloat("output.idx")
+            llh[idx, 2] = s2c_app.GetParameterFloat("output.idz")
+
+        return llh
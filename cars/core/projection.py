@@ -24,34 +24,207 @@ contains some general purpose functions using polygons and data projections
 """
 
 # Standard imports
+import hashlib
+import json
 import logging
 import math
 import os
+import tempfile
+from functools import lru_cache
 from typing import List, Tuple, Union
 
 # Third party imports
 import numpy as np
-import osgeo
 import pandas
 import pyproj
 import rasterio as rio
 import xarray as xr
 from osgeo import osr
 from rasterio.features import shapes
-from shapely.geometry import Polygon, shape
+from shapely import wkb
+from shapely.geometry import Polygon, box, shape
 from shapely.ops import transform
 
 # CARS imports
 from cars.core import constants as cst
-from cars.core import inputs, outputs, utils
+from cars.core import geodesy, inputs, outputs, utils
+from cars.core.geometry import AbstractGeometry
 from cars.externals import otb_pipelines
 
+# DEM tiles footprints indexes, persisted in the user cache directory
+# (keyed by the DEM directory absolute path) and kept in memory
+DEM_INDEX_DIR = os.path.join("cars", "dem_index")
+DEM_INDEX_VERSION = 1
+_DEM_TILES_INDEXES = {}
+
+
+def read_dem_tile_footprint(tile_path: str) -> Union[None, dict]:
+    """
+    Read the footprint of a DEM tile: its epsg code, its bounds and its
+    valid data polygon (in the tile referential)
+
+    :param tile_path: path of the DEM tile
+    :return: dictionary with the "epsg", "bounds" (xmin, ymin, xmax, ymax)
+        and "valid" (hexadecimal WKB polygon) keys, or None if the tile
+        can not be read
+    """
+    if not inputs.rasterio_can_open(tile_path):
+        return None
+
+    with rio.open(tile_path) as data:
+        try:
+            file_epsg = data.crs.to_epsg()
+        except AttributeError as attribute_error:
+            logging.warning(
+                "Impossible to read the SRTM"
+                "tile epsg code: {}".format(attribute_error)
+            )
+            return None
+
+        bounds = [
+            min(data.bounds.left, data.bounds.right),
+            min(data.bounds.bottom, data.bounds.top),
+            max(data.bounds.left, data.bounds.right),
+            max(data.bounds.bottom, data.bounds.top),
+        ]
+
+        # retrieve and combine the valid polygons
+        valid_poly = None
+        for poly, val in shapes(data.dataset_mask(), transform=data.transform):
+            if val != 0:
+                poly = shape(poly).buffer(0)
+                if valid_poly is None:
+                    valid_poly = poly
+                else:
+                    valid_poly = poly.union(valid_poly)
+
+    return {
+        "epsg": file_epsg,
+        "bounds": bounds,
+        "valid": None if valid_poly is None else valid_poly.wkb_hex,
+    }
+
+
+def get_dem_index_path(srtm_dir: str) -> str:
+    """
+    Get the path of the persisted footprints index of a DEM directory:
+    a file of the user cache directory ($XDG_CACHE_HOME, ~/.cache by
+    default) named after the DEM directory absolute path, so that the DEM
+    input directory is never modified
+
+    :param srtm_dir: srtm directory
+    :return: path of the DEM index file
+    """
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    dem_key = hashlib.sha256(
+        os.path.realpath(srtm_dir).encode("utf-8")
+    ).hexdigest()
+    return os.path.join(cache_dir, DEM_INDEX_DIR, dem_key + ".json")
+
+
+def get_dem_tiles_index(srtm_dir: str) -> dict:
+    """
+    Get the footprints index of the DEM tiles of a directory.
+
+    The index is persisted outside of the DEM directory (see
+    get_dem_index_path) and kept in memory for the next calls, and only
+    the tiles added or modified (size or modification time) since it was
+    built are read again. If the index can not be persisted, the in-memory
+    copy is still used for the whole process.
+
+    :param srtm_dir: srtm directory
+    :return: the tiles footprints (see read_dem_tile_footprint) by file
+        name, with the "mtime" and "size" keys of the tiles files
+    """
+    dem_key = os.path.realpath(srtm_dir)
+    index_path = get_dem_index_path(srtm_dir)
+
+    tiles = _DEM_TILES_INDEXES.get(dem_key)
+    if tiles is None:
+        tiles = {}
+        if os.path.isfile(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as index_file:
+                    index = json.load(index_file)
+                if (
+                    index.get("version") == DEM_INDEX_VERSION
+                    and index.get("srtm_dir") == dem_key
+                ):
+                    tiles = index["tiles"]
+            except (OSError, ValueError, KeyError) as index_error:
+                logging.warning(
+                    "Impossible to read the DEM index {}: {}".format(
+                        index_path, index_error
+                    )
+                )
+
+    updated_tiles = {}
+    unsupported_formats = [".omd"]
+    for file in sorted(os.listdir(srtm_dir)):
+        file_path = os.path.join(srtm_dir, file)
+        _, ext = os.path.splitext(file)
+        if ext in unsupported_formats or not os.path.isfile(file_path):
+            continue
+
+        stat = os.stat(file_path)
+        tile = tiles.get(file)
+        if (
+            tile is None
+            or tile["mtime"] != stat.st_mtime_ns
+            or tile["size"] != stat.st_size
+        ):
+            tile = {"mtime": stat.st_mtime_ns, "size": stat.st_size}
+            footprint = read_dem_tile_footprint(file_path)
+            if footprint is not None:
+                tile.update(footprint)
+        updated_tiles[file] = tile
+
+    _DEM_TILES_INDEXES[dem_key] = updated_tiles
+
+    # the index is written in a temporary file first, so that concurrent
+    # runs on the same DEM directory do not read or write partial indexes
+    if updated_tiles != tiles:
+        tmp_file = None
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                dir=os.path.dirname(index_path),
+                suffix=".tmp",
+                delete=False,
+                encoding="utf-8",
+            ) as tmp_file:
+                json.dump(
+                    {
+                        "version": DEM_INDEX_VERSION,
+                        "srtm_dir": dem_key,
+                        "tiles": updated_tiles,
+                    },
+                    tmp_file,
+                )
+            os.replace(tmp_file.name, index_path)
+        except OSError as index_error:
+            if tmp_file is not None and os.path.exists(tmp_file.name):
+                os.remove(tmp_file.name)
+            logging.warning(
+                "Impossible to write the DEM index {}: {}".format(
+                    index_path, index_error
+                )
+            )
+
+    return updated_tiles
+
 
 def compute_dem_intersection_with_poly(srtm_dir, ref_poly, ref_epsg):
     """
     Compute the intersection polygon between the defined dem regions
     and the reference polygon in input
 
+    The dem regions are read from the DEM tiles footprints index
+    (see get_dem_tiles_index).
+
     :raise Exception: when the input dem doesn't intersect the reference polygon
 
     :param srtm_dir: srtm directory
@@ -64,79 +237,46 @@ def compute_dem_intersection_with_poly(srtm_dir, ref_poly, ref_epsg):
         and the reference polygon in input
     :rtype Polygon
     """
-    dem_poly = None
-    for _, _, srtm_files in os.walk(srtm_dir):
-        logging.info(
-            "Browsing all files of the srtm dir. "
-            "Some files might be unreadable by rasterio (non blocking matter)."
+    tiles = [
+        tile
+        for tile in get_dem_tiles_index(srtm_dir).values()
+        if tile.get("valid") is not None
+    ]
+
+    # select the tiles in the reference referential with their bounds
+    if len(tiles) > 0:
+        bounds = np.array([tile["bounds"] for tile in tiles])
+        same_epsg = np.array([tile["epsg"] == ref_epsg for tile in tiles])
+        xmin, ymin, xmax, ymax = ref_poly.bounds
+        candidates = ~same_epsg | (
+            (bounds[:, 0] <= xmax)
+            & (bounds[:, 2] >= xmin)
+            & (bounds[:, 1] <= ymax)
+            & (bounds[:, 3] >= ymin)
         )
-        for file in srtm_files:
-            unsupported_formats = [".omd"]
-            _, ext = os.path.splitext(file)
-            if ext not in unsupported_formats:
-                if inputs.rasterio_can_open(os.path.join(srtm_dir, file)):
-                    with rio.open(os.path.join(srtm_dir, file)) as data:
-
-                        xmin = min(data.bounds.left, data.bounds.right)
-                        ymin = min(data.bounds.bottom, data.bounds.top)
-                        xmax = max(data.bounds.left, data.bounds.right)
-                        ymax = max(data.bounds.bottom, data.bounds.top)
-
-                        try:
-                            file_epsg = data.crs.to_epsg()
-                            file_bb = Polygon(
-                                [
-                                    (xmin, ymin),
-                                    (xmin, ymax),
-                                    (xmax, ymax),
-                                    (xmax, ymin),
-                                    (xmin, ymin),
-                                ]
-                            )
-
-                            # transform polygon if needed
-                            if ref_epsg != file_epsg:
-                                file_bb = polygon_projection(
-                                    file_bb, file_epsg, ref_epsg
-                                )
-
-                            # if the srtm tile intersects the reference polygon
-                            if file_bb.intersects(ref_poly):
-                                local_dem_poly = None
-
-                                # retrieve valid polygons
-                                for poly, val in shapes(
-                                    data.dataset_mask(),
-                                    transform=data.transform,
-                                ):
-                                    if val != 0:
-                                        poly = shape(poly)
-                                        poly = poly.buffer(0)
-                                        if ref_epsg != file_epsg:
-                                            poly = polygon_projection(
-                                                poly, file_epsg, ref_epsg
-                                            )
-
-                                        # combine valid polygons
-                                        if local_dem_poly is None:
-                                            local_dem_poly = poly
-                                        else:
-                                            local_dem_poly = poly.union(
-                                                local_dem_poly
-                                            )
-
-                                # combine the tile valid polygon to the other
-                                # tiles' ones
-                                if dem_poly is None:
-                                    dem_poly = local_dem_poly
-                                else:
-                                    dem_poly = dem_poly.union(local_dem_poly)
-
-                        except AttributeError as attribute_error:
-                            logging.warning(
-                                "Impossible to read the SRTM"
-                                "tile epsg code: {}".format(attribute_error)
-                            )
+        tiles = [tile for tile, keep in zip(tiles, candidates) if keep]
+
+    dem_poly = None
+    for tile in tiles:
+        file_bb = box(*tile["bounds"])
+        local_dem_poly = wkb.loads(tile["valid"], hex=True)
+
+        # transform polygons if needed
+        if ref_epsg != tile["epsg"]:
+            file_bb = polygon_projection(file_bb, tile["epsg"], ref_epsg)
+
+        # if the srtm tile intersects the reference polygon
+        if file_bb.intersects(ref_poly):
+            if ref_epsg != tile["epsg"]:
+                local_dem_poly = polygon_projection(
+                    local_dem_poly, tile["epsg"], ref_epsg
+                )
+
+            # combine the tile valid polygon to the other tiles' ones
+            if dem_poly is None:
+                dem_poly = local_dem_poly
+            else:
+                dem_poly = dem_poly.union(local_dem_poly)
 
     # compute dem coverage polygon over the reference polygon
     if dem_poly is None or not dem_poly.intersects(ref_poly):
@@ -163,12 +303,8 @@ def polygon_projection(poly, from_epsg, to_epsg):
     :return: The polygon in the final projection
     :rtype: Polygon
     """
-    # Get CRS from input EPSG codes
-    from_crs = pyproj.CRS("EPSG:{}".format(from_epsg))
-    to_crs = pyproj.CRS("EPSG:{}".format(to_epsg))
-    # Project polygon between CRS (keep always_xy for compatibility)
-    project = pyproj.Transformer.from_crs(from_crs, to_crs, always_xy=True)
-    poly = transform(project.transform, poly)
+    # Project polygon between CRS
+    poly = transform(get_transformer(from_epsg, to_epsg).transform, poly)
 
     return poly
 
@@ -189,7 +325,7 @@ def geo_to_ecef(
     epsg_in = 4979  # EPSG code for Geocentric WGS84 in lat, lon, alt (degree)
     epsg_out = 4978  # EPSG code for ECEF WGS84 in x, y, z (meters)
 
-    return points_cloud_conversion([(lon, lat, alt)], epsg_in, epsg_out)[0]
+    return get_transformer(epsg_in, epsg_out).transform(lon, lat, alt)
 
 
 def ecef_to_enu(
@@ -317,11 +453,71 @@ def geo_to_aer(
     return enu_to_aer(x_east, y_north, z_up)
 
 
+@lru_cache(maxsize=None)
+def get_transformer(epsg_in: int, epsg_out: int) -> pyproj.Transformer:
+    """
+    Get the coordinates transformer from a SRS to another one,
+    with the traditional GIS axis order (longitude, latitude).
+    The transformers are built once per process and EPSG codes pair.
+
+    :param epsg_in: EPSG code of the input SRS
+    :param epsg_out: EPSG code of the ouptut SRS
+    :return: the transformer
+    """
+    return pyproj.Transformer.from_crs(
+        "EPSG:{}".format(int(epsg_in)),
+        "EPSG:{}".format(int(epsg_out)),
+        always_xy=True,
+    )
+
+
+def points_coordinates_conversion(
+    x_coords: np.ndarray,
+    y_coords: np.ndarray,
+    z_coords: np.ndarray,
+    epsg_in: int,
+    epsg_out: int,
+    nb_threads: int = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert points coordinates from a SRS to another one.
+    The conversion is done in place if the coordinates arrays are
+    contiguous float64 arrays, otherwise on copies of the arrays.
+
+    The conversions between the WGS84 geographic, ECEF and UTM referentials
+    are done by the compiled kernels of the geodesy module,
+    the other ones by the cached transformers (see get_transformer).
+
+    :param x_coords: x coordinates of the points (longitudes if geographic)
+    :param y_coords: y coordinates of the points (latitudes if geographic)
+    :param z_coords: z coordinates of the points
+    :param epsg_in: EPSG code of the input SRS
+    :param epsg_out: EPSG code of the ouptut SRS
+    :param nb_threads: number of threads of the geodesy kernels
+        (-1 for all the threads, if None or 1 the serial kernel is used)
+    :return: the converted x, y and z coordinates arrays
+    """
+    if (
+        geodesy.get_referential(epsg_in) is not None
+        and geodesy.get_referential(epsg_out) is not None
+    ):
+        coords = tuple(
+            np.require(coord, dtype=np.float64, requirements=["C", "W"])
+            for coord in (x_coords, y_coords, z_coords)
+        )
+        geodesy.geodetic_conversion(*coords, epsg_in, epsg_out, nb_threads)
+        return coords
+
+    return get_transformer(epsg_in, epsg_out).transform(
+        x_coords, y_coords, z_coords, inplace=True
+    )
+
+
 def points_cloud_conversion(cloud_in, epsg_in, epsg_out):
     """
     Convert a point cloud from a SRS to another one.
 
-    :param cloud_in: cloud to project
+    :param cloud_in: cloud to project (x, y, z on the last axis)
     :type cloud_in: numpy array
     :param epsg_in: EPSG code of the input SRS
     :type epsg_in: int
@@ -330,20 +526,14 @@ def points_cloud_conversion(cloud_in, epsg_in, epsg_out):
     :returns: Projected point cloud
     :rtype: numpy array
     """
-    srs_in = osr.SpatialReference()
-    srs_in.ImportFromEPSG(epsg_in)
-    srs_out = osr.SpatialReference()
-    srs_out.ImportFromEPSG(epsg_out)
-    # GDAL 3.0 Coordinate transformation (backwards compatibility)
-    # https://github.com/OSGeo/gdal/issues/1546
-    if int(osgeo.__version__[0]) >= 3:
-        srs_in.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
-        srs_out.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
-    conversion = osr.CoordinateTransformation(srs_in, srs_out)
-    cloud_in = conversion.TransformPoints(cloud_in)
-    cloud_in = np.array(cloud_in)
+    cloud_in = np.asarray(cloud_in, dtype=np.float64)
+    coords = points_coordinates_conversion(
+        *(np.array(cloud_in[..., idx]) for idx in range(3)),
+        epsg_in,
+        epsg_out,
+    )
 
-    return cloud_in
+    return np.stack(coords, axis=-1)
 
 
 def get_xyz_np_array_from_dataset(
@@ -383,58 +573,113 @@ def get_converted_xy_np_arrays_from_dataset(
     :param epsg_out: target epsg code
     :return: a tuple composed of the x and y numpy arrays
     """
-    xyz, xyz_shape = get_xyz_np_array_from_dataset(cloud_in)
-
-    xyz = points_cloud_conversion(xyz, int(cloud_in.attrs[cst.EPSG]), epsg_out)
-    xyz = xyz.reshape(xyz_shape)
-    proj_x = xyz[:, :, 0]
-    proj_y = xyz[:, :, 1]
+    proj_x, proj_y, _ = points_coordinates_conversion(
+        *(
+            np.array(cloud_in[label].values, dtype=np.float64)
+            for label in (cst.X, cst.Y, cst.Z)
+        ),
+        int(cloud_in.attrs[cst.EPSG]),
+        epsg_out,
+    )
 
     return proj_x, proj_y
 
 
-def points_cloud_conversion_dataset(cloud: xr.Dataset, epsg_out: int):
+def points_cloud_conversion_dataset(
+    cloud: xr.Dataset, epsg_out: int, nb_threads: int = None
+):
     """
     Convert a point cloud as an xarray.Dataset to another epsg (inplace)
     TODO: add test
 
     :param cloud: cloud to project
     :param epsg_out: EPSG code of the ouptut SRS
+    :param nb_threads: number of threads of the geodesy kernels
+        (see points_coordinates_conversion)
     """
 
     if cloud.attrs[cst.EPSG] != epsg_out:
 
-        xyz, xyz_shape = get_xyz_np_array_from_dataset(cloud)
-
-        xyz = points_cloud_conversion(xyz, int(cloud.attrs[cst.EPSG]), epsg_out)
-        xyz = xyz.reshape(xyz_shape)
-
         # Update cloud_in x, y and z values
-        cloud[cst.X].values = xyz[:, :, 0]
-        cloud[cst.Y].values = xyz[:, :, 1]
-        cloud[cst.Z].values = xyz[:, :, 2]
+        # (in place if they are contiguous float64 arrays)
+        (
+            cloud[cst.X].values,
+            cloud[cst.Y].values,
+            cloud[cst.Z].values,
+        ) = points_coordinates_conversion(
+            cloud[cst.X].values,
+            cloud[cst.Y].values,
+            cloud[cst.Z].values,
+            int(cloud.attrs[cst.EPSG]),
+            epsg_out,
+            nb_threads,
+        )
 
         # Update EPSG code
         cloud.attrs[cst.EPSG] = epsg_out
 
 
 def points_cloud_conversion_dataframe(
-    cloud: pandas.DataFrame, epsg_in: int, epsg_out: int
+    cloud: pandas.DataFrame, epsg_in: int, epsg_out: int, nb_threads: int = None
 ):
     """
     Convert a point cloud as a panda.DataFrame to another epsg (inplace)
 
+    If the cloud coordinates are offsets from an origin
+    (cst.POINTS_CLOUD_ORIGIN attribute of reduced precision clouds),
+    the absolute coordinates are converted and the origin is updated
+    to the first converted point.
+
     :param cloud: cloud to project
     :param epsg_in: EPSG code of the input SRS
     :param epsg_out: EPSG code of the ouptut SRS
+    :param nb_threads: number of threads of the geodesy kernels
+        (see points_coordinates_conversion)
+    """
+    labels = [cst.X, cst.Y, cst.Z]
+    origin = cloud.attrs.get(cst.POINTS_CLOUD_ORIGIN)
+
+    if len(cloud) != 0:
+        # contiguous float64 copies of the columns, converted in place
+        coords = [
+            cloud[label].to_numpy(dtype=np.float64, copy=True)
+            for label in labels
+        ]
+        if origin is not None:
+            for coord, coord_origin in zip(coords, origin):
+                coord += coord_origin
+
+        coords = points_coordinates_conversion(
+            *coords, epsg_in, epsg_out, nb_threads
+        )
+
+        if origin is not None:
+            cloud.attrs[cst.POINTS_CLOUD_ORIGIN] = tuple(
+                float(coord[0]) for coord in coords
+            )
+            for coord in coords:
+                coord -= coord[0]
+
+        for label, coord in zip(labels, coords):
+            cloud[label] = coord.astype(cloud[label].dtype, copy=False)
+
+
+def get_cloud_filtering_epsg(epsg: int) -> int:
+    """
+    Get the metric referential in which the points clouds are filtered:
+    the output referential if it is projected in meters (the points are then
+    projected only once, keeping their altitude as vertical axis),
+    ECEF (EPSG:4978) otherwise
+
+    :param epsg: EPSG code of the output DSM
+    :return: EPSG code of the filtering referential
     """
-    xyz_in = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
+    spatial_ref = osr.SpatialReference()
+    spatial_ref.ImportFromEPSG(epsg)
+    if spatial_ref.IsProjected() and spatial_ref.GetLinearUnits() == 1.0:
+        return epsg
 
-    if xyz_in.shape[0] != 0:
-        xyz_in = points_cloud_conversion(xyz_in, epsg_in, epsg_out)
-        cloud[cst.X] = xyz_in[:, 0]
-        cloud[cst.Y] = xyz_in[:, 1]
-        cloud[cst.Z] = xyz_in[:, 2]
+    return 4978
 
 
 def ground_polygon_from_envelopes(
@@ -577,6 +822,7 @@ def get_time_ground_direction(
     y_loc: float = None,
     y_offset: float = None,
     dem: str = None,
+    geometry_plugin: str = "OTBGeometry",
 ) -> np.ndarray:
     """
     For a given image, compute the direction of increasing acquisition
@@ -588,6 +834,7 @@ def get_time_ground_direction(
     :param y_loc: y location in image for estimation (default=1/4)
     :param y_offset: y location in image for estimation (default=1/2)
     :param dem: DEM for direct localisation function
+    :param geometry_plugin: name of the geometry plugin used to localize
     :return: normalized direction vector as a numpy array
     """
     # Define x: image center,
@@ -609,11 +856,14 @@ def get_time_ground_direction(
     assert y_offset > 0
     assert y_loc + y_offset <= img_size_y
 
-    # Get first coordinates of time direction vector
-    lat1, lon1, __ = otb_pipelines.sensor_to_geo(img, x_loc, y_loc, dem=dem)
-    # Get second coordinates of time direction vector
-    lat2, lon2, __ = otb_pipelines.sensor_to_geo(
-        img, x_loc, y_loc + y_offset, dem=dem
+    # Get both coordinates of time direction vector
+    geo_plugin = (
+        AbstractGeometry(  # pylint: disable=abstract-class-instantiated
+            geometry_plugin
+        )
+    )
+    (lat1, lon1, __), (lat2, lon2, __) = geo_plugin.direct_loc(
+        img, [x_loc, x_loc], [y_loc, y_loc + y_offset], dem=dem
     )
 
     # Create and normalize the time direction vector
@@ -629,11 +879,12 @@ def get_ground_direction(
     y_coord: float = None,
     z0_coord: float = None,
     z_coord: float = None,
+    geometry_plugin: str = "OTBGeometry",
 ) -> np.ndarray:
     """
     For a given image (x,y) point, compute the direction vector to ground
-    The function use otb_pipelines.sensor_to_geo and make a z variation to get
-    a ground direction vector.
+    The function localizes the point with the geometry plugin at two
+    altitudes (z variation) to get a ground direction vector.
     By default, (x,y) is put at image center and z0, z at RPC geometric model
     limits.
 
@@ -642,6 +893,7 @@ def get_ground_direction(
     :param y: Y Coordinate in input image sensor
     :param z0: Z altitude reference coordinate
     :param z: Z Altitude coordinate to take the image
+    :param geometry_plugin: name of the geometry plugin used to localize
     :return: (lat0,lon0,alt0, lat,lon,alt) origin and end vector coordinates
     """
     # Define x, y in image center if not defined
@@ -669,15 +921,17 @@ def get_ground_direction(
     assert z_coord <= max_alt
 
     # Get origin vector coordinate with z0 altitude
-    lat0, lon0, alt0 = otb_pipelines.sensor_to_geo(
-        img, x_coord, y_coord, z_coord=z0_coord
+    # and end vector coordinate with z altitude
+    geo_plugin = (
+        AbstractGeometry(  # pylint: disable=abstract-class-instantiated
+            geometry_plugin
+        )
     )
-    # Get end vector coordinate with z altitude
-    lat, lon, alt = otb_pipelines.sensor_to_geo(
-        img, x_coord, y_coord, z_coord=z_coord
+    llh = geo_plugin.direct_loc(
+        img, x_coord, y_coord, z_coords=[z0_coord, z_coord]
     )
 
-    return np.array([lat0, lon0, alt0, lat, lon, alt])
+    return llh.reshape(-1)
 
 
 def get_ground_angles(
@@ -691,6 +945,7 @@ def get_ground_angles(
     y2_coord: float = None,
     z2_0_coord: float = None,
     z2_coord: float = None,
+    geometry_plugin: str = "OTBGeometry",
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
     For a given image (x,y) point, compute the Azimuth angle,
@@ -724,13 +979,14 @@ def get_ground_angles(
         for ground direction vector
     :param z2_coord: Right image2 Z altitude end coordinate
         for ground direction vector
+    :param geometry_plugin: name of the geometry plugin used to localize
     :return: Left Azimuth, Left Elevation Angle,
             Right Azimuth, Right Elevation Angle, Convergence Angle
     """
 
     # Get image1 <-> satellite vector from image2 metadata geometric model
     lat1_0, lon1_0, alt1_0, lat1, lon1, alt1 = get_ground_direction(
-        img1, x1_coord, y1_coord, z1_0_coord, z1_coord
+        img1, x1_coord, y1_coord, z1_0_coord, z1_coord, geometry_plugin
     )
     # Get East North Up vector for left image1
     x1_e, y1_n, y1_u = enu1 = geo_to_enu(
@@ -741,7 +997,7 @@ def get_ground_angles(
 
     # Get image2 <-> satellite vector from image2 metadata geometric model
     lat2_0, lon2_0, alt2_0, lat2, lon2, alt2 = get_ground_direction(
-        img2, x2_coord, y2_coord, z2_0_coord, z2_coord
+        img2, x2_coord, y2_coord, z2_0_coord, z2_coord, geometry_plugin
     )
     # Get East North Up vector for right image2
     x2_e, y2_n, y2_u = enu2 = geo_to_enu(
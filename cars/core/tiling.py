@@ -539,6 +539,56 @@ def region_hash_string(region: Tuple):
     return "{}_{}_{}_{}".format(region[0], region[1], region[2], region[3])
 
 
+def get_tiles_positions(
+    largest_region: List, tile_size: int, regions_hash: List[str]
+) -> Tuple[np.ndarray, int, int]:
+    """
+    Index the tiles of list_tiles by their integer tile coordinates:
+    each tile of largest_region (and of its one tile margin) is looked up
+    once in regions_hash.
+
+    :param largest_region: the region split in tiles
+    :param tile_size: width of tiles (squared tiles)
+    :param regions_hash: hashes of the indexed regions
+        (see region_hash_string)
+    :returns: the positions in regions_hash of the tiles (-1 if the tile is
+        empty or not found) as an array indexed by [tile_idx_y, tile_idx_x]
+        shifted by the minimum tile indices, and these minimum x and y tile
+        indices
+    """
+    positions_by_hash = {}
+    for pos, region_hash in enumerate(regions_hash):
+        positions_by_hash.setdefault(region_hash, pos)
+
+    min_tile_idx_x = int(math.floor(largest_region[0] / tile_size)) - 1
+    max_tile_idx_x = int(math.ceil(largest_region[2] / tile_size)) + 1
+    min_tile_idx_y = int(math.floor(largest_region[1] / tile_size)) - 1
+    max_tile_idx_y = int(math.ceil(largest_region[3] / tile_size)) + 1
+
+    positions = np.full(
+        (max_tile_idx_y - min_tile_idx_y, max_tile_idx_x - min_tile_idx_x),
+        -1,
+        dtype=np.int64,
+    )
+    for tile_idx_x in range(min_tile_idx_x, max_tile_idx_x):
+        for tile_idx_y in range(min_tile_idx_y, max_tile_idx_y):
+            tile = crop(
+                [
+                    tile_idx_x * tile_size,
+                    tile_idx_y * tile_size,
+                    (tile_idx_x + 1) * tile_size,
+                    (tile_idx_y + 1) * tile_size,
+                ],
+                largest_region,
+            )
+            if not empty(tile):
+                positions[
+                    tile_idx_y - min_tile_idx_y, tile_idx_x - min_tile_idx_x
+                ] = positions_by_hash.get(region_hash_string(tile), -1)
+
+    return positions, min_tile_idx_x, min_tile_idx_y
+
+
 def get_corresponding_tiles(
     terrain_grid: np.ndarray, configurations_data: Dict
 ) -> Tuple[List, List, List]:
@@ -546,6 +596,11 @@ def get_corresponding_tiles(
     This function allows to get required points cloud for each
     terrain region.
 
+    The epipolar regions of all the terrain regions are computed at once,
+    and their tiles are looked up in the integer tiles coordinates index
+    of get_tiles_positions (same tiles as list_tiles with a one tile
+    margin).
+
     :param terrain_grid: terrain grid positions
     :param configurations_data: dictionnary containing informations about
     epipolar input tiles where keys are image pairs index and values are
@@ -556,10 +611,6 @@ def get_corresponding_tiles(
     delayed_point_clouds and Terrain regions "rank" allowing to sorting tiles
     for dask processing
     """
-    terrain_regions = []
-    corresponding_tiles = []
-    rank = []
-
     number_of_terrain_splits = (terrain_grid.shape[0] - 1) * (
         terrain_grid.shape[1] - 1
     )
@@ -570,135 +621,109 @@ def get_corresponding_tiles(
         )
     )
 
-    # Loop on terrain regions and derive dependency to epipolar regions
-    for terrain_region_dix in tqdm(
-        range(number_of_terrain_splits),
-        total=number_of_terrain_splits,
-        desc="Delaunay look-up",
-    ):
-
-        j = int(terrain_region_dix / (terrain_grid.shape[1] - 1))
-        i = terrain_region_dix % (terrain_grid.shape[1] - 1)
+    # Terrain regions [xmin, ymin, xmax, ymax], in the terrain grid order
+    terrain_regions = np.concatenate(
+        (terrain_grid[:-1, :-1], terrain_grid[1:, 1:]), axis=2
+    ).reshape(-1, 4)
+    terrain_regions = [
+        list(terrain_region) for terrain_region in terrain_regions
+    ]
 
-        logging.debug(
-            "Processing tile located at {},{} in tile grid".format(i, j)
+    # Terrain regions x and y indices in the terrain grid
+    j_indices, i_indices = np.divmod(
+        np.arange(number_of_terrain_splits), terrain_grid.shape[1] - 1
+    )
+    rank = (i_indices * i_indices + j_indices * j_indices).tolist()
+
+    # For each stereo configuration, the tile indices ranges (as list_tiles)
+    # and the tiles positions of each terrain region
+    confs_tiles = []
+    for _, conf in configurations_data.items():
+        epipolar_points = np.stack(
+            [
+                conf["epipolar_points_min"][:-1, :-1],
+                conf["epipolar_points_min"][1:, :-1],
+                conf["epipolar_points_min"][1:, 1:],
+                conf["epipolar_points_min"][:-1, 1:],
+                conf["epipolar_points_max"][:-1, :-1],
+                conf["epipolar_points_max"][1:, :-1],
+                conf["epipolar_points_max"][1:, 1:],
+                conf["epipolar_points_max"][:-1, 1:],
+            ]
+        ).reshape(8, -1, 2)
+
+        # Bounding regions of corresponding cells,
+        # cropped to largest region (as crop, nan are cropped to the min)
+        largest_epipolar_region = conf["largest_epipolar_region"]
+        tile_size = conf["opt_epipolar_tile_size"]
+        region_min = np.array(largest_epipolar_region[:2], dtype=np.float64)
+        region_max = np.array(largest_epipolar_region[2:], dtype=np.float64)
+        tile_min = np.fmin(
+            region_max, np.fmax(region_min, np.min(epipolar_points, axis=0))
+        )
+        tile_max = np.fmin(
+            region_max, np.fmax(region_min, np.max(epipolar_points, axis=0))
         )
 
-        terrain_region = [
-            terrain_grid[j, i, 0],
-            terrain_grid[j, i, 1],
-            terrain_grid[j + 1, i + 1, 0],
-            terrain_grid[j + 1, i + 1, 1],
-        ]
+        # Check if the epipolar regions contain any pixels to process
+        not_empty = np.all(tile_min < tile_max, axis=1)
 
-        terrain_regions.append(terrain_region)
+        positions, min_tile_idx_x, min_tile_idx_y = get_tiles_positions(
+            largest_epipolar_region,
+            tile_size,
+            conf["epipolar_regions_hash"],
+        )
+        min_tile_idx = (
+            np.floor(tile_min / tile_size).astype(np.int64)
+            - 1
+            - [min_tile_idx_x, min_tile_idx_y]
+        )
+        max_tile_idx = (
+            np.ceil(tile_max / tile_size).astype(np.int64)
+            + 1
+            - [min_tile_idx_x, min_tile_idx_y]
+        )
 
-        logging.debug("Corresponding terrain region: {}".format(terrain_region))
+        confs_tiles.append(
+            (
+                conf["delayed_point_clouds"],
+                positions,
+                not_empty,
+                min_tile_idx,
+                max_tile_idx,
+            )
+        )
 
+    # Gather the required points clouds of each terrain region
+    corresponding_tiles = []
+    for terrain_region_dix in tqdm(
+        range(number_of_terrain_splits),
+        total=number_of_terrain_splits,
+        desc="Delaunay look-up",
+    ):
         # This list will hold the required points clouds for this terrain tile
         required_point_clouds = []
 
-        # For each stereo configuration
-        for _, conf in configurations_data.items():
-
-            epipolar_points_min = conf["epipolar_points_min"]
-            epipolar_points_max = conf["epipolar_points_max"]
-            largest_epipolar_region = conf["largest_epipolar_region"]
-            opt_epipolar_tile_size = conf["opt_epipolar_tile_size"]
-            epipolar_regions_hash = conf["epipolar_regions_hash"]
-            delayed_point_clouds = conf["delayed_point_clouds"]
-
-            tile_min = np.minimum(
-                np.minimum(
-                    np.minimum(
-                        epipolar_points_min[j, i], epipolar_points_min[j + 1, i]
-                    ),
-                    np.minimum(
-                        epipolar_points_min[j + 1, i + 1],
-                        epipolar_points_min[j, i + 1],
-                    ),
-                ),
-                np.minimum(
-                    np.minimum(
-                        epipolar_points_max[j, i], epipolar_points_max[j + 1, i]
-                    ),
-                    np.minimum(
-                        epipolar_points_max[j + 1, i + 1],
-                        epipolar_points_max[j, i + 1],
-                    ),
-                ),
-            )
-
-            tile_max = np.maximum(
-                np.maximum(
-                    np.maximum(
-                        epipolar_points_min[j, i], epipolar_points_min[j + 1, i]
-                    ),
-                    np.maximum(
-                        epipolar_points_min[j + 1, i + 1],
-                        epipolar_points_min[j, i + 1],
-                    ),
-                ),
-                np.maximum(
-                    np.maximum(
-                        epipolar_points_max[j, i], epipolar_points_max[j + 1, i]
-                    ),
-                    np.maximum(
-                        epipolar_points_max[j + 1, i + 1],
-                        epipolar_points_max[j, i + 1],
-                    ),
-                ),
-            )
-
-            # Bouding region of corresponding cell
-            epipolar_region_minx = tile_min[0]
-            epipolar_region_miny = tile_min[1]
-            epipolar_region_maxx = tile_max[0]
-            epipolar_region_maxy = tile_max[1]
-
-            # This mimics the previous code that was using
-            # terrain_region_to_epipolar
-            epipolar_region = [
-                epipolar_region_minx,
-                epipolar_region_miny,
-                epipolar_region_maxx,
-                epipolar_region_maxy,
-            ]
-
-            # Crop epipolar region to largest region
-            epipolar_region = crop(epipolar_region, largest_epipolar_region)
-
-            logging.debug(
-                "Corresponding epipolar region: {}".format(epipolar_region)
-            )
-
-            # Check if the epipolar region contains any pixels to process
-            if empty(epipolar_region):
-                logging.debug(
-                    "Skipping terrain region "
-                    "because corresponding epipolar region is empty"
-                )
-            else:
-                # Loop on all epipolar tiles covered by epipolar region
-                for epipolar_tile in list_tiles(
-                    epipolar_region,
-                    largest_epipolar_region,
-                    opt_epipolar_tile_size,
-                ):
-
-                    cur_hash = region_hash_string(epipolar_tile)
-
-                    # Look for corresponding hash in delayed point clouds
-                    # dictionnary
-                    if cur_hash in epipolar_regions_hash:
-
-                        # If hash can be found, append it to the required
-                        # clouds to compute for this terrain tile
-                        pos = epipolar_regions_hash.index(cur_hash)
+        for (
+            delayed_point_clouds,
+            positions,
+            not_empty,
+            min_tile_idx,
+            max_tile_idx,
+        ) in confs_tiles:
+            if not_empty[terrain_region_dix]:
+                min_idx_x, min_idx_y = min_tile_idx[terrain_region_dix]
+                max_idx_x, max_idx_y = max_tile_idx[terrain_region_dix]
+
+                # Loop on all epipolar tiles covered by epipolar region,
+                # in the list_tiles order (x then y)
+                for pos in positions[
+                    min_idx_y:max_idx_y, min_idx_x:max_idx_x
+                ].T.ravel():
+                    if pos >= 0:
                         required_point_clouds.append(delayed_point_clouds[pos])
 
         corresponding_tiles.append(required_point_clouds)
-        rank.append(i * i + j * j)
 
     return terrain_regions, corresponding_tiles, rank
 
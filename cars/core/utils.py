@@ -25,9 +25,11 @@ contains some cars global shared general purpose functions
 # Standard imports
 import errno
 import os
+from contextlib import contextmanager
 from typing import Tuple
 
 # Third party imports
+import numba
 import numpy as np
 import numpy.linalg as la
 import rasterio as rio
@@ -141,3 +143,29 @@ def angle_vectors(vector_1: np.ndarray, vector_2: np.ndarray) -> float:
     vec_dot = np.dot(vector_1, vector_2)
     vec_norm = la.norm(np.cross(vector_1, vector_2))
     return np.arctan2(vec_norm, vec_dot)
+
+
+@contextmanager
+def numba_threads(nb_threads: int = None):
+    """
+    Set the number of threads of the numba parallel kernels in the context.
+    The numba threads number is set per calling thread: it is restored at
+    exit so that the other tasks of a (dask) worker thread are not impacted.
+
+    :param nb_threads: number of threads, bounded by the numba threads
+        (-1 for all of them). If None or 1, the serial kernels are to be used
+    :return: as context value, True if the parallel kernels are to be used
+    """
+    if nb_threads is None or 0 <= nb_threads <= 1:
+        yield False
+        return
+
+    previous_nb_threads = numba.get_num_threads()
+    max_nb_threads = numba.config.NUMBA_NUM_THREADS
+    numba.set_num_threads(
+        max_nb_threads if nb_threads < 0 else min(nb_threads, max_nb_threads)
+    )
+    try:
+        yield True
+    finally:
+        numba.set_num_threads(previous_nb_threads)
@@ -131,6 +131,7 @@ def write_dsm_by_tile(
     color_dtype: np.dtype,
     output_stats: bool,
     write_msk: bool,
+    overviews_bounds: Tuple[float, float, float, float] = None,
     **kwargs
 ) -> str:
     """
@@ -144,6 +145,9 @@ def write_dsm_by_tile(
     :param color_dtype: type to use for the ortho-image
     :param output_stats: True if we save statistics with DSM tiles
     :param write_msk: boolean enabling the rasterized mask's writting
+    :param overviews_bounds: bounds of the output DSM if its overviews are
+        written: the decimated overviews blocks of the tile are then saved
+        next to its files
     :param kwargs: all the keyword arguments passed to rasterization_wrapper
     :return the region hash string
     """
@@ -207,6 +211,9 @@ def write_dsm_by_tile(
         write_msk=write_msk,
         msk_no_data=msk_nodata,
         prefix=hashed_region + "_",
+        output_layers=kwargs.get("output_layers"),
+        overviews=overviews_bounds is not None,
+        overviews_bounds=overviews_bounds,
     )
 
     return hashed_region
@@ -273,6 +280,7 @@ def run(  # noqa: C901
     cloud_small_components_filter: bool = True,
     cloud_statistical_outliers_filter: bool = True,
     epi_tile_size: int = None,
+    output_layers: List[str] = None,
 ):
     """
     Main function for the compute_dsm pipeline subcommand
@@ -317,6 +325,11 @@ def run(  # noqa: C901
                 Activating the points cloud statistical outliers filtering.
                 The filter's parameters are set in static configuration json.
     :param epi_tile_size: Force the size of epipolar tiles (None by default)
+    :param output_layers: Output layers to compute and write, among
+                rasterization.OUTPUT_LAYERS (the dsm layer is always written
+                and the msk layer only if an input mask is set).
+                If None, the dsm, clr and msk layers are written along with
+                the statistics layers if output_stats is activated.
     """
     out_dir = os.path.abspath(out_dir)
     # Ensure that outdir exists
@@ -389,6 +402,19 @@ def run(  # noqa: C901
             ]
         )
 
+    # output layers to compute and write
+    if output_layers is None:
+        output_layers = write_dsm.get_output_layers(
+            write_color=True, write_stats=output_stats, write_msk=True
+        )
+    for layer in output_layers:
+        if layer not in rasterization.OUTPUT_LAYERS:
+            raise NotImplementedError(
+                "{} output layer is not implemented".format(layer)
+            )
+    if rasterization.DSM_LAYER not in output_layers:
+        output_layers = [rasterization.DSM_LAYER] + list(output_layers)
+
     # set the timeout for each job in multiprocessing mode (in seconds)
     per_job_timeout = 600
 
@@ -478,7 +504,7 @@ def run(  # noqa: C901
         mask1 = configuration[in_params.INPUT_SECTION_TAG].get(
             in_params.MASK1_TAG, None
         )
-        if mask1 is not None:
+        if mask1 is not None and rasterization.MSK_LAYER in output_layers:
             write_msk = True
 
         # Get Preprocessing output config
@@ -760,6 +786,12 @@ def run(  # noqa: C901
         # Increment config index
         config_idx += 1
 
+    # the mask is only rasterized if an input mask is set
+    if not write_msk:
+        output_layers = [
+            layer for layer in output_layers if layer != rasterization.MSK_LAYER
+        ]
+
     xmin, ymin, xmax, ymax = tiling.union(
         [
             conf["terrain_bounding_box"]
@@ -866,11 +898,47 @@ def run(  # noqa: C901
             # Broadcast geoid data to all dask workers
             geoid_data_futures = client.scatter(geoid_data, broadcast=True)
 
+    # cloud filtering params
+    if cloud_small_components_filter:
+        small_cpn_filter_params = (
+            static_conf.get_small_components_filter_params()
+        )
+    else:
+        small_cpn_filter_params = None
+
+    if cloud_statistical_outliers_filter:
+        statistical_filter_params = (
+            static_conf.get_statistical_outliers_filter_params()
+        )
+    else:
+        statistical_filter_params = None
+
+    # number of threads of the points clouds conversions and filters
+    # of the epipolar tiles, shared with the rasterization
+    epipolar_nb_threads = getattr(
+        static_conf.get_rasterization_params(), static_conf.nb_threads_tag
+    )
+
+    # filter each epipolar tile once (with a halo) instead of each terrain
+    # tile (with the small components filter on ground margin)
+    epipolar_filtering_halo = static_conf.get_epipolar_filtering_halo()
+    if epipolar_filtering_halo is not None:
+        epipolar_filters_kwargs = {
+            "small_cpn_filter_params": small_cpn_filter_params,
+            "statistical_filter_params": statistical_filter_params,
+            "filtering_halo": epipolar_filtering_halo,
+        }
+        small_cpn_filter_params = None
+        statistical_filter_params = None
+    else:
+        epipolar_filters_kwargs = {}
+
     # Retrieve the epsg code which will be used
     # for the triangulation's output points clouds
-    # (ecef if filters are activated)
+    # (a metric referential if filters are activated: the output one
+    # if it is projected, so that the points are projected only once)
     if cloud_small_components_filter or cloud_statistical_outliers_filter:
-        stereo_out_epsg = 4978
+        stereo_out_epsg = projection.get_cloud_filtering_epsg(epsg)
     else:
         stereo_out_epsg = epsg
 
@@ -897,6 +965,8 @@ def run(  # noqa: C901
                         snap_to_img1=snap_to_img1,
                         align=align,
                         add_msk_info=write_msk,
+                        nb_threads=epipolar_nb_threads,
+                        **epipolar_filters_kwargs,
                     )
                 )
 
@@ -950,6 +1020,8 @@ def run(  # noqa: C901
                             "add_msk_info": write_msk,
                             "snap_to_img1": snap_to_img1,
                             "align": align,
+                            "nb_threads": epipolar_nb_threads,
+                            **epipolar_filters_kwargs,
                         },
                         callback=update,
                     )
@@ -1036,26 +1108,27 @@ def run(  # noqa: C901
             terrain_region, resolution
         )
 
-        # cloud filtering params
-        if cloud_small_components_filter:
-            small_cpn_filter_params = (
-                static_conf.get_small_components_filter_params()
-            )
-        else:
-            small_cpn_filter_params = None
-
-        if cloud_statistical_outliers_filter:
-            statistical_filter_params = (
-                static_conf.get_statistical_outliers_filter_params()
-            )
-        else:
-            statistical_filter_params = None
-
         # rasterization grid division factor
         rasterization_params = static_conf.get_rasterization_params()
         grid_points_division_factor = getattr(
             rasterization_params, static_conf.grid_points_division_factor_tag
         )
+        neighbors_search = getattr(
+            rasterization_params, static_conf.neighbors_search_tag
+        )
+        nb_threads = getattr(rasterization_params, static_conf.nb_threads_tag)
+        accumulator_mode = getattr(
+            rasterization_params, static_conf.accumulator_mode_tag
+        )
+        reduced_precision = getattr(
+            rasterization_params, static_conf.reduced_precision_tag
+        )
+        neighbors_cache_dir = getattr(
+            rasterization_params, static_conf.neighbors_cache_dir_tag
+        )
+        decimation_voxel_size = getattr(
+            rasterization_params, static_conf.decimation_voxel_size_tag
+        )
 
         if len(required_point_clouds) > 0:
             logging.debug(
@@ -1083,6 +1156,13 @@ def run(  # noqa: C901
                     small_cpn_filter_params=small_cpn_filter_params,
                     statistical_filter_params=statistical_filter_params,
                     grid_points_division_factor=grid_points_division_factor,
+                    neighbors_search=neighbors_search,
+                    nb_threads=nb_threads,
+                    accumulator_mode=accumulator_mode,
+                    reduced_precision=reduced_precision,
+                    output_layers=output_layers,
+                    neighbors_cache_dir=neighbors_cache_dir,
+                    decimation_voxel_size=decimation_voxel_size,
                 )
 
                 # Keep track of delayed raster tiles
@@ -1112,7 +1192,19 @@ def run(  # noqa: C901
                     "small_cpn_filter_params": small_cpn_filter_params,
                     "statistical_filter_params": statistical_filter_params,
                     "grid_points_division_factor": grid_points_division_factor,
+                    "neighbors_search": neighbors_search,
+                    "nb_threads": nb_threads,
+                    "accumulator_mode": accumulator_mode,
+                    "reduced_precision": reduced_precision,
+                    "output_layers": output_layers,
+                    "neighbors_cache_dir": neighbors_cache_dir,
+                    "decimation_voxel_size": decimation_voxel_size,
                     "msk_no_data": msk_no_data,
+                    "overviews_bounds": (
+                        (xmin, ymin, xmax, ymax)
+                        if static_conf.get_overviews()
+                        else None
+                    ),
                 }
                 # Launch asynchronous job for write_dsm_by_tile()
                 delayed_dsm_tiles.append(
@@ -1200,6 +1292,8 @@ def run(  # noqa: C901
             write_stats=output_stats,
             write_msk=write_msk,
             msk_no_data=msk_no_data,
+            output_layers=output_layers,
+            overviews=static_conf.get_overviews(),
         )
 
         # stop cluster
@@ -1232,26 +1326,52 @@ def run(  # noqa: C901
             )
             vrt_file_descriptor = None
 
-        vrt_mosaic("*_dsm.tif", "dsm.vrt", vrt_options, out_dsm)
-        vrt_mosaic("*_clr.tif", "clr.vrt", vrt_options, out_clr)
-
-        if write_msk:
-            vrt_mosaic("*_msk.tif", "msk.vrt", vrt_options, out_msk)
-
-        if output_stats:
-            vrt_mosaic(
-                "*_dsm_mean.tif", "dsm_mean.vrt", vrt_options, out_dsm_mean
-            )
-            vrt_mosaic("*_dsm_std.tif", "dsm_std.vrt", vrt_options, out_dsm_std)
-            vrt_mosaic(
-                "*_dsm_n_pts.tif", "dsm_n_pts.vrt", vrt_options, out_dsm_n_pts
-            )
-            vrt_mosaic(
+        mosaics = [
+            (rasterization.DSM_LAYER, "*_dsm.tif", "dsm.vrt", out_dsm),
+            (rasterization.CLR_LAYER, "*_clr.tif", "clr.vrt", out_clr),
+            (rasterization.MSK_LAYER, "*_msk.tif", "msk.vrt", out_msk),
+            (
+                rasterization.MEAN_LAYER,
+                "*_dsm_mean.tif",
+                "dsm_mean.vrt",
+                out_dsm_mean,
+            ),
+            (
+                rasterization.STD_LAYER,
+                "*_dsm_std.tif",
+                "dsm_std.vrt",
+                out_dsm_std,
+            ),
+            (
+                rasterization.N_PTS_LAYER,
+                "*_dsm_n_pts.tif",
+                "dsm_n_pts.vrt",
+                out_dsm_n_pts,
+            ),
+            (
+                rasterization.PTS_IN_CELL_LAYER,
                 "*_pts_in_cell.tif",
                 "dsm_pts_in_cell.vrt",
-                vrt_options,
                 out_dsm_points_in_cell,
-            )
+            ),
+        ]
+        for layer, tiles_glob, vrt_name, output_file in mosaics:
+            if layer in output_layers:
+                vrt_mosaic(tiles_glob, vrt_name, vrt_options, output_file)
+                # the tiles are written to temporary files in this mode:
+                # the overviews are written from their decimated blocks
+                if static_conf.get_overviews():
+                    write_dsm.write_overviews_from_blocks(
+                        output_file,
+                        layer,
+                        glob(
+                            os.path.join(
+                                out_dir,
+                                "tmp",
+                                write_dsm.get_overviews_blocks_file(tiles_glob),
+                            )
+                        ),
+                    )
 
     # Fill output json file
     out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
@@ -1266,28 +1386,33 @@ def run(  # noqa: C901
     out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
         output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
     ][output_compute_dsm.COLOR_NO_DATA_TAG] = float(color_no_data)
-    out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
-        output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
-    ][output_compute_dsm.COLOR_TAG] = out_clr
 
-    if write_msk:
-        out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
-            output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
-        ][output_compute_dsm.MSK_TAG] = out_msk
-
-    if output_stats:
-        out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
-            output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
-        ][output_compute_dsm.DSM_MEAN_TAG] = out_dsm_mean
-        out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
-            output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
-        ][output_compute_dsm.DSM_STD_TAG] = out_dsm_std
-        out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
-            output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
-        ][output_compute_dsm.DSM_N_PTS_TAG] = out_dsm_n_pts
-        out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
-            output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
-        ][output_compute_dsm.DSM_POINTS_IN_CELL_TAG] = out_dsm_points_in_cell
+    # optional output layers
+    optional_outputs = [
+        (rasterization.CLR_LAYER, output_compute_dsm.COLOR_TAG, out_clr),
+        (rasterization.MSK_LAYER, output_compute_dsm.MSK_TAG, out_msk),
+        (
+            rasterization.MEAN_LAYER,
+            output_compute_dsm.DSM_MEAN_TAG,
+            out_dsm_mean,
+        ),
+        (rasterization.STD_LAYER, output_compute_dsm.DSM_STD_TAG, out_dsm_std),
+        (
+            rasterization.N_PTS_LAYER,
+            output_compute_dsm.DSM_N_PTS_TAG,
+            out_dsm_n_pts,
+        ),
+        (
+            rasterization.PTS_IN_CELL_LAYER,
+            output_compute_dsm.DSM_POINTS_IN_CELL_TAG,
+            out_dsm_points_in_cell,
+        ),
+    ]
+    for layer, output_tag, output_file in optional_outputs:
+        if layer in output_layers:
+            out_json[output_compute_dsm.COMPUTE_DSM_SECTION_TAG][
+                output_compute_dsm.COMPUTE_DSM_OUTPUT_SECTION_TAG
+            ][output_tag] = output_file
 
     # Write the output json
     out_json_path = os.path.join(out_dir, "content.json")
@@ -388,7 +388,9 @@ def run(  # noqa: C901
         right_az,
         right_elev_angle,
         convergence_angle,
-    ) = projection.get_ground_angles(img1, img2)
+    ) = projection.get_ground_angles(
+        img1, img2, geometry_plugin=static_conf.get_geometry_plugin()
+    )
 
     logging.info(
         "Left  satellite coverture: Azimuth angle : {:.1f}°, "
@@ -867,8 +869,13 @@ def run(  # noqa: C901
         )
 
         # First, we estimate direction of acquisition time for both images
-        vec1 = projection.get_time_ground_direction(img1, dem=srtm_dir)
-        vec2 = projection.get_time_ground_direction(img2, dem=srtm_dir)
+        geometry_plugin = static_conf.get_geometry_plugin()
+        vec1 = projection.get_time_ground_direction(
+            img1, dem=srtm_dir, geometry_plugin=geometry_plugin
+        )
+        vec2 = projection.get_time_ground_direction(
+            img2, dem=srtm_dir, geometry_plugin=geometry_plugin
+        )
         time_direction_vector = (vec1 + vec2) / 2
 
         def display_angle(vec):
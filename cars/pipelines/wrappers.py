@@ -40,7 +40,7 @@ from cars.conf import (
 )
 from cars.core import constants as cst
 from cars.core import projection, tiling
-from cars.steps import triangulation
+from cars.steps import points_cloud, triangulation
 from cars.steps.epi_rectif import resampling
 from cars.steps.matching import dense_matching, regularisation, sparse_matching
 
@@ -148,7 +148,7 @@ def matching_wrapper(
     return matches
 
 
-def images_pair_to_3d_points(
+def images_pair_to_3d_points(  # noqa: C901
     input_stereo_cfg,
     region,
     corr_cfg,
@@ -161,6 +161,10 @@ def images_pair_to_3d_points(
     snap_to_img1=False,
     align=False,
     add_msk_info=False,
+    small_cpn_filter_params=None,
+    statistical_filter_params=None,
+    filtering_halo=0,
+    nb_threads=None,
 ) -> Dict[str, Tuple[xr.Dataset, xr.Dataset]]:
     # Retrieve disp min and disp max if needed
     """
@@ -201,6 +205,20 @@ def images_pair_to_3d_points(
     :param align: bool
     :param add_msk_info: boolean enabling the addition of the masks'
                          information in the point clouds final dataset
+    :param small_cpn_filter_params: small components filter parameters,
+        to filter the points clouds of the region (None to disable)
+    :type small_cpn_filter_params: points_cloud.SmallComponentsFilterParams
+    :param statistical_filter_params: statistical outliers filter parameters,
+        to filter the points clouds of the region (None to disable)
+    :type statistical_filter_params: points_cloud.StatisticalFilterParams
+    :param filtering_halo: size in epipolar pixels of the halo added around
+        the region to filter its points clouds (the halo points are removed
+        from the returned clouds)
+    :type filtering_halo: int
+    :param nb_threads: number of threads used by the points clouds
+        conversion to out_epsg and by the statistical filter neighbors
+        queries (-1 for all the threads, None for a single thread)
+    :type nb_threads: int
     :returns: Dictionary of tuple. The tuple are constructed with the dataset
               containing the 3D points +
     A dataset containing color of left image, or None
@@ -242,6 +260,31 @@ def images_pair_to_3d_points(
             region, input_stereo_cfg, epsg, disp_min, disp_max
         )
 
+    # Add the filtering halo to the region, keeping the regions
+    # (in the left and right epipolar images) of the clouds without halo
+    filtering = (
+        small_cpn_filter_params is not None
+        or statistical_filter_params is not None
+    )
+    if filtering:
+        region = [int(x) for x in region]
+        epipolar_region = [
+            0,
+            0,
+            preprocessing_output_cfg[output_prepare.EPIPOLAR_SIZE_X_TAG],
+            preprocessing_output_cfg[output_prepare.EPIPOLAR_SIZE_Y_TAG],
+        ]
+        regions_without_halo = {
+            cst.STEREO_REF: tiling.crop(region, epipolar_region),
+            cst.STEREO_SEC: tiling.crop(
+                tiling.pad(region, margins["right_margin"].data),
+                epipolar_region,
+            ),
+        }
+        region = tiling.crop(
+            tiling.pad(region, [filtering_halo] * 4), epipolar_region
+        )
+
     # Rectify images
     left, right, color = resampling.epipolar_rectify_images(
         input_stereo_cfg, region, margins
@@ -324,6 +367,54 @@ def images_pair_to_3d_points(
 
     if out_epsg is not None:
         for _, point in points.items():
-            projection.points_cloud_conversion_dataset(point, out_epsg)
+            projection.points_cloud_conversion_dataset(
+                point, out_epsg, nb_threads
+            )
+
+    # Filter the clouds with their halo, then remove it
+    if filtering:
+        points_cloud.filter_epipolar_clouds(
+            list(points.values()),
+            small_cpn_filter_params,
+            statistical_filter_params,
+            nb_threads,
+        )
+        for key, point in points.items():
+            points[key] = crop_epipolar_dataset(
+                point, regions_without_halo[key], regions_without_halo
+            )
+        for key, clr in colors.items():
+            colors[key] = crop_epipolar_dataset(
+                clr, regions_without_halo[key], regions_without_halo
+            )
 
     return points, colors
+
+
+def crop_epipolar_dataset(
+    dataset: xr.Dataset, region: List[int], regions: Dict[str, List[int]]
+) -> xr.Dataset:
+    """
+    Crop an epipolar dataset (with the rows and columns of its pixels
+    in the epipolar image as coordinates) to a region, and update
+    its regions attributes accordingly
+
+    :param dataset: epipolar dataset to crop
+    :param region: region to keep as [xmin, ymin, xmax, ymax]
+    :param regions: regions of the left and right epipolar datasets
+        (cst.STEREO_REF and cst.STEREO_SEC keys)
+        to set as the cst.ROI and cst.ROI_WITH_MARGINS attributes
+    :return: the cropped dataset
+    """
+    cropped = dataset.sel(
+        {
+            cst.ROW: slice(region[1], region[3] - 1),
+            cst.COL: slice(region[0], region[2] - 1),
+        }
+    )
+    if cst.ROI in cropped.attrs:
+        cropped.attrs[cst.ROI] = np.array(regions[cst.STEREO_REF])
+    if cst.ROI_WITH_MARGINS in cropped.attrs:
+        cropped.attrs[cst.ROI_WITH_MARGINS] = np.array(regions[cst.STEREO_SEC])
+
+    return cropped
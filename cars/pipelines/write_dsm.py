@@ -31,7 +31,7 @@ contains all compute_dsm.py main pipeline writing functions
 import logging
 import os
 from contextlib import contextmanager
-from typing import Tuple
+from typing import Dict, List, Tuple
 
 # Third party imports
 import numpy as np
@@ -39,10 +39,34 @@ import rasterio as rio
 import xarray as xr
 from affine import Affine
 from dask.distributed import as_completed
+from osgeo import gdal
 from tqdm import tqdm
 
 # CARS imports
 from cars.core import constants as cst
+from cars.core import tiling
+from cars.steps import rasterization
+
+# minimum size of the coarsest overview level
+OVERVIEWS_MIN_SIZE = 256
+
+# layers whose overviews are averaged (the others are subsampled)
+AVERAGED_OVERVIEWS_LAYERS = [
+    rasterization.DSM_LAYER,
+    rasterization.CLR_LAYER,
+    rasterization.MEAN_LAYER,
+    rasterization.STD_LAYER,
+]
+
+# single band layers variables in the raster tiles
+LAYERS_VARIABLES = {
+    rasterization.DSM_LAYER: cst.RASTER_HGT,
+    rasterization.MEAN_LAYER: cst.RASTER_HGT_MEAN,
+    rasterization.STD_LAYER: cst.RASTER_HGT_STD_DEV,
+    rasterization.N_PTS_LAYER: cst.RASTER_NB_PTS,
+    rasterization.PTS_IN_CELL_LAYER: cst.RASTER_NB_PTS_IN_CELL,
+    rasterization.MSK_LAYER: cst.RASTER_MSK,
+}
 
 
 def compute_output_window(tile, full_bounds, resolution):
@@ -108,6 +132,496 @@ def rasterio_handles(names, files, params, nodata_values, nb_bands):
             handle.close()
 
 
+def get_output_layers(
+    write_color: bool = True, write_stats: bool = False, write_msk: bool = False
+) -> List[str]:
+    """
+    Get the output layers corresponding to the writing flags:
+    the DSM with the optional ortho-image, statistics and mask.
+
+    :param write_color: bolean enabling the ortho-image's writting
+    :param write_stats: bolean enabling the rasterization statistics' writting
+    :param write_msk: boolean enabling the rasterized mask's writting
+    :return: the output layers, among rasterization.OUTPUT_LAYERS
+    """
+    output_layers = [rasterization.DSM_LAYER]
+    if write_color:
+        output_layers.append(rasterization.CLR_LAYER)
+    if write_stats:
+        output_layers.extend(rasterization.STATS_LAYERS)
+    if write_msk:
+        output_layers.append(rasterization.MSK_LAYER)
+
+    return output_layers
+
+
+def get_layer_data(
+    raster_tile: xr.Dataset, layer: str, color_dtype: np.dtype
+) -> np.ndarray:
+    """
+    Get the data of an output layer in a raster tile
+
+    :param raster_tile: raster tile, as returned by the rasterization
+    :param layer: output layer, among rasterization.OUTPUT_LAYERS
+    :param color_dtype: type to use for the ortho-image
+    :return: the layer data of shape (nb_bands, nb_rows, nb_cols),
+        None if the layer is not in the tile
+    """
+    if layer == rasterization.CLR_LAYER:
+        return raster_tile[cst.RASTER_COLOR_IMG].values.astype(color_dtype)
+
+    if LAYERS_VARIABLES[layer] in raster_tile:
+        return raster_tile[LAYERS_VARIABLES[layer]].values[np.newaxis, :, :]
+
+    return None
+
+
+def get_overviews_factors(
+    x_size: int, y_size: int, min_size: int = OVERVIEWS_MIN_SIZE
+) -> List[int]:
+    """
+    Get the decimation factors of the overviews of a raster: powers of two
+    until the largest side of the overview falls under min_size.
+
+    :param x_size: raster x size
+    :param y_size: raster y size
+    :param min_size: minimum size of the largest side of the overviews
+    :return: the overviews decimation factors (empty if the raster is small)
+    """
+    factors = []
+    factor = 2
+    while max(x_size, y_size) // factor >= min_size:
+        factors.append(factor)
+        factor *= 2
+
+    return factors
+
+
+def sum_blocks(
+    array: np.ndarray, dtype: np.dtype, top: int = 0, left: int = 0
+) -> np.ndarray:
+    """
+    Sum the 2x2 pixels blocks of each band of an array. The array is padded
+    with zeros when it is not aligned on the blocks grid.
+
+    :param array: array of shape (nb_bands, nb_rows, nb_cols)
+    :param dtype: type of the summed array
+    :param top: number of rows of the first blocks row before the array
+    :param left: number of columns of the first blocks column before the array
+    :return: array of shape (nb_bands, ceil((top + nb_rows)/2),
+        ceil((left + nb_cols)/2))
+    """
+    nb_bands, nb_rows, nb_cols = array.shape
+    nb_rows += top
+    nb_cols += left
+    padded = np.zeros(
+        (nb_bands, nb_rows + nb_rows % 2, nb_cols + nb_cols % 2), dtype=dtype
+    )
+    padded[:, top:nb_rows, left:nb_cols] = array
+
+    return padded.reshape(
+        nb_bands, padded.shape[1] // 2, 2, padded.shape[2] // 2, 2
+    ).sum(axis=(2, 4))
+
+
+def decimate_tile(
+    data: np.ndarray,
+    x_0: int,
+    y_0: int,
+    nb_levels: int,
+    averaged: bool,
+    nodata: float,
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Decimate a tile of a raster on the overview levels grids (decimation
+    factors 2, 4, 8...). The overview pixels of the tile borders which are
+    not aligned on these grids are only partially covered by the tile.
+
+    :param data: tile data of shape (nb_bands, nb_rows, nb_cols)
+    :param x_0: column of the tile origin in the raster
+    :param y_0: row of the tile origin in the raster
+    :param nb_levels: number of overview levels
+    :param averaged: True to average the pixels, False to subsample them
+    :param nodata: no data value of the raster
+    :return: the decimated blocks of each level, as dictionaries with the
+        "row_0" and "col_0" block origin in the level, and either the
+        subsampled "values" or the "sums" and "counts" of the valid pixels
+        with the number of "received" pixels of each overview pixel
+    """
+    blocks = []
+
+    if not averaged:
+        # subsample the top left pixel of each overview pixel
+        for level in range(nb_levels):
+            factor = 2 ** (level + 1)
+            top, left = (-y_0) % factor, (-x_0) % factor
+            blocks.append(
+                {
+                    "row_0": (y_0 + top) // factor,
+                    "col_0": (x_0 + left) // factor,
+                    "values": data[:, top::factor, left::factor],
+                }
+            )
+        return blocks
+
+    valid = np.logical_and(data != nodata, ~np.isnan(data))
+    sums = np.where(valid, data, 0).astype(np.float64)
+    counts = valid.astype(np.uint32)
+    received = np.ones((1,) + data.shape[1:], dtype=np.uint32)
+    row_0, col_0 = y_0, x_0
+    for _ in range(nb_levels):
+        # each level sums the 2x2 blocks of the previous one
+        top, left = row_0 % 2, col_0 % 2
+        sums = sum_blocks(sums, np.float64, top, left)
+        counts = sum_blocks(counts, np.uint32, top, left)
+        received = sum_blocks(received, np.uint32, top, left)
+        row_0, col_0 = (row_0 - top) // 2, (col_0 - left) // 2
+        blocks.append(
+            {
+                "row_0": row_0,
+                "col_0": col_0,
+                "sums": sums,
+                "counts": counts,
+                "received": received,
+            }
+        )
+
+    return blocks
+
+
+class StreamedOverviews:
+    """
+    Overview levels of a raster computed while its tiles are written:
+    each tile gives the overview windows to write at once, and only the
+    overview pixels shared with the tiles not received yet are kept.
+    """
+
+    def __init__(
+        self,
+        x_size: int,
+        y_size: int,
+        nb_levels: int,
+        averaged: bool,
+        nodata: float,
+        dtype: np.dtype,
+    ):
+        """
+        :param x_size: raster x size
+        :param y_size: raster y size
+        :param nb_levels: number of overview levels
+        :param averaged: True to average the pixels, False to subsample them
+        :param nodata: no data value of the raster
+        :param dtype: type of the raster
+        """
+        self.x_size = x_size
+        self.y_size = y_size
+        self.nb_levels = nb_levels
+        self.averaged = averaged
+        self.nodata = nodata
+        self.dtype = np.dtype(dtype)
+        # partial overview pixels of each level, by (row, col), as
+        # [valid pixels sums, valid pixels counts, received pixels]
+        self.pending = [{} for _ in range(nb_levels)]
+
+    def add_tile(
+        self, data: np.ndarray, x_0: int, y_0: int
+    ) -> List[Tuple[int, int, int, np.ndarray]]:
+        """
+        Add a tile of the raster
+
+        :param data: tile data of shape (nb_bands, nb_rows, nb_cols)
+        :param x_0: column of the tile origin in the raster
+        :param y_0: row of the tile origin in the raster
+        :return: the overview windows to write (see add_blocks)
+        """
+        return self.add_blocks(
+            decimate_tile(
+                data[:, : self.y_size - y_0, : self.x_size - x_0],
+                x_0,
+                y_0,
+                self.nb_levels,
+                self.averaged,
+                self.nodata,
+            )
+        )
+
+    def add_blocks(
+        self, blocks: List[Dict[str, np.ndarray]]
+    ) -> List[Tuple[int, int, int, np.ndarray]]:
+        """
+        Add the decimated blocks of a tile of the raster
+
+        The pixels of the windows shared with other tiles hold the values
+        of the tiles received so far, and are written again by the next ones.
+
+        :param blocks: decimated blocks, as returned by decimate_tile()
+        :return: the overview windows to write, as (level, row_0, col_0,
+            values) with values of shape (nb_bands, nb_rows, nb_cols)
+        """
+        windows = []
+        for level, block in enumerate(blocks):
+            factor = 2 ** (level + 1)
+            row_0, col_0 = int(block["row_0"]), int(block["col_0"])
+
+            # crop the block to the overview extent
+            nb_rows = (self.y_size + factor - 1) // factor - row_0
+            nb_cols = (self.x_size + factor - 1) // factor - col_0
+            crop = np.s_[:, :nb_rows, :nb_cols]
+
+            if not self.averaged:
+                values = block["values"][crop]
+            else:
+                sums = block["sums"][crop].copy()
+                counts = block["counts"][crop].copy()
+                received = block["received"][0][crop[1:]]
+                self.merge_pending(level, row_0, col_0, sums, counts, received)
+
+                values = np.full(sums.shape, self.nodata, dtype=np.float64)
+                valid = counts > 0
+                values[valid] = sums[valid] / counts[valid]
+                if np.issubdtype(self.dtype, np.integer):
+                    values = np.round(values)
+
+            if values.size > 0:
+                windows.append((level, row_0, col_0, values.astype(self.dtype)))
+
+        return windows
+
+    def merge_pending(
+        self,
+        level: int,
+        row_0: int,
+        col_0: int,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        received: np.ndarray,
+    ):
+        """
+        Merge the partial overview pixels of a decimated block with the ones
+        of the tiles received before (sums and counts are updated in place).
+        The completed pixels are not kept.
+
+        :param level: overview level
+        :param row_0: row of the block origin in the level
+        :param col_0: column of the block origin in the level
+        :param sums: valid pixels sums of shape (nb_bands, nb_rows, nb_cols)
+        :param counts: valid pixels counts of the same shape
+        :param received: received pixels numbers of shape (nb_rows, nb_cols)
+        """
+        factor = 2 ** (level + 1)
+        nb_rows, nb_cols = received.shape
+
+        # number of raster pixels of the overview pixels
+        rows_sizes = np.minimum(
+            factor, self.y_size - (row_0 + np.arange(nb_rows)) * factor
+        )
+        cols_sizes = np.minimum(
+            factor, self.x_size - (col_0 + np.arange(nb_cols)) * factor
+        )
+        expected = np.outer(rows_sizes, cols_sizes)
+
+        pending = self.pending[level]
+        for row, col in zip(*np.nonzero(received < expected)):
+            key = (row_0 + row, col_0 + col)
+            pixel_sums = sums[:, row, col]
+            pixel_counts = counts[:, row, col]
+            pixel_received = received[row, col]
+            if key in pending:
+                pixel_sums += pending[key][0]
+                pixel_counts += pending[key][1]
+                pixel_received += pending[key][2]
+
+            if pixel_received < expected[row, col]:
+                pending[key] = [
+                    pixel_sums.copy(),
+                    pixel_counts.copy(),
+                    pixel_received,
+                ]
+            else:
+                pending.pop(key, None)
+
+
+def write_window(
+    dataset: gdal.Dataset,
+    data: np.ndarray,
+    x_0: int,
+    y_0: int,
+    level: int = None,
+):
+    """
+    Write a window of all the bands of a GDAL dataset, or of one of its
+    overview levels
+
+    :param dataset: GDAL dataset opened in update mode
+    :param data: window data of shape (nb_bands, nb_rows, nb_cols)
+    :param x_0: column of the window origin
+    :param y_0: row of the window origin
+    :param level: overview level, None for the full resolution
+    """
+    for band_idx in range(data.shape[0]):
+        band = dataset.GetRasterBand(band_idx + 1)
+        if level is not None:
+            band = band.GetOverview(level)
+        band.WriteArray(data[band_idx], x_0, y_0)
+
+
+def write_layer_tile(
+    handle,
+    data: np.ndarray,
+    window: rio.windows.Window,
+    overviews: StreamedOverviews = None,
+):
+    """
+    Write the data of a layer in a tile window, with its overview windows
+    if the overviews are streamed
+
+    :param handle: rasterio handle, or GDAL dataset (see gdal_handles())
+        if the overviews are streamed
+    :param data: tile data of shape (nb_bands, nb_rows, nb_cols)
+    :param window: tile window in the raster
+    :param overviews: streamed overviews of the layer, None to only write
+        the full resolution
+    """
+    if overviews is None:
+        handle.write(data, window=window)
+        return
+
+    x_0, y_0 = int(window.col_off), int(window.row_off)
+    write_window(handle, data, x_0, y_0)
+    for level, row_0, col_0, values in overviews.add_tile(data, x_0, y_0):
+        write_window(handle, values, col_0, row_0, level)
+
+
+@contextmanager
+def gdal_handles(
+    names, files, params, nodata_values, nb_bands, overviews_factors
+):
+    """
+    Open a context containing a series of GDAL update handles on new GeoTIFF
+    files with empty internal overviews, to be written with write_window().
+    The files are created as in rasterio_handles().
+
+    :param names: List of names to index the output dictionnary
+    :param files: List of path to files
+    :param params: List of rasterio parameters as dictionaries
+    :param nodata_values: List of nodata values
+    :param nb_bands: List of number of bands
+    :param overviews_factors: decimation factors of the overviews
+    :return: A dicionary of GDAL datasets, indexed by names
+    :rtype: Dict
+    """
+    with rasterio_handles(names, files, params, nodata_values, nb_bands):
+        pass
+
+    datasets = {}
+    for name_item, file_item in zip(names, files):
+        datasets[name_item] = gdal.Open(file_item, gdal.GA_Update)
+        # create the overviews without computing them
+        datasets[name_item].BuildOverviews("NONE", overviews_factors)
+    try:
+        yield datasets
+    finally:
+        for dataset in datasets.values():
+            dataset.FlushCache()
+        datasets.clear()
+
+
+def get_overviews_blocks_file(file_name: str) -> str:
+    """
+    Get the path of the decimated overviews blocks saved for a tile file
+
+    :param file_name: path (or glob pattern) of the GeoTIFF tile file
+    :return: path (or glob pattern) of the blocks file
+    """
+    return os.path.splitext(file_name)[0] + "_overviews.npz"
+
+
+def save_overviews_blocks(
+    file_name: str,
+    blocks: List[Dict[str, np.ndarray]],
+    nodata: float,
+    dtype: np.dtype,
+):
+    """
+    Save the decimated overviews blocks of a tile file, next to it
+
+    :param file_name: path of the GeoTIFF tile file
+    :param blocks: decimated blocks, as returned by decimate_tile()
+    :param nodata: no data value of the raster
+    :param dtype: type of the raster
+    """
+    arrays = {"nodata": nodata, "dtype": np.dtype(dtype).name}
+    for level, block in enumerate(blocks):
+        for key, value in block.items():
+            arrays["{}_{}".format(key, level)] = value
+
+    np.savez(get_overviews_blocks_file(file_name), **arrays)
+
+
+def load_overviews_blocks(
+    blocks_file: str,
+) -> Tuple[List[Dict[str, np.ndarray]], float, np.dtype]:
+    """
+    Load the decimated overviews blocks saved by save_overviews_blocks()
+
+    :param blocks_file: path of the blocks file
+    :return: the decimated blocks, the no data value and the type
+    """
+    blocks = []
+    with np.load(blocks_file) as arrays:
+        for key in sorted(arrays.files):
+            if key in ("nodata", "dtype"):
+                continue
+            name, level = key.rsplit("_", 1)
+            while len(blocks) <= int(level):
+                blocks.append({})
+            blocks[int(level)][name] = arrays[key]
+        nodata = arrays["nodata"].item()
+        dtype = np.dtype(str(arrays["dtype"]))
+
+    return blocks, nodata, dtype
+
+
+def write_overviews_from_blocks(
+    file_name: str, layer: str, blocks_files: List[str]
+):
+    """
+    Write the internal overviews of a GeoTIFF file mosaicked from tiles,
+    from the decimated blocks saved with these tiles (see the overviews_bounds
+    parameter of write_geotiff_dsm()), without reading the full raster
+
+    :param file_name: path to the GeoTIFF file
+    :param layer: output layer of the file, among rasterization.OUTPUT_LAYERS
+    :param blocks_files: paths of the blocks files of the tiles
+    """
+    dataset = gdal.Open(file_name, gdal.GA_Update)
+
+    overviews = None
+    for blocks_file in blocks_files:
+        blocks, nodata, dtype = load_overviews_blocks(blocks_file)
+        if not blocks:
+            continue
+
+        if overviews is None:
+            # create the overviews without computing them
+            dataset.BuildOverviews(
+                "NONE", [2 ** (level + 1) for level in range(len(blocks))]
+            )
+            overviews = StreamedOverviews(
+                dataset.RasterXSize,
+                dataset.RasterYSize,
+                len(blocks),
+                layer in AVERAGED_OVERVIEWS_LAYERS,
+                nodata,
+                dtype,
+            )
+
+        for level, row_0, col_0, values in overviews.add_blocks(blocks):
+            write_window(dataset, values, col_0, row_0, level)
+
+    dataset = None
+
+
 def write_geotiff_dsm(
     future_dsm,
     output_dir: str,
@@ -125,6 +639,9 @@ def write_geotiff_dsm(
     write_msk=False,
     msk_no_data: int = 65535,
     prefix: str = "",
+    output_layers: List[str] = None,
+    overviews: bool = False,
+    overviews_bounds: Tuple[float, float, float, float] = None,
 ):
     """
     Writes result tiles to GTiff file(s).
@@ -146,8 +663,19 @@ def write_geotiff_dsm(
     :param write_msk: boolean enabling the rasterized mask's writting
     :param msk_no_data: no data to use in for the rasterized mask
     :param prefix: written filenames prefix
+    :param output_layers: layers to write, among rasterization.OUTPUT_LAYERS
+        (if set, the write_color, write_stats and write_msk flags are ignored)
+    :param overviews: boolean enabling the internal overviews' writting,
+        computed from the tiles while they are written
+    :param overviews_bounds: bounds of the full output raster when the
+        written tile is a part of it: the decimated blocks of its overviews
+        are then saved next to the tile files (see save_overviews_blocks()),
+        to be written with write_overviews_from_blocks() in the mosaic
 
     """
+    if output_layers is None:
+        output_layers = get_output_layers(write_color, write_stats, write_msk)
+
     geotransform = (bounds[0], resolution, 0.0, bounds[3], 0.0, -resolution)
     transform = Affine.from_gdal(*geotransform)
 
@@ -191,59 +719,82 @@ def write_geotiff_dsm(
         "tiled": True,
     }
 
-    dsm_file = os.path.join(output_dir, prefix + "dsm.tif")
-
-    # Prepare values for file handles
-    names = ["dsm"]
-    files = [dsm_file]
-    params = [dsm_rio_params]
-    nodata_values = [dsm_no_data]
-    nb_bands_to_write = [1]
-
-    if write_color:
-        names.append("clr")
-        clr_file = os.path.join(output_dir, prefix + "clr.tif")
-        files.append(clr_file)
-        params.append(clr_rio_params)
-        nodata_values.append(color_no_data)
-        nb_bands_to_write.append(nb_bands)
-
-    if write_stats:
-        names.append("dsm_mean")
-        dsm_mean_file = os.path.join(output_dir, prefix + "dsm_mean.tif")
-        files.append(dsm_mean_file)
-        params.append(dsm_rio_params)
-        nodata_values.append(dsm_no_data)
-        nb_bands_to_write.append(1)
-        names.append("dsm_std")
-        dsm_std_file = os.path.join(output_dir, prefix + "dsm_std.tif")
-        files.append(dsm_std_file)
-        params.append(dsm_rio_params)
-        nodata_values.append(dsm_no_data)
-        nb_bands_to_write.append(1)
-
-        names.append("dsm_n_pts")
-        dsm_n_pts_file = os.path.join(output_dir, prefix + "dsm_n_pts.tif")
-        files.append(dsm_n_pts_file)
-        params.append(dsm_rio_params_uint16)
-        nodata_values.append(0)
-        nb_bands_to_write.append(1)
-        names.append("dsm_pts_in_cell")
-        dsm_pts_in_cell_file = os.path.join(
-            output_dir, prefix + "dsm_pts_in_cell.tif"
+    # Prepare values for file handles of each layer:
+    # file name, rasterio parameters, no data and number of bands
+    layers_files = {
+        rasterization.DSM_LAYER: ("dsm.tif", dsm_rio_params, dsm_no_data, 1),
+        rasterization.CLR_LAYER: (
+            "clr.tif",
+            clr_rio_params,
+            color_no_data,
+            nb_bands,
+        ),
+        rasterization.MEAN_LAYER: (
+            "dsm_mean.tif",
+            dsm_rio_params,
+            dsm_no_data,
+            1,
+        ),
+        rasterization.STD_LAYER: (
+            "dsm_std.tif",
+            dsm_rio_params,
+            dsm_no_data,
+            1,
+        ),
+        rasterization.N_PTS_LAYER: (
+            "dsm_n_pts.tif",
+            dsm_rio_params_uint16,
+            0,
+            1,
+        ),
+        rasterization.PTS_IN_CELL_LAYER: (
+            "dsm_pts_in_cell.tif",
+            dsm_rio_params_uint16,
+            0,
+            1,
+        ),
+        rasterization.MSK_LAYER: (
+            "msk.tif",
+            msk_rio_params_uint16,
+            msk_no_data,
+            1,
+        ),
+    }
+    names = [layer for layer in layers_files if layer in output_layers]
+    files = [
+        os.path.join(output_dir, prefix + layers_files[name][0])
+        for name in names
+    ]
+    params = [layers_files[name][1] for name in names]
+    nodata_values = [layers_files[name][2] for name in names]
+    nb_bands_to_write = [layers_files[name][3] for name in names]
+
+    # overviews written while the tiles arrive, or decimated blocks saved
+    # with the tile when it is a part of a mosaic
+    if overviews and overviews_bounds is not None:
+        overviews_factors = []
+        nb_blocks_levels = len(
+            get_overviews_factors(
+                *tiling.roi_to_start_and_size(overviews_bounds, resolution)[2:]
+            )
         )
-        files.append(dsm_pts_in_cell_file)
-        params.append(dsm_rio_params_uint16)
-        nodata_values.append(0)
-        nb_bands_to_write.append(1)
-
-    if write_msk:
-        names.append("msk")
-        msk_file = os.path.join(output_dir, prefix + "msk.tif")
-        files.append(msk_file)
-        params.append(msk_rio_params_uint16)
-        nodata_values.append(msk_no_data)
-        nb_bands_to_write.append(1)
+    else:
+        overviews_factors = (
+            get_overviews_factors(x_size, y_size) if overviews else []
+        )
+        nb_blocks_levels = 0
+    streamed_overviews = {
+        name: StreamedOverviews(
+            x_size,
+            y_size,
+            len(overviews_factors),
+            name in AVERAGED_OVERVIEWS_LAYERS,
+            layers_files[name][2],
+            layers_files[name][1]["dtype"],
+        )
+        for name in names
+        if overviews_factors
+    }
 
     # detect if we deal with dask.future or plain datasets
     has_datasets = True
@@ -253,9 +804,21 @@ def write_geotiff_dsm(
         has_datasets = has_datasets and isinstance(tile, xr.Dataset)
 
     # get file handle(s) with optional color file.
-    with rasterio_handles(
-        names, files, params, nodata_values, nb_bands_to_write
-    ) as rio_handles:
+    if overviews_factors:
+        layers_handles = gdal_handles(
+            names,
+            files,
+            params,
+            nodata_values,
+            nb_bands_to_write,
+            overviews_factors,
+        )
+    else:
+        layers_handles = rasterio_handles(
+            names, files, params, nodata_values, nb_bands_to_write
+        )
+
+    with layers_handles as rio_handles:
 
         def write(raster_tile):
             """
@@ -280,39 +843,35 @@ def write_geotiff_dsm(
             # window is speficied as origin & size
             window = rio.windows.Window(x_0, y_0, x_1 - x_0 + 1, y_1 - y_0 + 1)
 
-            rio_handles["dsm"].write_band(
-                1, raster_tile[cst.RASTER_HGT].values, window=window
-            )
+            for name in names:
+                data = get_layer_data(raster_tile, name, color_dtype)
+                if data is None:
+                    continue
 
-            if write_color:
-                rio_handles["clr"].write(
-                    raster_tile[cst.RASTER_COLOR_IMG].values.astype(
-                        color_dtype
-                    ),
-                    window=window,
+                write_layer_tile(
+                    rio_handles[name],
+                    data,
+                    window,
+                    streamed_overviews.get(name),
                 )
 
-            if write_stats:
-                rio_handles["dsm_mean"].write_band(
-                    1, raster_tile[cst.RASTER_HGT_MEAN].values, window=window
-                )
-                rio_handles["dsm_std"].write_band(
-                    1, raster_tile[cst.RASTER_HGT_STD_DEV].values, window=window
-                )
-                rio_handles["dsm_n_pts"].write_band(
-                    1, raster_tile[cst.RASTER_NB_PTS].values, window=window
-                )
-                rio_handles["dsm_pts_in_cell"].write_band(
-                    1,
-                    raster_tile[cst.RASTER_NB_PTS_IN_CELL].values,
-                    window=window,
-                )
-
-            ds_values_list = [key for key, _ in raster_tile.items()]
-            if cst.RASTER_MSK in ds_values_list and write_msk:
-                rio_handles["msk"].write_band(
-                    1, raster_tile[cst.RASTER_MSK].values, window=window
-                )
+                if nb_blocks_levels > 0:
+                    blocks_x_0, blocks_y_0, _, _ = compute_output_window(
+                        raster_tile, overviews_bounds, resolution
+                    )
+                    save_overviews_blocks(
+                        files[names.index(name)],
+                        decimate_tile(
+                            data,
+                            blocks_x_0,
+                            blocks_y_0,
+                            nb_blocks_levels,
+                            name in AVERAGED_OVERVIEWS_LAYERS,
+                            layers_files[name][2],
+                        ),
+                        layers_files[name][2],
+                        layers_files[name][1]["dtype"],
+                    )
 
         # Multiprocessing mode
         if has_datasets:
@@ -21,8 +21,3 @@
 """
 CARS steps module init file
 """
-
-# CARS imports
-# TODO: remove the following import if the core/geometry/otb_geometry.py
-# file is removed from CARS
-from cars.core.geometry.otb_geometry import OTBGeometry  # noqa
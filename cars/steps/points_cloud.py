@@ -25,6 +25,7 @@ rasterization steps
 
 # Standard imports
 import logging
+import time
 from collections import namedtuple
 from typing import List, Tuple, Union
 
@@ -32,12 +33,33 @@ from typing import List, Tuple, Union
 import numpy as np
 import pandas
 import xarray as xr
+from osgeo import osr
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
 
 # CARS imports
 from cars.core import constants as cst
 from cars.core import projection
 
+# small components filter points connectivities
+RADIUS_CONNECTIVITY = "radius"
+EPIPOLAR_GRID_CONNECTIVITY = "epipolar_grid"
+SMALL_COMPONENTS_CONNECTIVITIES = [
+    RADIUS_CONNECTIVITY,
+    EPIPOLAR_GRID_CONNECTIVITY,
+]
+
+# types of the combined cloud columns (the x, y, z coordinates are float64,
+# or float32 in reduced precision, and the color bands are float32)
+CLOUD_COLUMNS_TYPES = {
+    cst.POINTS_CLOUD_VALID_DATA: np.uint8,
+    cst.POINTS_CLOUD_MSK: np.uint16,
+    cst.POINTS_CLOUD_COORD_EPI_GEOM_I: np.int32,
+    cst.POINTS_CLOUD_COORD_EPI_GEOM_J: np.int32,
+    cst.POINTS_CLOUD_IDX_IM_EPI: np.int32,
+}
+
 
 def create_combined_cloud(  # noqa: C901
     cloud_list: List[xr.Dataset],
@@ -52,6 +74,7 @@ def create_combined_cloud(  # noqa: C901
     epipolar_border_margin: int = 0,
     radius: float = 1,
     with_coords: bool = False,
+    reduced_precision: bool = False,
 ) -> Tuple[pandas.DataFrame, int]:
     """
     Combine a list of clouds (and their colors) into a pandas dataframe
@@ -97,6 +120,16 @@ def create_combined_cloud(  # noqa: C901
             to the dataframe along with the index of its original cloud
             in the cloud_list input.
 
+    Each column is stored with its own type (see CLOUD_COLUMNS_TYPES):
+    the validity flag is uint8, the mask uint16, the epipolar positions
+    int32 and the color bands float32.
+
+    If the reduced_precision option is activated, the coordinates are stored
+    in float32 and the x, y, z columns are offsets from an origin point
+    (the first valid point of the clouds) saved in the
+    cst.POINTS_CLOUD_ORIGIN attribute of the dataframe
+    (see the get_cloud_origin function).
+
     :raise Exception: if a color_list is set
         but does not have the same length as the cloud list
 
@@ -123,6 +156,8 @@ def create_combined_cloud(  # noqa: C901
     :param with_coords: Option enabling the adding to the combined cloud
         of information of each point to retrieve their positions
         in the original epipolar images
+    :param reduced_precision: Option enabling the float32 storage
+        of the combined cloud, with x, y, z stored as offsets from an origin
     :return: Tuple formed with the combined clouds and color
         in a single pandas dataframe and the epsg code
     """
@@ -149,20 +184,25 @@ def create_combined_cloud(  # noqa: C901
         and xsize is not None
         and ysize is not None
     )
+    roi_bounds = None
     if roi:
         total_margin = (on_ground_margin + radius + 1) * resolution
         xend = xstart + (xsize + 1) * resolution
         yend = ystart - (ysize + 1) * resolution
+        roi_bounds = (
+            xstart - total_margin,
+            yend - total_margin,
+            xend + total_margin,
+            ystart + total_margin,
+        )
 
     nb_data = [cst.POINTS_CLOUD_VALID_DATA, cst.X, cst.Y, cst.Z]
 
     # check if the input mask values are present in the dataset
-    nb_data_msk = 0
     for cloud_list_item in cloud_list:
         ds_values_list = [key for key, _ in cloud_list_item.items()]
         if cst.POINTS_CLOUD_MSK in ds_values_list:
             nb_data.append(cst.POINTS_CLOUD_MSK)
-            nb_data_msk = 1
             break
 
     if color_list is not None:
@@ -185,166 +225,254 @@ def create_combined_cloud(  # noqa: C901
             ]
         )
 
-    # iterate trough input clouds
-    cloud = np.zeros((0, len(nb_data)), dtype=np.float64)
-    nb_points = 0
-    for cloud_list_idx, cloud_list_item in enumerate(cloud_list):
-        full_x = cloud_list_item[cst.X].values
-        full_y = cloud_list_item[cst.Y].values
-        full_z = cloud_list_item[cst.Z].values
-
-        # get mask of points inside the roi (plus margins)
-        if roi:
-
-            # if the points clouds are not in the same referential as the roi,
-            # it is converted using the dsm_epsg
-            if epsg != dsm_epsg:
-                (
-                    full_x,
-                    full_y,
-                ) = projection.get_converted_xy_np_arrays_from_dataset(
-                    cloud_list_item, dsm_epsg
-                )
+    # in reduced precision, xyz are stored as offsets from an origin point
+    # so that they keep their precision in float32
+    cloud_dtype = np.float32 if reduced_precision else np.float64
+    origin = None
 
-            msk_xstart = np.where(full_x > xstart - total_margin, True, False)
-            msk_xend = np.where(full_x < xend + total_margin, True, False)
-            msk_yend = np.where(full_y > yend - total_margin, True, False)
-            msk_ystart = np.where(full_y < ystart + total_margin, True, False)
-            terrain_tile_data_msk = np.logical_and(
-                msk_xstart,
-                np.logical_and(msk_xend, np.logical_and(msk_ystart, msk_yend)),
-            )
-            terrain_tile_data_msk_pos = terrain_tile_data_msk.astype(
-                np.int8
-            ).nonzero()
-
-            # if the points clouds are not in the same referential as the roi,
-            # retrieve the initial values
-            if epsg != dsm_epsg:
-                full_x = cloud_list_item[cst.X].values
-                full_y = cloud_list_item[cst.Y].values
-
-            # if no point is found, continue
-            if terrain_tile_data_msk_pos[0].shape[0] == 0:
-                continue
-
-            # get useful data bounding box
-            bbox = [
-                np.min(terrain_tile_data_msk_pos[0]),
-                np.min(terrain_tile_data_msk_pos[1]),
-                np.max(terrain_tile_data_msk_pos[0]),
-                np.max(terrain_tile_data_msk_pos[1]),
-            ]
-        else:
-            bbox = [0, 0, full_y.shape[0] - 1, full_y.shape[1] - 1]
-
-        # add (x, y, z) information to the current cloud
-        c_x = full_x[bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1]
-        c_y = full_y[bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1]
-        c_z = full_z[bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1]
+    # first pass: select the points of each cloud to count them
+    selections = []
+    nb_points = 0
+    nb_kept_points = 0
+    for cloud_list_item in cloud_list:
+        selection = select_cloud_points(
+            cloud_list_item, roi_bounds, epsg, dsm_epsg
+        )
+        selections.append(selection)
+        if selection is None:
+            continue
 
-        c_cloud = np.zeros(
-            (len(nb_data), (bbox[2] - bbox[0] + 1) * (bbox[3] - bbox[1] + 1))
+        bbox, kept = selection
+        nb_points += kept.size
+        nb_kept_points += np.count_nonzero(kept)
+
+        if reduced_precision and origin is None:
+            origin = get_first_point(cloud_list_item, bbox)
+
+    # second pass: fill the preallocated typed columns of the combined cloud
+    cloud = {
+        label: np.zeros(
+            nb_kept_points,
+            dtype=CLOUD_COLUMNS_TYPES.get(
+                label,
+                np.float32
+                if label.startswith(cst.POINTS_CLOUD_CLR_KEY_ROOT)
+                else cloud_dtype,
+            ),
         )
-        c_cloud[1, :] = np.ravel(c_x)
-        c_cloud[2, :] = np.ravel(c_y)
-        c_cloud[3, :] = np.ravel(c_z)
+        for label in nb_data
+    }
+    start = end = 0
+    kept = None
+
+    def fill(label, values, offset=0.0):
+        """
+        Fill a column of the combined cloud with the kept values
+        of the current cloud (minus an offset, before the cast to the
+        column type)
+        """
+        values = np.ravel(values)[kept]
+        if offset != 0:
+            values = values - offset
+        cloud[label][start:end] = values
+
+    for cloud_list_idx, (cloud_list_item, selection) in enumerate(
+        zip(cloud_list, selections)
+    ):
+        if selection is None:
+            continue
 
-        ds_values_list = [key for key, _ in cloud_list_item.items()]
+        bbox, kept = selection
+        end = start + np.count_nonzero(kept)
+        window = np.s_[bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1]
 
-        if cst.POINTS_CLOUD_MSK in ds_values_list:
-            c_msk = cloud_list_item[cst.POINTS_CLOUD_MSK].values[
-                bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1
-            ]
-            c_cloud[4, :] = np.ravel(c_msk)
+        # add (x, y, z) information to the current cloud
+        for coord, coord_origin in zip(
+            [cst.X, cst.Y, cst.Z],
+            origin if origin is not None else (0.0, 0.0, 0.0),
+        ):
+            fill(coord, cloud_list_item[coord].values[window], coord_origin)
+
+        if cst.POINTS_CLOUD_MSK in cloud_list_item:
+            fill(
+                cst.POINTS_CLOUD_MSK,
+                cloud_list_item[cst.POINTS_CLOUD_MSK].values[window],
+            )
 
         # add data valid mask
         # (points that are not in the border of the epipolar image)
-        if epipolar_border_margin == 0:
-            epipolar_margin_mask = np.full(
-                (
-                    cloud_list_item[cst.X].values.shape[0],
-                    cloud_list_item[cst.X].values.shape[1],
-                ),
-                True,
-            )
-        else:
-            epipolar_margin_mask = np.full(
-                (
-                    cloud_list_item[cst.X].values.shape[0],
-                    cloud_list_item[cst.X].values.shape[1],
-                ),
-                False,
-            )
-            epipolar_margin_mask[
-                epipolar_border_margin:-epipolar_border_margin,
-                epipolar_border_margin:-epipolar_border_margin,
-            ] = True
-
-        c_epipolar_margin_mask = epipolar_margin_mask[
-            bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1
-        ]
-        c_cloud[0, :] = np.ravel(c_epipolar_margin_mask)
+        fill(
+            cst.POINTS_CLOUD_VALID_DATA,
+            get_epipolar_margin_mask(
+                cloud_list_item[cst.X].shape, bbox, epipolar_border_margin
+            ),
+        )
 
         # add the color information to the current cloud
         if color_list is not None:
-            c_color = color_list[cloud_list_idx].im.values[
-                :, bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1
-            ]
-
+            c_color = color_list[cloud_list_idx].im.values
             for band in range(nb_band_clr):
-                c_cloud[4 + nb_data_msk + band, :] = np.ravel(
-                    c_color[band, :, :]
-                )
+                fill(list_clr[band], c_color[band][window])
 
         # add the original image coordinates information to the current cloud
         if with_coords:
-            coords_line = np.linspace(bbox[0], bbox[2], bbox[2] - bbox[0] + 1)
-            coords_col = np.linspace(bbox[1], bbox[3], bbox[3] - bbox[1] + 1)
-            coords_col, coords_line = np.meshgrid(coords_col, coords_line)
-
-            c_cloud[4 + nb_data_msk + nb_band_clr, :] = np.ravel(coords_line)
-            c_cloud[4 + nb_data_msk + nb_band_clr + 1, :] = np.ravel(coords_col)
-            c_cloud[4 + nb_data_msk + nb_band_clr + 2, :] = cloud_list_idx
-
-        # remove masked data (pandora + out of the terrain tile points)
-        c_terrain_tile_data_msk = (
-            cloud_list_item[cst.POINTS_CLOUD_CORR_MSK].values[
-                bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1
-            ]
-            == 255
+            coords_col, coords_line = np.meshgrid(
+                np.arange(bbox[1], bbox[3] + 1),
+                np.arange(bbox[0], bbox[2] + 1),
+            )
+            fill(cst.POINTS_CLOUD_COORD_EPI_GEOM_I, coords_line)
+            fill(cst.POINTS_CLOUD_COORD_EPI_GEOM_J, coords_col)
+            cloud[cst.POINTS_CLOUD_IDX_IM_EPI][start:end] = cloud_list_idx
+
+        start = end
+
+    worker_logger.debug("Received {} points to rasterize".format(nb_points))
+    worker_logger.debug(
+        "Keeping {}/{} points "
+        "inside rasterization grid".format(nb_kept_points, nb_points)
+    )
+
+    # the dataframe wraps the typed columns without copy (nor consolidation)
+    pd_cloud = pandas.DataFrame(cloud, columns=nb_data, copy=False)
+    if reduced_precision:
+        pd_cloud.attrs[cst.POINTS_CLOUD_ORIGIN] = (
+            origin if origin is not None else (0.0, 0.0, 0.0)
         )
 
-        if roi:
-            c_terrain_tile_data_msk = np.logical_and(
-                c_terrain_tile_data_msk,
-                terrain_tile_data_msk[
-                    bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1
-                ],
+    return pd_cloud, epsg
+
+
+def select_cloud_points(
+    cloud: xr.Dataset,
+    roi_bounds: Union[None, Tuple[float, float, float, float]],
+    epsg: int,
+    dsm_epsg: int,
+) -> Union[None, Tuple[List[int], np.ndarray]]:
+    """
+    Select the points of an epipolar cloud to add to a combined cloud:
+    the points valid in the correlation mask and inside the region of
+    interest, within the bounding box of the points inside the region
+    of interest.
+
+    :param cloud: epipolar cloud dataset
+    :param roi_bounds: bounds of the region of interest (with margins)
+        as (xmin, ymin, xmax, ymax) in dsm_epsg, or None for the whole cloud
+    :param epsg: epsg code of the cloud
+    :param dsm_epsg: epsg code of the region of interest
+    :return: the bounding box of the selection in the epipolar grid
+        (first row, first column, last row, last column) and the flattened
+        mask of the selected points in this bounding box,
+        or None if no point is inside the region of interest
+    """
+    if roi_bounds is None:
+        full_shape = cloud[cst.X].shape
+        bbox = [0, 0, full_shape[0] - 1, full_shape[1] - 1]
+        window = np.s_[:, :]
+    else:
+        full_x = cloud[cst.X].values
+        full_y = cloud[cst.Y].values
+
+        # if the points clouds are not in the same referential as the roi,
+        # it is converted using the dsm_epsg
+        if epsg != dsm_epsg:
+            (
+                full_x,
+                full_y,
+            ) = projection.get_converted_xy_np_arrays_from_dataset(
+                cloud, dsm_epsg
             )
 
-        c_terrain_tile_data_msk = np.ravel(c_terrain_tile_data_msk)
+        terrain_tile_data_msk = (
+            (full_x > roi_bounds[0])
+            & (full_x < roi_bounds[2])
+            & (full_y > roi_bounds[1])
+            & (full_y < roi_bounds[3])
+        )
+        rows = np.flatnonzero(np.any(terrain_tile_data_msk, axis=1))
 
-        c_terrain_tile_data_msk_pos = np.nonzero(~c_terrain_tile_data_msk)
+        # if no point is found, continue
+        if rows.size == 0:
+            return None
 
-        nb_points += c_cloud.shape[1]
+        cols = np.flatnonzero(np.any(terrain_tile_data_msk, axis=0))
 
-        c_cloud = np.delete(
-            c_cloud.transpose(), c_terrain_tile_data_msk_pos[0], 0
-        )
+        # get useful data bounding box
+        bbox = [rows[0], cols[0], rows[-1], cols[-1]]
+        window = np.s_[bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1]
 
-        # add current cloud to the combined one
-        cloud = np.concatenate([cloud, c_cloud], axis=0)
+    # remove masked data (pandora + out of the terrain tile points)
+    kept = cloud[cst.POINTS_CLOUD_CORR_MSK].values[window] == 255
+    if roi_bounds is not None:
+        kept &= terrain_tile_data_msk[window]
 
-    worker_logger.debug("Received {} points to rasterize".format(nb_points))
-    worker_logger.debug(
-        "Keeping {}/{} points "
-        "inside rasterization grid".format(cloud.shape[0], nb_points)
+    return bbox, np.ravel(kept)
+
+
+def get_first_point(
+    cloud: xr.Dataset, bbox: List[int]
+) -> Union[None, Tuple[float, float, float]]:
+    """
+    Get the first point of an epipolar cloud bounding box with finite
+    x and y coordinates (its height is set to 0 if not finite),
+    used as the origin of the reduced precision combined clouds
+
+    :param cloud: epipolar cloud dataset
+    :param bbox: bounding box in the epipolar grid
+        (first row, first column, last row, last column)
+    :return: the (x, y, z) point, None if there is no finite point
+    """
+    window = np.s_[bbox[0] : bbox[2] + 1, bbox[1] : bbox[3] + 1]
+    c_x = cloud[cst.X].values[window]
+    c_y = cloud[cst.Y].values[window]
+
+    finite_xy = np.isfinite(c_x) & np.isfinite(c_y)
+    if not np.any(finite_xy):
+        return None
+
+    first_pos = np.unravel_index(np.argmax(finite_xy), c_x.shape)
+    return (
+        float(c_x[first_pos]),
+        float(c_y[first_pos]),
+        float(np.nan_to_num(cloud[cst.Z].values[window][first_pos])),
     )
 
-    pd_cloud = pandas.DataFrame(cloud, columns=nb_data)
 
-    return pd_cloud, epsg
+def get_epipolar_margin_mask(
+    shape: Tuple[int, int], bbox: List[int], epipolar_border_margin: int
+) -> np.ndarray:
+    """
+    Get the mask of the points which are not on the border of their
+    epipolar image, within a bounding box
+
+    :param shape: shape of the epipolar image
+    :param bbox: bounding box in the epipolar grid
+        (first row, first column, last row, last column)
+    :param epipolar_border_margin: size of the epipolar image border
+    :return: the mask of the bounding box points
+    """
+    rows = np.arange(bbox[0], bbox[2] + 1)
+    cols = np.arange(bbox[1], bbox[3] + 1)
+    valid_rows = (rows >= epipolar_border_margin) & (
+        rows < shape[0] - epipolar_border_margin
+    )
+    valid_cols = (cols >= epipolar_border_margin) & (
+        cols < shape[1] - epipolar_border_margin
+    )
+
+    return np.logical_and.outer(valid_rows, valid_cols)
+
+
+def get_cloud_origin(cloud: pandas.DataFrame) -> Tuple[float, float, float]:
+    """
+    Get the origin point of the x, y, z columns of a combined cloud
+    built with the reduced_precision option of the create_combined_cloud
+    function: the absolute coordinates are the columns values plus the origin.
+
+    :param cloud: combined cloud
+        as returned by the create_combined_cloud function
+    :return: the (x, y, z) origin ((0, 0, 0) for full precision clouds)
+    """
+    return cloud.attrs.get(cst.POINTS_CLOUD_ORIGIN, (0.0, 0.0, 0.0))
 
 
 # ##### Parameters structures ######
@@ -375,6 +503,10 @@ def create_combined_cloud(  # noqa: C901
 #   * mask_value:
 #           value to use to identify the removed points in the mask
 #
+#   * connectivity:
+#           how the connected points are searched,
+#           one of SMALL_COMPONENTS_CONNECTIVITIES
+#
 SmallComponentsFilterParams = namedtuple(
     "SmallComponentsFilterParams",
     [
@@ -384,6 +516,7 @@ SmallComponentsFilterParams = namedtuple(
         "clusters_distance_threshold",
         "filtered_elt_msk",
         "msk_value",
+        "connectivity",
     ],
 )
 
@@ -408,6 +541,103 @@ StatisticalFilterParams = namedtuple(
 )
 
 
+# ##### Filters spatial index ######
+
+
+class CloudSpatialIndex:
+    """
+    Spatial index of the x, y, z coordinates of a combined cloud,
+    built once and shared by the successive filters.
+
+    The kd-tree is not rebuilt when points are filtered: the removed points
+    are masked, and the positions of the remaining points in the filtered
+    cloud are kept up to date (see the remove method).
+    """
+
+    def __init__(self, cloud_xyz: np.ndarray):
+        """
+        Init function of CloudSpatialIndex
+
+        :param cloud_xyz: x, y, z coordinates of the cloud points
+        """
+        self.cloud_xyz = cloud_xyz
+        self.tree = None
+        # position of each indexed point in the filtered cloud
+        # (-1 for the removed points, and for the kd-tree missing neighbors
+        # index, equal to the number of points)
+        self.positions = np.append(np.arange(len(cloud_xyz)), -1)
+
+    def get_tree(self) -> cKDTree:
+        """
+        Get the kd-tree of all the indexed points (built on first call)
+
+        :return: the kd-tree
+        """
+        if self.tree is None:
+            self.tree = cKDTree(self.cloud_xyz)
+
+        return self.tree
+
+    def get_positions(self, indexes: np.ndarray) -> np.ndarray:
+        """
+        Get the positions in the filtered cloud of indexed points
+
+        :param indexes: indexes of points in the kd-tree
+        :return: their positions (-1 for the removed points)
+        """
+        return self.positions[indexes]
+
+    def remove(self, positions: List[int]):
+        """
+        Remove points from the index
+
+        :param positions: positions of the points to remove
+            in the filtered cloud
+        """
+        kept = self.positions >= 0
+        kept_indexes = np.flatnonzero(kept)
+        kept[kept_indexes[positions]] = False
+        self.positions[:] = -1
+        self.positions[kept] = np.arange(np.count_nonzero(kept))
+
+    def query(self, points: np.ndarray, k: int, workers: int = 1) -> np.ndarray:
+        """
+        Get the distances of points to their k nearest remaining points:
+        the removed neighbors are skipped by querying more neighbors
+        for the points which have some.
+
+        :param points: coordinates of the points to query
+        :param k: number of neighbors (at least 2)
+        :param workers: number of threads used by the kd-tree queries
+        :return: the sorted distances of each point to its k neighbors
+            (inf for the missing neighbors)
+        """
+        cloud_tree = self.get_tree()
+        distances, indexes = cloud_tree.query(points, k, workers=workers)
+        kept = self.get_positions(indexes) >= 0
+
+        # skip the removed neighbors, and query more neighbors
+        # for the points which have some
+        to_query = np.flatnonzero(np.any(~kept, axis=1))
+        distances[to_query] = np.where(
+            kept[to_query], distances[to_query], np.inf
+        )
+        distances[to_query] = np.sort(distances[to_query], axis=1)
+        nb_neighbors = k
+        while to_query.size > 0 and nb_neighbors < cloud_tree.n:
+            nb_neighbors = min(2 * nb_neighbors, cloud_tree.n)
+            more_distances, more_indexes = cloud_tree.query(
+                points[to_query], nb_neighbors, workers=workers
+            )
+            more_kept = self.get_positions(more_indexes) >= 0
+            distances[to_query] = np.sort(
+                np.where(more_kept, more_distances, np.inf), axis=1
+            )[:, :k]
+            to_query = to_query[np.sum(more_kept, axis=1) < k]
+
+        return distances
+
+
 # ##### Small components filtering ######
 
 
@@ -417,11 +647,17 @@ def small_components_filtering(
     nb_pts_threshold: int,
     clusters_distance_threshold: float = None,
     filtered_elt_pos: bool = False,
+    spatial_index: CloudSpatialIndex = None,
+    connectivity: str = RADIUS_CONNECTIVITY,
 ) -> Tuple[pandas.DataFrame, Union[None, pandas.DataFrame]]:
     """
     Filter points cloud to remove small clusters of points
     (see the detect_small_components function).
 
+    :raise NotImplementedError: if the connectivity is unknown
+    :raise Exception: if the epipolar grid connectivity is used on a cloud
+        built without the with_coords option
+
     :param cloud: combined cloud
         as returned by the create_combined_cloud function
     :param connection_val: distance to use
@@ -434,13 +670,47 @@ def small_components_filtering(
     :param filtered_elt_pos: if filtered_elt_pos is set to True,
         the removed points positions in their original
         epipolar images are returned, otherwise it is set to None
+    :param spatial_index: spatial index of the cloud points
+        (built if None), updated with the removed points
+    :param connectivity: how the connected points are searched,
+        one of SMALL_COMPONENTS_CONNECTIVITIES: in a connection_val radius
+        or among the 8 neighbors of the points in their epipolar image
     :return: Tuple made of the filtered cloud and
         the removed elements positions in their epipolar images
     """
+    if connectivity not in SMALL_COMPONENTS_CONNECTIVITIES:
+        raise NotImplementedError(
+            "{} small components connectivity "
+            "is not implemented".format(connectivity)
+        )
+
+    epipolar_positions = None
+    if connectivity == EPIPOLAR_GRID_CONNECTIVITY:
+        labels = [
+            cst.POINTS_CLOUD_COORD_EPI_GEOM_I,
+            cst.POINTS_CLOUD_COORD_EPI_GEOM_J,
+            cst.POINTS_CLOUD_IDX_IM_EPI,
+        ]
+        if not all(label in cloud.columns for label in labels):
+            raise Exception(
+                "The epipolar grid connectivity needs the points positions "
+                "in their epipolar images (with_coords option)"
+            )
+        epipolar_positions = np.stack(
+            [cloud[label].values for label in labels], axis=1
+        )
+
     cloud_xyz = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
     index_elt_to_remove = detect_small_components(
-        cloud_xyz, connection_val, nb_pts_threshold, clusters_distance_threshold
+        cloud_xyz,
+        connection_val,
+        nb_pts_threshold,
+        clusters_distance_threshold,
+        spatial_index,
+        epipolar_positions,
     )
+    if spatial_index is not None:
+        spatial_index.remove(index_elt_to_remove)
 
     return filter_cloud(cloud, index_elt_to_remove, filtered_elt_pos)
 
@@ -450,6 +720,8 @@ def detect_small_components(
     connection_val: float,
     nb_pts_threshold: int,
     clusters_distance_threshold: float = None,
+    spatial_index: CloudSpatialIndex = None,
+    epipolar_positions: np.ndarray = None,
 ) -> List[int]:
     """
     Determine the indexes of the points of cloud_xyz to filter.
@@ -463,6 +735,12 @@ def detect_small_components(
     If clusters_distance_threshold is set to None, all the clusters that are
     composed of less than nb_pts_threshold points are filtered.
 
+    The clusters are the connected components of the sparse graph of all the
+    points pairs closer than connection_val, given by a single kd-tree query.
+    If the points epipolar_positions are set, only the pairs of 8-neighbors
+    in the same epipolar image are considered, without any kd-tree
+    (it is then only used by the clusters_distance_threshold level).
+
     :param cloud_xyz: points kdTree
     :param connection_val: distance to use
         to consider that two points are connected
@@ -471,93 +749,122 @@ def detect_small_components(
     :param clusters_distance_threshold: distance to use
         to consider if two points clusters are far from each other or not
         (set to None to deactivate this level of filtering)
+    :param spatial_index: spatial index of the cloud_xyz points,
+        possibly with removed points (built if None)
+    :param epipolar_positions: row, col and epipolar image index
+        of each point (one point per row), or None
     :return: list of the points to filter indexes
     """
-    cloud_tree = cKDTree(cloud_xyz)
-
-    # extract connected components
-    processed = [False] * len(cloud_xyz)
-    connected_components = []
-    for idx, _ in enumerate(cloud_xyz):
-
-        # if point has already been added to a cluster
-        if processed[idx]:
-            continue
-
-        # get point neighbors
-        neighbors_list = cloud_tree.query_ball_point(
-            cloud_xyz[idx], connection_val
-        )
-
-        # add them to the current cluster
-        seed = []
-        seed.extend(neighbors_list)
-        for neigh_idx in neighbors_list:
-            processed[neigh_idx] = True
-
-        # iteratively add all the neighbors of the points
-        # which were added to the current cluster (if there are some)
-        while len(neighbors_list) != 0:
-            all_neighbors = cloud_tree.query_ball_point(
-                cloud_xyz[neighbors_list], connection_val
+    nb_points = len(cloud_xyz)
+    if nb_points == 0:
+        return []
+
+    if spatial_index is None:
+        spatial_index = CloudSpatialIndex(cloud_xyz)
+
+    # extract connected components of the connection_val graph
+    if epipolar_positions is None:
+        pairs = spatial_index.get_positions(
+            spatial_index.get_tree().query_pairs(
+                connection_val, output_type="ndarray"
             )
-
-            # flatten neighbors
-            new_neighbors = []
-            for neighbor_item in all_neighbors:
-                new_neighbors.extend(neighbor_item)
-
-            # retrieve only new neighbors
-            neighbors_list = list(set(new_neighbors) - set(seed))
-
-            # add them to the current cluster
-            seed.extend(neighbors_list)
-            for neigh_idx in neighbors_list:
-                processed[neigh_idx] = True
-
-        connected_components.append(seed)
+        )
+        pairs = pairs[np.all(pairs >= 0, axis=1)]
+    else:
+        pairs = get_epipolar_grid_pairs(
+            cloud_xyz, epipolar_positions, connection_val
+        )
+    adjacency = coo_matrix(
+        (np.ones(len(pairs), dtype=np.bool_), (pairs[:, 0], pairs[:, 1])),
+        shape=(nb_points, nb_points),
+    )
+    _, labels = connected_components(adjacency, directed=False)
 
     # determine clusters to remove
-    cluster_to_remove = []
-    for connected_components_idx, connected_components_item in enumerate(
-        connected_components
-    ):
-        if len(connected_components_item) < nb_pts_threshold:
-            if clusters_distance_threshold is not None:
-                # search if the current cluster has any neighbors
-                # in the clusters_distance_threshold radius
-                all_neighbors = cloud_tree.query_ball_point(
-                    cloud_xyz[connected_components[connected_components_idx]],
-                    clusters_distance_threshold,
-                )
+    clusters_sizes = np.bincount(labels)
+    small_clusters = clusters_sizes < nb_pts_threshold
+    to_remove = small_clusters[labels]
+
+    if clusters_distance_threshold is not None and np.any(to_remove):
+        # keep the small clusters which have any point of another cluster
+        # in the clusters_distance_threshold radius of one of their points
+        small_idx = np.flatnonzero(to_remove)
+        neighbors = cKDTree(cloud_xyz[small_idx]).sparse_distance_matrix(
+            spatial_index.get_tree(),
+            clusters_distance_threshold,
+            output_type="ndarray",
+        )
+        neighbors_positions = spatial_index.get_positions(neighbors["j"])
+        kept = neighbors_positions >= 0
+        points_labels = labels[small_idx[neighbors["i"][kept]]]
+        not_isolated = points_labels != labels[neighbors_positions[kept]]
+        small_clusters[np.unique(points_labels[not_isolated])] = False
+        to_remove = small_clusters[labels]
 
-                # flatten neighbors
-                new_neighbors = []
-                for neighbor_item in all_neighbors:
-                    new_neighbors.extend(neighbor_item)
+    return np.flatnonzero(to_remove).tolist()
 
-                # retrieve only new neighbors
-                neighbors_list = list(
-                    set(new_neighbors) - set(connected_components_item)
-                )
 
-                # if there are no new neighbors, the cluster will be removed
-                if len(neighbors_list) == 0:
-                    cluster_to_remove.extend(connected_components_item)
-            else:
-                cluster_to_remove.extend(connected_components_item)
+def get_epipolar_grid_pairs(
+    cloud_xyz: np.ndarray, epipolar_positions: np.ndarray, connection_val: float
+) -> np.ndarray:
+    """
+    Get the pairs of connected points of a combined cloud using the
+    epipolar grids adjacency: two points are connected if they are
+    8-neighbors in the same epipolar image and closer than connection_val.
 
-    return cluster_to_remove
+    :param cloud_xyz: x, y, z coordinates of the points
+    :param epipolar_positions: row, col and epipolar image index
+        of each point (one point per row)
+    :param connection_val: distance to use
+        to consider that two points are connected
+    :return: the connected points pairs (one pair per row)
+    """
+    # dense grid of the points indexes in their epipolar images bounding boxes
+    positions = epipolar_positions.astype(np.int64)
+    images = positions[:, 2]
+    nb_images = int(np.max(images)) + 1
+    for axis in (0, 1):
+        min_positions = np.full(nb_images, np.iinfo(np.int64).max)
+        np.minimum.at(min_positions, images, positions[:, axis])
+        positions[:, axis] -= min_positions[images]
+    nb_rows = int(np.max(positions[:, 0])) + 1
+    nb_cols = int(np.max(positions[:, 1])) + 1
+
+    grid = np.full((nb_images, nb_rows, nb_cols), -1, dtype=np.int64)
+    grid[images, positions[:, 0], positions[:, 1]] = np.arange(len(cloud_xyz))
+
+    # right, bottom and both bottom diagonals neighbors
+    pairs = []
+    for row_shift, col_shift in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        first_col = max(0, -col_shift)
+        last_col = nb_cols - max(0, col_shift)
+        first_points = grid[:, : nb_rows - row_shift, first_col:last_col]
+        second_points = grid[
+            :, row_shift:, first_col + col_shift : last_col + col_shift
+        ]
+        both = (first_points >= 0) & (second_points >= 0)
+        shift_pairs = np.stack((first_points[both], second_points[both]), 1)
+        vectors = cloud_xyz[shift_pairs[:, 0]] - cloud_xyz[shift_pairs[:, 1]]
+        connected = np.sum(vectors * vectors, axis=1) <= connection_val ** 2
+        pairs.append(shift_pairs[connected])
+
+    return np.concatenate(pairs)
 
 
 # ##### statistical filtering ######
 
+# number of points of the statistical outliers filter neighbors queries
+# (bounds the memory used by the k nearest neighbors distances and indexes)
+STATISTICAL_FILTER_CHUNK_SIZE = 100000
+
 
 def statistical_outliers_filtering(
     cloud: pandas.DataFrame,
     k: int,
     std_factor: float,
     filtered_elt_pos: bool = False,
+    nb_threads: int = None,
+    spatial_index: CloudSpatialIndex = None,
 ) -> Tuple[pandas.DataFrame, Union[None, pandas.DataFrame]]:
     """
     Filter points cloud to remove statistical outliers
@@ -571,17 +878,34 @@ def statistical_outliers_filtering(
     :param filtered_elt_pos: if filtered_elt_pos is set to True,
         the removed points positions in their original
         epipolar images are returned, otherwise it is set to None
+    :param nb_threads: number of threads used by the neighbors queries
+        (if None, a single thread is used, -1 uses all the threads)
+    :param spatial_index: spatial index of the cloud points
+        (built if None), updated with the removed points
     :return: Tuple made of the filtered cloud and
         the removed elements positions in their epipolar images
     """
     cloud_xyz = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
-    index_elt_to_remove = detect_statistical_outliers(cloud_xyz, k, std_factor)
+    index_elt_to_remove = detect_statistical_outliers(
+        cloud_xyz,
+        k,
+        std_factor,
+        nb_threads=nb_threads,
+        spatial_index=spatial_index,
+    )
+    if spatial_index is not None:
+        spatial_index.remove(index_elt_to_remove)
 
     return filter_cloud(cloud, index_elt_to_remove, filtered_elt_pos)
 
 
 def detect_statistical_outliers(
-    cloud_xyz: np.ndarray, k: int, std_factor: float = 3.0
+    cloud_xyz: np.ndarray,
+    k: int,
+    std_factor: float = 3.0,
+    chunk_size: int = STATISTICAL_FILTER_CHUNK_SIZE,
+    nb_threads: int = None,
+    spatial_index: CloudSpatialIndex = None,
 ) -> List[int]:
     """
     Determine the indexes of the points of cloud_xyz to filter.
@@ -594,20 +918,40 @@ def detect_statistical_outliers(
 
         dist_thresh = mean_distances + std_factor * stddev_distances
 
+    The neighbors are queried by blocks of chunk_size points, so that only
+    the mean distances of the whole cloud are kept in memory.
+
     :param cloud_xyz: points kdTree
     :param k: number of neighbors
     :param std_factor: multiplication factor to use
         to compute the distance threshold
+    :param chunk_size: number of points queried at once
+        (if None, the whole cloud is queried at once)
+    :param nb_threads: number of threads used by the neighbors queries
+        (if None, a single thread is used, -1 uses all the threads)
+    :param spatial_index: spatial index of the cloud_xyz points,
+        possibly with removed points (built if None)
     :return: list of the points to filter indexes
     """
-    # compute for each points, all the distances to their k neighbors
-    cloud_tree = cKDTree(cloud_xyz)
-    neighbors_distances, _ = cloud_tree.query(cloud_xyz, k + 1)
-
-    # Compute the mean of those distances for each point
-    # Mean is not used directly as each line
-    #           contained the distance value to the point itself
-    mean_neighbors_distances = np.sum(neighbors_distances, axis=1)
+    nb_points = len(cloud_xyz)
+    if chunk_size is None:
+        chunk_size = max(nb_points, 1)
+    workers = 1 if nb_threads is None else nb_threads
+
+    # compute for each points the mean of the distances to their k neighbors
+    # (the sum is divided by k as each query result contains
+    # the distance value to the point itself)
+    if spatial_index is None:
+        spatial_index = CloudSpatialIndex(cloud_xyz)
+    mean_neighbors_distances = np.empty(nb_points, dtype=np.float64)
+    for start in range(0, nb_points, chunk_size):
+        end = min(start + chunk_size, nb_points)
+        neighbors_distances = spatial_index.query(
+            cloud_xyz[start:end], k + 1, workers
+        )
+        np.sum(
+            neighbors_distances, axis=1, out=mean_neighbors_distances[start:end]
+        )
     mean_neighbors_distances /= k
 
     # compute mean and standard deviation of those mean distances
@@ -618,14 +962,8 @@ def detect_statistical_outliers(
     # compute distance threshold and
     # apply it to determine which points will be removed
     dist_thresh = mean_distances + std_factor * stddev_distances
-    points_to_remove = np.argwhere(mean_neighbors_distances > dist_thresh)
 
-    # flatten points_to_remove
-    detected_points = []
-    for removed_point in points_to_remove:
-        detected_points.extend(removed_point)
-
-    return detected_points
+    return np.flatnonzero(mean_neighbors_distances > dist_thresh).tolist()
 
 
 # ##### common filtering tools ######
@@ -679,18 +1017,20 @@ def filter_cloud(
             cst.POINTS_CLOUD_IDX_IM_EPI,
         ]
 
-        removed_elt_pos_infos = cloud.loc[
-            cloud.index.values[index_elt_to_remove], labels
-        ].values
-
         removed_elt_pos_infos = pandas.DataFrame(
-            removed_elt_pos_infos, columns=labels
+            {
+                label: cloud[label].values[index_elt_to_remove]
+                for label in labels
+            },
+            columns=labels,
         )
     else:
         removed_elt_pos_infos = None
 
     # remove points from the cloud
-    cloud = cloud.drop(index=cloud.index.values[index_elt_to_remove])
+    kept_elt = np.ones(len(cloud), dtype=bool)
+    kept_elt[index_elt_to_remove] = False
+    cloud = cloud[kept_elt]
 
     return cloud, removed_elt_pos_infos
 
@@ -732,11 +1072,20 @@ def add_cloud_filtering_msk(
 
     else:
         elt_index = elt_pos_infos.loc[:, cst.POINTS_CLOUD_IDX_IM_EPI].to_numpy()
+        elt_rows = (
+            elt_pos_infos.loc[:, cst.POINTS_CLOUD_COORD_EPI_GEOM_I]
+            .to_numpy()
+            .astype(np.int64)
+        )
+        elt_cols = (
+            elt_pos_infos.loc[:, cst.POINTS_CLOUD_COORD_EPI_GEOM_J]
+            .to_numpy()
+            .astype(np.int64)
+        )
 
-        min_elt_index = np.min(elt_index)
-        max_elt_index = np.max(elt_index)
-
-        if min_elt_index < 0 or max_elt_index > len(clouds_list) - 1:
+        if elt_index.size > 0 and (
+            np.min(elt_index) < 0 or np.max(elt_index) > len(clouds_list) - 1
+        ):
             raise Exception(
                 "Index indicated in the elt_pos_infos pandas. "
                 "DataFrame is not coherent with the clouds list given in input"
@@ -751,30 +1100,296 @@ def add_cloud_filtering_msk(
             else:
                 msk = cloud_item[mask_label].values
 
-            cur_elt_index = np.argwhere(elt_index == cloud_idx)
+            cur_elt = elt_index == cloud_idx
+            rows = elt_rows[cur_elt]
+            cols = elt_cols[cur_elt]
 
-            for elt_pos in range(cur_elt_index.shape[0]):
-                i = int(
-                    elt_pos_infos.loc[
-                        cur_elt_index[elt_pos],
-                        cst.POINTS_CLOUD_COORD_EPI_GEOM_I,
-                    ].iat[0]
-                )
-                j = int(
-                    elt_pos_infos.loc[
-                        cur_elt_index[elt_pos],
-                        cst.POINTS_CLOUD_COORD_EPI_GEOM_J,
-                    ].iat[0]
+            outside = (
+                (rows < -msk.shape[0])
+                | (rows >= msk.shape[0])
+                | (cols < -msk.shape[1])
+                | (cols >= msk.shape[1])
+            )
+            if np.any(outside):
+                first_outside = np.flatnonzero(outside)[0]
+                raise Exception(
+                    "Point at location ({},{}) is not accessible "
+                    "in an image of size ({},{})".format(
+                        rows[first_outside],
+                        cols[first_outside],
+                        msk.shape[0],
+                        msk.shape[1],
+                    )
                 )
 
-                try:
-                    msk[i, j] = mask_value
-                except Exception as index_error:
-                    raise Exception(
-                        "Point at location ({},{}) is not accessible "
-                        "in an image of size ({},{})".format(
-                            i, j, msk.shape[0], msk.shape[1]
-                        )
-                    ) from index_error
+            msk[rows, cols] = mask_value
 
             cloud_item[mask_label] = ([cst.ROW, cst.COL], msk)
+
+
+def filter_combined_cloud(
+    cloud: pandas.DataFrame,
+    cloud_list: List[xr.Dataset],
+    cloud_epsg: int,
+    small_cpn_filter_params: SmallComponentsFilterParams = None,
+    statistical_filter_params: StatisticalFilterParams = None,
+    nb_threads: int = None,
+    filtered_elt_pos: bool = False,
+) -> Tuple[pandas.DataFrame, Union[None, pandas.DataFrame]]:
+    """
+    Apply the small components and statistical outliers filters
+    to a combined cloud, with a spatial index shared by the filters
+    (its kd-tree is only built by the first filter).
+    The filtered elements masks are added to the clouds of cloud_list
+    if the filters parameters ask for it (see add_cloud_filtering_msk).
+
+    :param cloud: combined cloud, built with the with_coords option
+    :param cloud_list: list of the epipolar clouds combined in cloud
+    :param cloud_epsg: epsg code of the combined cloud
+    :param small_cpn_filter_params: small components filter parameters
+        (the filter is not applied if None)
+    :param statistical_filter_params: statistical outliers filter parameters
+        (the filter is not applied if None)
+    :param nb_threads: number of threads used by the statistical filter
+        neighbors queries (if None, a single thread is used)
+    :param filtered_elt_pos: if filtered_elt_pos is set to True,
+        the removed points positions in their original epipolar images
+        are returned, otherwise it is set to None
+    :return: Tuple made of the filtered cloud and
+        the removed elements positions in their epipolar images
+    """
+    worker_logger = logging.getLogger("distributed.worker")
+
+    if small_cpn_filter_params is None and statistical_filter_params is None:
+        return cloud, None
+
+    spatial_ref = osr.SpatialReference()
+    spatial_ref.ImportFromEPSG(cloud_epsg)
+    if spatial_ref.IsGeographic():
+        worker_logger.warning(
+            "The points cloud to filter is not in a cartographic system. "
+            "The filter's default parameters might not be adapted "
+            "to this referential. Convert the points "
+            "cloud to ECEF to ensure a proper filtering."
+        )
+
+    spatial_index = CloudSpatialIndex(
+        cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
+    )
+    removed_elt_pos = []
+
+    if small_cpn_filter_params is not None:
+        tic = time.process_time()
+        cloud, filtered_elt_pos_infos = small_components_filtering(
+            cloud,
+            small_cpn_filter_params.connection_val,
+            small_cpn_filter_params.nb_pts_threshold,
+            small_cpn_filter_params.clusters_distance_threshold,
+            filtered_elt_pos=filtered_elt_pos
+            or small_cpn_filter_params.filtered_elt_msk,
+            spatial_index=spatial_index,
+            connectivity=small_cpn_filter_params.connectivity,
+        )
+        toc = time.process_time()
+        worker_logger.debug(
+            "Small components cloud filtering done in {} seconds".format(
+                toc - tic
+            )
+        )
+
+        if small_cpn_filter_params.filtered_elt_msk:
+            add_cloud_filtering_msk(
+                cloud_list,
+                filtered_elt_pos_infos,
+                "filtered_elt_mask",
+                small_cpn_filter_params.msk_value,
+            )
+        removed_elt_pos.append(filtered_elt_pos_infos)
+
+    if statistical_filter_params is not None:
+        tic = time.process_time()
+        cloud, filtered_elt_pos_infos = statistical_outliers_filtering(
+            cloud,
+            statistical_filter_params.k,
+            statistical_filter_params.std_dev_factor,
+            filtered_elt_pos=filtered_elt_pos
+            or statistical_filter_params.filtered_elt_msk,
+            nb_threads=nb_threads,
+            spatial_index=spatial_index,
+        )
+        toc = time.process_time()
+        worker_logger.debug(
+            "Statistical cloud filtering done in {} seconds".format(toc - tic)
+        )
+
+        if statistical_filter_params.filtered_elt_msk:
+            add_cloud_filtering_msk(
+                cloud_list,
+                filtered_elt_pos_infos,
+                "filtered_elt_mask",
+                statistical_filter_params.msk_value,
+            )
+        removed_elt_pos.append(filtered_elt_pos_infos)
+
+    if not filtered_elt_pos:
+        return cloud, None
+
+    return cloud, pandas.concat(removed_elt_pos, ignore_index=True)
+
+
+def filter_epipolar_clouds(
+    cloud_list: List[xr.Dataset],
+    small_cpn_filter_params: SmallComponentsFilterParams = None,
+    statistical_filter_params: StatisticalFilterParams = None,
+    nb_threads: int = None,
+):
+    """
+    Filter the whole epipolar clouds of a tile (in-line function):
+    the clouds are combined and filtered together (see filter_combined_cloud)
+    and the removed points are invalidated in the clouds correlation masks,
+    so that they are not combined again by the terrain tiles.
+
+    :param cloud_list: epipolar clouds of a tile
+        (from the reference and the secondary disparity maps)
+    :param small_cpn_filter_params: small components filter parameters
+        (the filter is not applied if None)
+    :param statistical_filter_params: statistical outliers filter parameters
+        (the filter is not applied if None)
+    :param nb_threads: number of threads used by the statistical filter
+        neighbors queries (if None, a single thread is used)
+    """
+    cloud, cloud_epsg = create_combined_cloud(
+        cloud_list, int(cloud_list[0].attrs[cst.EPSG]), with_coords=True
+    )
+    if len(cloud) == 0:
+        return
+
+    _, removed_elt_pos = filter_combined_cloud(
+        cloud,
+        cloud_list,
+        cloud_epsg,
+        small_cpn_filter_params,
+        statistical_filter_params,
+        nb_threads,
+        filtered_elt_pos=True,
+    )
+    if removed_elt_pos is None:
+        return
+
+    elt_index = removed_elt_pos[cst.POINTS_CLOUD_IDX_IM_EPI].values
+    elt_rows = removed_elt_pos[cst.POINTS_CLOUD_COORD_EPI_GEOM_I].values
+    elt_cols = removed_elt_pos[cst.POINTS_CLOUD_COORD_EPI_GEOM_J].values
+    for cloud_idx, cloud_item in enumerate(cloud_list):
+        cur_elt = elt_index == cloud_idx
+        cloud_item[cst.POINTS_CLOUD_CORR_MSK].values[
+            elt_rows[cur_elt], elt_cols[cur_elt]
+        ] = 0
+
+
+# ##### voxel decimation ######
+
+
+def voxel_decimation(
+    cloud: pandas.DataFrame, voxel_size: float
+) -> pandas.DataFrame:
+    """
+    Merge the points of a combined cloud lying in the same voxel
+    into a single weighted point.
+
+    The voxels are cubes of voxel_size side (aligned on the cloud frame
+    origin) and the points with different validity or mask values
+    are not merged. Each merged point has:
+
+        * the weighted mean of the x, y, z and color bands of its voxel points,
+        * the other columns (validity, mask, epipolar positions)
+          of the first point of its voxel,
+        * a cst.POINTS_CLOUD_WEIGHT column value giving the number of points
+          it represents (the sum of their weights if the input cloud
+          is already decimated), used by the rasterization.
+
+    :param cloud: combined cloud
+        as returned by the create_combined_cloud function
+    :param voxel_size: side of the voxels, in cloud CRS units
+        (it should be smaller than the rasterization resolution)
+    :return: the decimated cloud, with the attributes of the input cloud
+    """
+    if cst.POINTS_CLOUD_WEIGHT in cloud.columns:
+        weights = cloud[cst.POINTS_CLOUD_WEIGHT].values.astype(np.float64)
+    else:
+        weights = np.ones(len(cloud), dtype=np.float64)
+
+    first_points, labels = get_voxels_labels(cloud, voxel_size)
+    voxels_weights = np.bincount(
+        labels, weights=weights, minlength=first_points.size
+    )
+
+    decimated = {}
+    for label in cloud.columns:
+        values = cloud[label].values
+        if label in (cst.X, cst.Y, cst.Z) or label.startswith(
+            cst.POINTS_CLOUD_CLR_KEY_ROOT
+        ):
+            decimated[label] = (
+                np.bincount(
+                    labels,
+                    weights=values * weights,
+                    minlength=first_points.size,
+                )
+                / voxels_weights
+            ).astype(values.dtype)
+        elif label != cst.POINTS_CLOUD_WEIGHT:
+            decimated[label] = values[first_points]
+    decimated[cst.POINTS_CLOUD_WEIGHT] = voxels_weights.astype(np.float32)
+
+    pd_cloud = pandas.DataFrame(decimated, columns=list(decimated), copy=False)
+    pd_cloud.attrs.update(cloud.attrs)
+
+    return pd_cloud
+
+
+def get_voxels_labels(
+    cloud: pandas.DataFrame, voxel_size: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Label the points of a combined cloud by voxel
+    (see the voxel_decimation function).
+
+    :param cloud: combined cloud
+        as returned by the create_combined_cloud function
+    :param voxel_size: side of the voxels, in cloud CRS units
+    :return: the index of the first point of each voxel
+        and the voxel label of each point
+    """
+    if len(cloud) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    keys = [
+        np.floor(cloud[coord].values / voxel_size).astype(np.int64)
+        for coord in (cst.X, cst.Y, cst.Z)
+    ]
+    keys.append(cloud[cst.POINTS_CLOUD_VALID_DATA].values.astype(np.int64))
+    if cst.POINTS_CLOUD_MSK in cloud.columns:
+        keys.append(cloud[cst.POINTS_CLOUD_MSK].values.astype(np.int64))
+
+    # use a single linear key when the voxels ranges allow it
+    keys_sizes = []
+    for key in keys:
+        key -= np.min(key)
+        keys_sizes.append(int(np.max(key)) + 1)
+
+    if np.prod(keys_sizes, dtype=object) < np.iinfo(np.int64).max:
+        linear_keys = keys[0]
+        for key, key_size in zip(keys[1:], keys_sizes[1:]):
+            linear_keys = linear_keys * key_size + key
+        _, first_points, labels = np.unique(
+            linear_keys, return_index=True, return_inverse=True
+        )
+    else:
+        _, first_points, labels = np.unique(
+            np.stack(keys, axis=1),
+            axis=0,
+            return_index=True,
+            return_inverse=True,
+        )
+
+    return first_points, labels.reshape(-1)
@@ -26,8 +26,11 @@ TODO: refactor in several files and remove too-many-lines
 # pylint: disable=too-many-lines
 
 # Standard imports
+import hashlib
 import logging
 import math
+import os
+import tempfile
 import time
 import warnings
 from typing import List, Tuple, Union
@@ -36,18 +39,33 @@ from typing import List, Tuple, Union
 import numpy as np
 import pandas
 import xarray as xr
-from numba import boolean, float64, int64, njit
+from numba import boolean, float32, float64, int64, njit, prange, uint16
 from numba.core.errors import NumbaPerformanceWarning
-from osgeo import osr
 from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
 
 # CARS imports
 from cars.core import constants as cst
-from cars.core import projection
+from cars.core import projection, utils
 from cars.steps import points_cloud
 
 warnings.filterwarnings("ignore", category=NumbaPerformanceWarning)
 
+# neighbors search engines
+KDTREE_NEIGHBORS_SEARCH = "kdtree"
+GRID_BINS_NEIGHBORS_SEARCH = "grid_bins"
+NEIGHBORS_SEARCH_ENGINES = [KDTREE_NEIGHBORS_SEARCH, GRID_BINS_NEIGHBORS_SEARCH]
+
+# output layers
+DSM_LAYER = "dsm"
+CLR_LAYER = "clr"
+MSK_LAYER = "msk"
+MEAN_LAYER = "mean"
+STD_LAYER = "std"
+N_PTS_LAYER = "n_pts"
+PTS_IN_CELL_LAYER = "pts_in_cell"
+STATS_LAYERS = [MEAN_LAYER, STD_LAYER, N_PTS_LAYER, PTS_IN_CELL_LAYER]
+OUTPUT_LAYERS = [DSM_LAYER, CLR_LAYER, MSK_LAYER] + STATS_LAYERS
+
 
 def compute_xy_starts_and_sizes(
     resolution: float, cloud: pandas.DataFrame
@@ -64,9 +82,11 @@ def compute_xy_starts_and_sizes(
     """
     worker_logger = logging.getLogger("distributed.worker")
 
+    x_origin, y_origin, _ = points_cloud.get_cloud_origin(cloud)
+
     # Derive xstart
-    xmin = np.nanmin(cloud[cst.X].values)
-    xmax = np.nanmax(cloud[cst.X].values)
+    xmin = np.nanmin(cloud[cst.X].values) + x_origin
+    xmax = np.nanmax(cloud[cst.X].values) + x_origin
     worker_logger.debug("Points x coordinate range: [{},{}]".format(xmin, xmax))
 
     # Clamp to a regular grid
@@ -74,8 +94,8 @@ def compute_xy_starts_and_sizes(
     x_size = int(1 + np.floor((xmax - x_start) / resolution))
 
     # Derive ystart
-    ymin = np.nanmin(cloud[cst.Y].values)
-    ymax = np.nanmax(cloud[cst.Y].values)
+    ymin = np.nanmin(cloud[cst.Y].values) + y_origin
+    ymax = np.nanmax(cloud[cst.Y].values) + y_origin
     worker_logger.debug("Points y coordinate range: [{},{}]".format(ymin, ymax))
 
     # Clamp to a regular grid
@@ -108,6 +128,13 @@ def simple_rasterization_dataset(
         None, points_cloud.StatisticalFilterParams
     ] = None,
     dump_filter_cloud: bool = False,
+    neighbors_search: str = KDTREE_NEIGHBORS_SEARCH,
+    nb_threads: int = None,
+    accumulator_mode: bool = False,
+    reduced_precision: bool = False,
+    output_layers: List[str] = None,
+    neighbors_cache_dir: str = None,
+    decimation_voxel_size: float = None,
 ) -> Union[xr.Dataset, Tuple[xr.Dataset, pandas.DataFrame]]:
     """
     Wrapper of simple_rasterization
@@ -143,6 +170,27 @@ def simple_rasterization_dataset(
     :param statistical_filter_params: statistical points_cloud parameters
     :param dump_filter_cloud: activate to dump filtered cloud
         alongside rasterized cloud and color
+    :param neighbors_search: neighbors search engine to use,
+        one of NEIGHBORS_SEARCH_ENGINES
+    :param nb_threads: number of threads used by the interpolation kernels
+        and the statistical filter neighbors queries
+        (-1 for all the threads, if None or 1 the serial kernels are used)
+    :param accumulator_mode: activate to rasterize the cloud with
+        per cell accumulators instead of neighbors lists
+    :param reduced_precision: activate to combine, filter and rasterize
+        the clouds in float32 (with the x, y, z coordinates stored as
+        offsets from an origin, see points_cloud.create_combined_cloud)
+    :param output_layers: layers to compute, among OUTPUT_LAYERS
+        (if None, all the layers are computed).
+        The colors are not combined if CLR_LAYER is not requested.
+    :param neighbors_cache_dir: directory where the neighbors of the
+        rasterization grid points are saved and reloaded from
+        (if None, no cache is used)
+    :param decimation_voxel_size: side of the voxels in which the filtered
+        cloud points are merged before the rasterization, in meters: the
+        voxels are in the points clouds referential if it is projected,
+        else in ECEF (if None, the cloud is not decimated,
+        see points_cloud.voxel_decimation)
     :return: Rasterized cloud and Color
         (in a tuple with the filtered cloud if dump_filter_cloud is activated)
     """
@@ -160,6 +208,9 @@ def simple_rasterization_dataset(
         and xsize is not None
         and ysize is not None
     )
+    if output_layers is not None and CLR_LAYER not in output_layers:
+        color_list = None
+
     cloud, cloud_epsg = points_cloud.create_combined_cloud(
         cloud_list,
         epsg,
@@ -173,81 +224,43 @@ def simple_rasterization_dataset(
         epipolar_border_margin=margin,
         radius=radius,
         with_coords=True,
+        reduced_precision=reduced_precision,
     )
 
     # filter combined cloud
-    if small_cpn_filter_params is not None:
-        worker_logger = logging.getLogger("distributed.worker")
-
-        spatial_ref = osr.SpatialReference()
-        spatial_ref.ImportFromEPSG(cloud_epsg)
-        if spatial_ref.IsGeographic():
-            worker_logger.warning(
-                "The points cloud to filter is not in a cartographic system. "
-                "The filter's default parameters might not be adapted "
-                "to this referential. Convert the points "
-                "cloud to ECEF to ensure a proper points_cloud."
-            )
-        tic = time.process_time()
-        cloud, filtered_elt_pos_infos = points_cloud.small_components_filtering(
-            cloud,
-            small_cpn_filter_params.connection_val,
-            small_cpn_filter_params.nb_pts_threshold,
-            small_cpn_filter_params.clusters_distance_threshold,
-            filtered_elt_pos=small_cpn_filter_params.filtered_elt_msk,
-        )
-        toc = time.process_time()
-        worker_logger.debug(
-            "Small components cloud filtering done in {} seconds".format(
-                toc - tic
-            )
-        )
-
-        if small_cpn_filter_params.filtered_elt_msk:
-            points_cloud.add_cloud_filtering_msk(
-                cloud_list,
-                filtered_elt_pos_infos,
-                "filtered_elt_mask",
-                small_cpn_filter_params.msk_value,
-            )
+    cloud, _ = points_cloud.filter_combined_cloud(
+        cloud,
+        cloud_list,
+        cloud_epsg,
+        small_cpn_filter_params,
+        statistical_filter_params,
+        nb_threads,
+    )
 
-    if statistical_filter_params is not None:
-        worker_logger = logging.getLogger("distributed.worker")
-
-        spatial_ref = osr.SpatialReference()
-        spatial_ref.ImportFromEPSG(cloud_epsg)
-        if spatial_ref.IsGeographic():
-            worker_logger.warning(
-                "The points cloud to filter is not in a cartographic system. "
-                "The filter's default parameters might not be adapted "
-                "to this referential. Convert the points "
-                "cloud to ECEF to ensure a proper filtering."
+    # merge the filtered points in sub-resolution voxels, expressed in
+    # a metric referential (the filters one, see get_cloud_filtering_epsg)
+    if decimation_voxel_size is not None:
+        decimation_epsg = projection.get_cloud_filtering_epsg(cloud_epsg)
+        if cloud_epsg != decimation_epsg:
+            projection.points_cloud_conversion_dataframe(
+                cloud, cloud_epsg, decimation_epsg, nb_threads
             )
+            cloud_epsg = decimation_epsg
         tic = time.process_time()
-        (
-            cloud,
-            filtered_elt_pos_infos,
-        ) = points_cloud.statistical_outliers_filtering(
-            cloud,
-            statistical_filter_params.k,
-            statistical_filter_params.std_dev_factor,
-            filtered_elt_pos=statistical_filter_params.filtered_elt_msk,
-        )
+        nb_points = len(cloud)
+        cloud = points_cloud.voxel_decimation(cloud, decimation_voxel_size)
         toc = time.process_time()
-        worker_logger.debug(
-            "Statistical cloud filtering done in {} seconds".format(toc - tic)
+        logging.getLogger("distributed.worker").debug(
+            "Voxel decimation from {} to {} points done in {} seconds".format(
+                nb_points, len(cloud), toc - tic
+            )
         )
 
-        if statistical_filter_params.filtered_elt_msk:
-            points_cloud.add_cloud_filtering_msk(
-                cloud_list,
-                filtered_elt_pos_infos,
-                "filtered_elt_mask",
-                statistical_filter_params.msk_value,
-            )
     # If the points cloud is not in the right epsg referential, it is converted
     if cloud_epsg != epsg:
-        projection.points_cloud_conversion_dataframe(cloud, cloud_epsg, epsg)
+        projection.points_cloud_conversion_dataframe(
+            cloud, cloud_epsg, epsg, nb_threads
+        )
 
     # compute roi from the combined clouds if it is not set
     if not roi:
@@ -270,6 +283,11 @@ def simple_rasterization_dataset(
         color_no_data=color_no_data,
         msk_no_data=msk_no_data,
         grid_points_division_factor=grid_points_division_factor,
+        neighbors_search=neighbors_search,
+        nb_threads=nb_threads,
+        accumulator_mode=accumulator_mode,
+        output_layers=output_layers,
+        neighbors_cache_dir=neighbors_cache_dir,
     )
 
     if dump_filter_cloud:
@@ -484,6 +502,406 @@ def get_flatten_neighbors(
     return neighbors_id, start_ids, n_count
 
 
+@njit(
+    (float64[:], float64[:], float64, float64, int64, int64, float64, int64),
+    nogil=True,
+    cache=True,
+)
+def compute_points_bins(
+    x_coords: np.ndarray,
+    y_coords: np.ndarray,
+    x_start: float,
+    y_start: float,
+    x_size: int,
+    y_size: int,
+    resolution: float,
+    radius: int,
+) -> np.ndarray:
+    """
+    Compute the index of the rasterization grid cell (bin) containing
+    each point. The grid is extended by radius cells on each side
+    so that every point which can be a neighbor of a grid point is binned.
+
+    :param x_coords: points x coordinates
+    :param y_coords: points y coordinates
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param radius: Radius for hole filling.
+    :return: the bin index of each point in the extended grid
+        (-1 if the point is outside of it)
+    """
+    bins_x_size = x_size + 2 * radius
+    points_bins = np.full(x_coords.size, -1, dtype=np.int64)
+
+    for idx in range(x_coords.size):
+        col = np.floor((x_coords[idx] - x_start) / resolution)
+        row = np.floor((y_start - y_coords[idx]) / resolution)
+
+        # NaN coordinates fail the tests and stay out of the bins
+        inside_cols = -radius <= col < x_size + radius
+        inside_rows = -radius <= row < y_size + radius
+        if inside_cols and inside_rows:
+            points_bins[idx] = (int(row) + radius) * bins_x_size + (
+                int(col) + radius
+            )
+
+    return points_bins
+
+
+@njit(
+    (
+        float64[:, :],
+        int64[:],
+        int64[:],
+        float64[:, :],
+        int64,
+        int64,
+        float64,
+        int64,
+        boolean,
+        int64[:],
+    ),
+    nogil=True,
+    cache=True,
+)
+def grid_bins_neighbors(
+    points_xy: np.ndarray,
+    bins_start: np.ndarray,
+    bins_points: np.ndarray,
+    grid_points: np.ndarray,
+    x_size: int,
+    y_size: int,
+    resolution: float,
+    radius: int,
+    count_only: bool,
+    neighbors_id: np.ndarray,
+) -> np.ndarray:
+    """
+    Gather the cloud points which are at most (radius + 0.5) * resolution
+    away from each grid point by only visiting the (2 * radius + 1)²
+    bins surrounding its cell.
+
+    This function is called twice: a first time with count_only set to True
+    to get the number of neighbors of each grid point, then a second time to
+    fill the neighbors_id array allocated with the right size.
+
+    :param points_xy: points (x, y) coordinates, one point per row
+    :param bins_start: start index of each bin in bins_points
+        (CSR layout, one more element than the number of bins)
+    :param bins_points: points indexes sorted by bin
+    :param grid_points: grid point location, one per row.
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param radius: Radius for hole filling.
+    :param count_only: only count the neighbors of each grid point
+    :param neighbors_id: flattened neighbors ids list to fill
+        (not used if count_only is True)
+    :return: the number of neighbors of each grid point
+    """
+    bins_x_size = x_size + 2 * radius
+    max_dist = ((radius + 0.5) * resolution) ** 2
+    n_count = np.zeros(x_size * y_size, dtype=np.int64)
+
+    n_filled = 0
+    for row in range(y_size):
+        for col in range(x_size):
+            i_grid = row * x_size + col
+            x_sample = grid_points[i_grid, 0]
+            y_sample = grid_points[i_grid, 1]
+
+            # in the extended grid, the bins surrounding the cell (row, col)
+            # go from (row, col) to (row + 2 * radius, col + 2 * radius)
+            for bin_row in range(row, row + 2 * radius + 1):
+                for bin_col in range(col, col + 2 * radius + 1):
+                    bin_idx = bin_row * bins_x_size + bin_col
+                    for pos in range(
+                        bins_start[bin_idx], bins_start[bin_idx + 1]
+                    ):
+                        point_idx = bins_points[pos]
+                        x_vec = points_xy[point_idx, 0] - x_sample
+                        y_vec = points_xy[point_idx, 1] - y_sample
+                        if x_vec * x_vec + y_vec * y_vec <= max_dist:
+                            if not count_only:
+                                neighbors_id[n_filled] = point_idx
+                            n_filled += 1
+                            n_count[i_grid] += 1
+
+    return n_count
+
+
+def get_flatten_neighbors_from_grid_bins(
+    grid_points: np.ndarray,
+    cloud: pandas.DataFrame,
+    x_start: float,
+    y_start: float,
+    x_size: int,
+    y_size: int,
+    radius: int,
+    resolution: float,
+    worker_logger: logging.Logger,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the grid point neighbors of the cloud as flatten array
+    using the regularity of the rasterization grid instead of kD-trees.
+
+    The cloud points are binned in the grid cells with integer arithmetic
+    and indexed by cell (CSR layout). The neighbors of each grid point are
+    then searched in the (2 * radius + 1)² bins surrounding its cell.
+    The neighborhood is the same as the one of the get_flatten_neighbors
+    function, the outputs only differ by the order of the neighbors
+    of each grid point.
+
+    :param grid_points: Grid points
+    :param cloud: Combined cloud
+        as returned by the create_combined_cloud function
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :param radius: Radius for hole filling.
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param worker_logger: logger
+    :return: the flattened neighbors ids list, the list start index for each
+        grid point and the list of neighbors count for each grid point.
+    """
+    # Bin the cloud points in the (extended) rasterization grid cells
+    tic = time.process_time()
+    points_xy = np.ascontiguousarray(
+        cloud.loc[:, [cst.X, cst.Y]].values, dtype=np.float64
+    )
+    points_bins = compute_points_bins(
+        points_xy[:, 0].copy(),
+        points_xy[:, 1].copy(),
+        float(x_start),
+        float(y_start),
+        int(x_size),
+        int(y_size),
+        float(resolution),
+        int(radius),
+    )
+
+    # Index the points by bin (CSR layout)
+    nb_bins = (x_size + 2 * radius) * (y_size + 2 * radius)
+    binned_points = np.flatnonzero(points_bins >= 0)
+    binned_points_bins = points_bins[binned_points]
+    bins_points = binned_points[
+        np.argsort(binned_points_bins, kind="stable")
+    ].astype(np.int64)
+    bins_start = np.zeros(nb_bins + 1, dtype=np.int64)
+    bins_start[1:] = np.cumsum(
+        np.bincount(binned_points_bins, minlength=nb_bins)
+    )
+    toc = time.process_time()
+    worker_logger.debug(
+        "Neighbors search: Points binned in {} seconds".format(toc - tic)
+    )
+
+    # Count, allocate and fill the neighbors of each grid point
+    tic = time.process_time()
+    grid_points = np.ascontiguousarray(grid_points, dtype=np.float64)
+    search_args = (
+        points_xy,
+        bins_start,
+        bins_points,
+        grid_points,
+        int(x_size),
+        int(y_size),
+        float(resolution),
+        int(radius),
+    )
+    n_count = grid_bins_neighbors(
+        *search_args, True, np.zeros(0, dtype=np.int64)
+    )
+    neighbors_id = np.zeros(np.sum(n_count), dtype=np.int64)
+    grid_bins_neighbors(*search_args, False, neighbors_id)
+    toc = time.process_time()
+    worker_logger.debug(
+        "Neighbors search: Neighborhood query done in {} seconds".format(
+            toc - tic
+        )
+    )
+
+    # compute starts indexes of each grid points
+    start_ids = np.cumsum(np.concatenate(([0], n_count[:-1])))
+
+    return neighbors_id, start_ids, n_count
+
+
+def search_flatten_neighbors(
+    grid_points: np.ndarray,
+    cloud: pandas.DataFrame,
+    x_start: float,
+    y_start: float,
+    x_size: int,
+    y_size: int,
+    radius: int,
+    resolution: float,
+    worker_logger: logging.Logger,
+    grid_points_division_factor: int = None,
+    neighbors_search: str = KDTREE_NEIGHBORS_SEARCH,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the grid point neighbors of the cloud as flatten array
+    with the chosen neighbors search engine.
+
+    :param grid_points: Grid points
+    :param cloud: Combined cloud
+        as returned by the create_combined_cloud function
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :param radius: Radius for hole filling.
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units or None.
+    :param worker_logger: logger
+    :param grid_points_division_factor: number of blocs to use to divide
+        the grid points (only used by the kd-tree neighbors search)
+    :param neighbors_search: neighbors search engine to use,
+        one of NEIGHBORS_SEARCH_ENGINES
+    :return: the flattened neighbors ids list, the list start index for each
+        grid point and the list of neighbors count for each grid point.
+    """
+    if neighbors_search == GRID_BINS_NEIGHBORS_SEARCH:
+        return get_flatten_neighbors_from_grid_bins(
+            grid_points,
+            cloud,
+            x_start,
+            y_start,
+            x_size,
+            y_size,
+            radius,
+            resolution,
+            worker_logger,
+        )
+
+    if neighbors_search == KDTREE_NEIGHBORS_SEARCH:
+        return get_flatten_neighbors(
+            grid_points,
+            cloud,
+            radius,
+            resolution,
+            worker_logger,
+            grid_points_division_factor,
+        )
+
+    raise NotImplementedError(
+        "{} neighbors search is not implemented".format(neighbors_search)
+    )
+
+
+def get_neighbors_cache_file(
+    neighbors_cache_dir: str,
+    cloud: pandas.DataFrame,
+    x_start: float,
+    y_start: float,
+    x_size: int,
+    y_size: int,
+    radius: int,
+    resolution: float,
+    neighbors_search: str,
+) -> str:
+    """
+    Get the neighbors cache file of a rasterization grid. Its name is a hash
+    of the grid, the radius, the neighbors search engine and the cloud
+    points planimetric coordinates, so that the neighbors are only reused
+    for an unchanged cloud and grid.
+
+    :param neighbors_cache_dir: neighbors cache directory
+    :param cloud: Combined cloud
+        as returned by the create_combined_cloud function
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :param radius: Radius for hole filling.
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units or None.
+    :param neighbors_search: neighbors search engine,
+        one of NEIGHBORS_SEARCH_ENGINES
+    :return: the path of the neighbors cache file
+    """
+    neighbors_hash = hashlib.sha256()
+    neighbors_hash.update(
+        repr(
+            (
+                x_start,
+                y_start,
+                x_size,
+                y_size,
+                radius,
+                resolution,
+                neighbors_search,
+            )
+        ).encode()
+    )
+    coords = np.ascontiguousarray(cloud.loc[:, [cst.X, cst.Y]].values)
+    neighbors_hash.update(str(coords.dtype).encode())
+    neighbors_hash.update(coords.tobytes())
+
+    return os.path.join(
+        neighbors_cache_dir,
+        "neighbors_{}.npz".format(neighbors_hash.hexdigest()),
+    )
+
+
+def save_neighbors(
+    neighbors_file: str,
+    neighbors_id: np.ndarray,
+    start_ids: np.ndarray,
+    n_count: np.ndarray,
+):
+    """
+    Save the flattened neighbors of the grid points in a cache file.
+    The file is written in a temporary file first so that a concurrent
+    reader never loads a partially written cache file.
+
+    :param neighbors_file: path of the neighbors cache file
+    :param neighbors_id: flattened neighbors ids list
+    :param start_ids: list start index for each grid point
+    :param n_count: list of neighbors count for each grid point
+    """
+    neighbors_cache_dir = os.path.dirname(neighbors_file)
+    os.makedirs(neighbors_cache_dir, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile(
+        dir=neighbors_cache_dir, suffix=".npz", delete=False
+    ) as tmp_file:
+        np.savez(
+            tmp_file,
+            neighbors_id=neighbors_id,
+            start_ids=start_ids,
+            n_count=n_count,
+        )
+    os.replace(tmp_file.name, neighbors_file)
+
+
+def load_neighbors(
+    neighbors_file: str,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load the flattened neighbors of the grid points from a cache file
+    written by save_neighbors()
+
+    :param neighbors_file: path of the neighbors cache file
+    :return: the flattened neighbors ids list, the list start index for each
+        grid point and the list of neighbors count for each grid point.
+    """
+    with np.load(neighbors_file) as neighbors:
+        return (
+            neighbors["neighbors_id"],
+            neighbors["start_ids"],
+            neighbors["n_count"],
+        )
+
+
 def compute_vector_raster_and_stats(
     cloud: pandas.DataFrame,
     data_valid: np.ndarray,
@@ -497,12 +915,16 @@ def compute_vector_raster_and_stats(
     msk_no_data: int,
     worker_logger: logging.Logger,
     grid_points_division_factor: int,
+    neighbors_search: str = KDTREE_NEIGHBORS_SEARCH,
+    nb_threads: int = None,
+    output_layers: List[str] = None,
+    neighbors_cache_dir: str = None,
 ) -> Tuple[
     np.ndarray,
-    np.ndarray,
-    np.ndarray,
-    np.ndarray,
-    np.ndarray,
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
     Union[None, np.ndarray],
 ]:
     """
@@ -529,8 +951,22 @@ def compute_vector_raster_and_stats(
         the grid points (memory optimization, reduce the highest memory peak).
         If it is not set, the factor is automatically set
         to construct 700000 points blocs.
-    :return: a tuple with rasterization results and statistics.
+        (only used by the kd-tree neighbors search)
+    :param neighbors_search: neighbors search engine to use,
+        one of NEIGHBORS_SEARCH_ENGINES
+    :param nb_threads: number of threads used by the interpolation kernels
+        (-1 for all the threads, if None or 1 the serial kernels are used)
+    :param output_layers: layers to compute, among OUTPUT_LAYERS
+        (if None, all the layers are computed)
+    :param neighbors_cache_dir: directory where the neighbors of the grid
+        points are saved, to be reloaded when the same cloud is rasterized
+        on the same grid with the same radius (if None, no cache is used)
+    :return: a tuple with rasterization results and statistics
+        (None for the layers which are not computed).
     """
+    if output_layers is None:
+        output_layers = OUTPUT_LAYERS
+
     # Build a grid of cell centers coordinates
     tic = time.process_time()
     grid_points = compute_grid_points(
@@ -541,16 +977,43 @@ def compute_vector_raster_and_stats(
         "Cell centers array built in {} seconds".format(toc - tic)
     )
 
-    # Search for neighbors
+    # Search for neighbors (or reload them from the cache)
     tic = time.process_time()
-    neighbors_id, start_ids, n_count = get_flatten_neighbors(
-        grid_points,
-        cloud,
-        radius,
-        resolution,
-        worker_logger,
-        grid_points_division_factor,
-    )
+    neighbors_file = None
+    if neighbors_cache_dir is not None:
+        neighbors_file = get_neighbors_cache_file(
+            neighbors_cache_dir,
+            cloud,
+            x_start,
+            y_start,
+            x_size,
+            y_size,
+            radius,
+            resolution,
+            neighbors_search,
+        )
+
+    if neighbors_file is not None and os.path.exists(neighbors_file):
+        neighbors_id, start_ids, n_count = load_neighbors(neighbors_file)
+        worker_logger.debug(
+            "Neighbors loaded from cache file {}".format(neighbors_file)
+        )
+    else:
+        neighbors_id, start_ids, n_count = search_flatten_neighbors(
+            grid_points,
+            cloud,
+            x_start,
+            y_start,
+            x_size,
+            y_size,
+            radius,
+            resolution,
+            worker_logger,
+            grid_points_division_factor,
+            neighbors_search,
+        )
+        if neighbors_file is not None:
+            save_neighbors(neighbors_file, neighbors_id, start_ids, n_count)
     toc = time.process_time()
     worker_logger.debug(
         "Total neighbors search done in {} seconds".format(toc - tic)
@@ -558,52 +1021,302 @@ def compute_vector_raster_and_stats(
 
     # perform rasterization with gaussian interpolation
     tic = time.process_time()
-    clr_bands = [
-        band
-        for band in cloud
-        if str.find(band, cst.POINTS_CLOUD_CLR_KEY_ROOT) >= 0
-    ]
-    cloud_band = [cst.X, cst.Y, cst.Z]
-    cloud_band.extend(clr_bands)
+    cloud_band = get_interpolated_bands(cloud, output_layers)
 
-    out, mean, stdev, n_pts, n_in_cell = gaussian_interp(
-        cloud.loc[:, cloud_band].values,
-        data_valid.astype(bool),
-        neighbors_id,
-        start_ids,
-        n_count,
-        grid_points,
-        resolution,
-        sigma,
-    )
-    toc = time.process_time()
-    worker_logger.debug(
-        "Vectorized rasterization done in {} seconds".format(toc - tic)
-    )
+    # choose serial or multi-threaded interpolation kernels
+    with utils.numba_threads(nb_threads) as parallel:
+        if parallel:
+            interp_func = gaussian_interp_parallel
+            mask_interp_func = mask_interp_parallel
+        else:
+            interp_func = gaussian_interp
+            mask_interp_func = mask_interp
 
-    if cst.POINTS_CLOUD_MSK in cloud.columns:
-        msk = mask_interp(
-            cloud.loc[:, [cst.X, cst.Y, cst.POINTS_CLOUD_MSK]].values,
-            data_valid.astype(np.bool),
+        out, mean, stdev, n_pts, n_in_cell = interp_func(
+            cloud.loc[:, cloud_band].values,
+            data_valid.astype(bool),
+            get_points_weights(cloud),
             neighbors_id,
             start_ids,
             n_count,
             grid_points,
+            resolution,
             sigma,
-            no_data_val=msk_no_data,
-            undefined_val=msk_no_data,
+            MEAN_LAYER in output_layers,
+            STD_LAYER in output_layers,
+            N_PTS_LAYER in output_layers,
+            PTS_IN_CELL_LAYER in output_layers,
+        )
+        toc = time.process_time()
+        worker_logger.debug(
+            "Vectorized rasterization done in {} seconds".format(toc - tic)
         )
-    else:
-        msk = None
 
-    return out, mean, stdev, n_pts, n_in_cell, msk
+        if cst.POINTS_CLOUD_MSK in cloud.columns and MSK_LAYER in output_layers:
+            msk = mask_interp_func(
+                cloud.loc[:, [cst.X, cst.Y, cst.POINTS_CLOUD_MSK]].values,
+                data_valid.astype(np.bool),
+                neighbors_id,
+                start_ids,
+                n_count,
+                grid_points,
+                sigma,
+                no_data_val=msk_no_data,
+                undefined_val=msk_no_data,
+            )
+        else:
+            msk = None
 
+    return (
+        out,
+        mean if MEAN_LAYER in output_layers else None,
+        stdev if STD_LAYER in output_layers else None,
+        n_pts if N_PTS_LAYER in output_layers else None,
+        n_in_cell if PTS_IN_CELL_LAYER in output_layers else None,
+        msk,
+    )
 
-@njit(
-    (float64[:, :], boolean[:], int64, int64[:], int64[:], int64[:]),
-    nogil=True,
-    cache=True,
-)
+
+def get_interpolated_bands(
+    cloud: pandas.DataFrame, output_layers: List[str]
+) -> List[str]:
+    """
+    Get the cloud columns to interpolate: the points coordinates
+    followed by the color bands if the CLR_LAYER output layer is requested.
+
+    :param cloud: Combined cloud
+        as returned by the create_combined_cloud function
+    :param output_layers: requested output layers, among OUTPUT_LAYERS
+    :return: the x, y, z and color bands columns labels
+    """
+    cloud_band = [cst.X, cst.Y, cst.Z]
+    if CLR_LAYER in output_layers:
+        cloud_band.extend(
+            [
+                band
+                for band in cloud
+                if str.find(band, cst.POINTS_CLOUD_CLR_KEY_ROOT) >= 0
+            ]
+        )
+
+    return cloud_band
+
+
+def get_points_weights(cloud: pandas.DataFrame) -> np.ndarray:
+    """
+    Get the points weights of a decimated cloud
+    (see the points_cloud.voxel_decimation function).
+
+    :param cloud: Combined cloud
+        as returned by the create_combined_cloud function
+    :return: the float64 points weights
+        (empty if the cloud points are not weighted)
+    """
+    if cst.POINTS_CLOUD_WEIGHT in cloud.columns:
+        return cloud[cst.POINTS_CLOUD_WEIGHT].values.astype(np.float64)
+
+    return np.empty(0, dtype=np.float64)
+
+
+def compute_vector_raster_and_stats_with_accumulators(
+    cloud: pandas.DataFrame,
+    data_valid: np.ndarray,
+    x_start: float,
+    y_start: float,
+    x_size: int,
+    y_size: int,
+    resolution: float,
+    sigma: float,
+    radius: int,
+    msk_no_data: int,
+    worker_logger: logging.Logger,
+    points_chunk_size: int = 1000000,
+    output_layers: List[str] = None,
+) -> Tuple[
+    np.ndarray,
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
+    Union[None, np.ndarray],
+]:
+    """
+    Compute vectorized raster and its statistics
+    with per cell accumulators instead of neighbors lists.
+
+    The cloud is streamed by chunks of points_chunk_size points
+    in two passes: the first one computes the minimal neighbor distance
+    of each cell (needed by the gaussian weights) and the second one
+    accumulates the weighted sums, counts and Welford's mean and variance
+    of each cell. The peak memory thus scales with the rasterization grid
+    size and not with the number of points times the number of neighbors.
+
+    The outputs are the same as the compute_vector_raster_and_stats ones
+    (up to floating point rounding).
+
+    :param cloud: Combined cloud
+        as returned by the create_combined_cloud function
+    :param data_valid: mask of points
+        which are not on the border of its original epipolar image.
+        To compute a cell it has to have at least one data valid,
+        for which case it is considered that no contributing
+        points from other neighbor tiles are missing.
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units or None.
+    :param sigma: Sigma for gaussian interpolation. If None, set to resolution
+    :param radius: Radius for hole filling.
+    :param msk_no_data: No data value to use for the rasterized mask
+    :param worker_logger: Logger
+    :param points_chunk_size: number of points accumulated at once
+    :param output_layers: layers to compute, among OUTPUT_LAYERS
+        (if None, all the layers are computed). The statistics are
+        accumulated in any case but only the requested ones are returned.
+    :return: a tuple with rasterization results and statistics
+        (None for the layers which are not computed).
+    """
+    if output_layers is None:
+        output_layers = OUTPUT_LAYERS
+
+    x_values_1d, y_values_1d = compute_values_1d(
+        x_start, y_start, x_size, y_size, resolution
+    )
+    nb_cells = x_size * y_size
+    nb_points = cloud.shape[0]
+    data_valid = data_valid.astype(bool)
+
+    cloud_band = get_interpolated_bands(cloud, output_layers)
+    nb_layers = len(cloud_band) - 2
+    points_weights = get_points_weights(cloud)
+
+    chunks = range(0, nb_points, points_chunk_size)
+    acc_args = (
+        x_values_1d,
+        y_values_1d,
+        float(x_start),
+        float(y_start),
+        float(resolution),
+        int(radius),
+    )
+
+    # First pass: minimal distance and validity of each cell
+    tic = time.process_time()
+    min_dist = np.full(nb_cells, np.inf, dtype=np.float64)
+    has_valid = np.zeros(nb_cells, dtype=bool)
+    for start in chunks:
+        points = cloud.iloc[start : start + points_chunk_size].loc[
+            :, [cst.X, cst.Y]
+        ]
+        accumulate_min_distances(
+            np.ascontiguousarray(points.values, dtype=np.float64),
+            np.ascontiguousarray(data_valid[start : start + points_chunk_size]),
+            *acc_args,
+            min_dist,
+            has_valid,
+        )
+
+    # Second pass: weighted sums and statistics of each cell
+    weighted_sums = np.zeros((nb_cells, nb_layers), dtype=np.float64)
+    weights_sums = np.zeros(nb_cells, dtype=np.float64)
+    counts = np.zeros(nb_cells, dtype=np.float64)
+    counts_in_cell = np.zeros(nb_cells, dtype=np.float64)
+    means = np.zeros((nb_cells, nb_layers), dtype=np.float64)
+    squares_sums = np.zeros((nb_cells, nb_layers), dtype=np.float64)
+    for start in chunks:
+        points = cloud.iloc[start : start + points_chunk_size].loc[
+            :, cloud_band
+        ]
+        accumulate_points(
+            np.ascontiguousarray(points.values, dtype=np.float64),
+            points_weights[start : start + points_chunk_size],
+            *acc_args,
+            float(sigma),
+            min_dist,
+            weighted_sums,
+            weights_sums,
+            counts,
+            counts_in_cell,
+            means,
+            squares_sums,
+        )
+    toc = time.process_time()
+    worker_logger.debug(
+        "Points accumulation done in {} seconds".format(toc - tic)
+    )
+
+    # Finalize the rasters with one row per layer
+    # (cells without valid neighbors are not computed)
+    out = np.full((nb_layers, nb_cells), np.nan, dtype=np.float32)
+    mean = np.full((nb_layers, nb_cells), np.nan, dtype=np.float32)
+    stdev = np.full((nb_layers, nb_cells), np.nan, dtype=np.float32)
+    out[:, has_valid] = (
+        weighted_sums[has_valid] / weights_sums[has_valid, None]
+    ).T
+    mean[:, has_valid] = means[has_valid].T
+    stdev[:, has_valid] = np.sqrt(
+        squares_sums[has_valid] / counts[has_valid, None]
+    ).T
+    n_pts = np.where(has_valid, counts, 0).astype(np.uint16)
+    n_in_cell = np.where(has_valid, counts_in_cell, 0).astype(np.uint16)
+
+    # Mask rasterization with per cell classes scores
+    if cst.POINTS_CLOUD_MSK in cloud.columns and MSK_LAYER in output_layers:
+        classes = np.unique(cloud[cst.POINTS_CLOUD_MSK].values)
+        classes = classes[classes != 0].astype(np.float64)
+        classes_scores = np.full(
+            (nb_cells, classes.size), -np.inf, dtype=np.float64
+        )
+        for start in chunks:
+            points = cloud.iloc[start : start + points_chunk_size].loc[
+                :, [cst.X, cst.Y, cst.POINTS_CLOUD_MSK]
+            ]
+            accumulate_mask_classes(
+                np.ascontiguousarray(points.values, dtype=np.float64),
+                *acc_args,
+                float(sigma),
+                classes,
+                classes_scores,
+            )
+
+        # no masked points in the terrain cell: 0
+        msk = np.full((nb_cells, 1), msk_no_data, dtype=np.uint16)
+        msk[has_valid] = 0
+        if classes.size > 0:
+            max_scores = np.max(classes_scores, axis=1)
+            scored = has_valid & np.isfinite(max_scores)
+            nb_max_classes = np.sum(
+                classes_scores == max_scores[:, None], axis=1
+            )
+            best_classes = classes[np.argmax(classes_scores, axis=1)]
+            msk[scored, 0] = np.where(
+                nb_max_classes[scored] == 1,
+                best_classes[scored],
+                msk_no_data,
+            )
+    else:
+        msk = None
+
+    return (
+        out,
+        mean if MEAN_LAYER in output_layers else None,
+        stdev if STD_LAYER in output_layers else None,
+        n_pts if N_PTS_LAYER in output_layers else None,
+        n_in_cell if PTS_IN_CELL_LAYER in output_layers else None,
+        msk,
+    )
+
+
+@njit(
+    [
+        (points_type[:, :], boolean[:], int64, int64[:], int64[:], int64[:])
+        for points_type in (float64, float32)
+    ],
+    nogil=True,
+    cache=True,
+)
 def get_neighbors_from_points_array(
     points: np.ndarray,
     data_valid: np.ndarray,
@@ -622,7 +1335,7 @@ def get_neighbors_from_points_array(
     :param neighbors_id: the flattened neighbors ids list
     :param neighbors_start: the flattened neighbors start indexes
     :param neighbors_count: the flattened neighbors counts
-    :return: a numpy array containing only the i_grid point neighbors
+    :return: a float64 numpy array containing only the i_grid point neighbors
     or None if the point has no neighbors (or no valid neighbors)
     """
     n_neighbors = neighbors_count[i_grid]
@@ -631,28 +1344,200 @@ def get_neighbors_from_points_array(
         return None
 
     n_start = neighbors_start[i_grid]
-    neighbors = points[neighbors_id[n_start : n_start + n_neighbors]]
-    n_valid = np.sum(data_valid[neighbors_id[n_start : n_start + n_neighbors]])
+    n_ids = neighbors_id[n_start : n_start + n_neighbors]
+    n_valid = np.sum(data_valid[n_ids])
 
     # discard if grid point has no valid neighbor in point cloud
     if n_valid == 0:
         return None
 
+    # neighbors are gathered in float64 whatever the points precision
+    neighbors = np.empty((n_neighbors, points.shape[1]), dtype=np.float64)
+    for n_idx in range(n_neighbors):
+        neighbors[n_idx] = points[n_ids[n_idx]]
+
     return neighbors
 
 
 @njit(
-    (
-        float64[:, :],
-        boolean[:],
-        int64[:],
-        int64[:],
-        int64[:],
-        float64[:, :],
-        float64,
-        int64,
-        int64,
-    ),
+    [(points_type[:, :],) for points_type in (float64, float32)],
+    nogil=True,
+    cache=True,
+)
+def get_mask_classes(mask_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the mask classes present in the points (0 excluded)
+    and the index of the class of each point in this classes array.
+
+    :param mask_points: mask data, one point per row
+        (last column is the mask value).
+    :return: the sorted classes (as float64) and the class index of each point
+        (-1 for points which mask value is 0)
+    """
+    mask_values = mask_points[:, -1]
+    classes = np.unique(mask_values[mask_values != 0]).astype(np.float64)
+
+    points_classes = np.full(mask_values.size, -1, dtype=np.int64)
+    for point_idx in range(mask_values.size):
+        if mask_values[point_idx] != 0:
+            points_classes[point_idx] = np.searchsorted(
+                classes, mask_values[point_idx]
+            )
+
+    return classes, points_classes
+
+
+@njit(
+    [
+        (
+            points_type[:, :],
+            boolean[:],
+            int64[:],
+            int64[:],
+            int64[:],
+            float64[:, :],
+            float64,
+            int64,
+            float64[:],
+            int64[:],
+            int64,
+            int64,
+            uint16[:, :],
+        )
+        for points_type in (float64, float32)
+    ],
+    nogil=True,
+    cache=True,
+)
+def mask_interp_block(  # noqa: C901
+    mask_points: np.ndarray,
+    data_valid: np.ndarray,
+    neighbors_id: np.ndarray,
+    neighbors_start: np.ndarray,
+    neighbors_count: np.ndarray,
+    grid_points: np.ndarray,
+    sigma: float,
+    undefined_val: int,
+    classes: np.ndarray,
+    points_classes: np.ndarray,
+    first_grid: int,
+    last_grid: int,
+    result: np.ndarray,
+):
+    """
+    Interpolates mask data at the [first_grid, last_grid[ grid point locations
+    and writes it in the result array (see the mask_interp function).
+
+    The classes weights are accumulated in an array indexed by
+    the class index of each point (see the get_mask_classes function),
+    only the entries used by a grid point being reset for the next one.
+    If there is a single class, no weight is computed: the class is used
+    as soon as one of the neighbors belongs to it.
+
+    :param mask_points: mask data, one point per row
+        (first column is the x position, second is the y position,
+        last column is the mask value).
+    :param data_valid: flattened validity mask.
+    :param neighbors_id: flattened neighboring cloud point indices.
+    :param neighbors_start: flattened grid point neighbors start indices.
+    :param neighbors_count: flattened grid point neighbor count.
+    :param grid_points: grid point location, one per row.
+    :param sigma: sigma parameter for weights computation.
+    :param undefined_val: value in case of score equality.
+    :param classes: sorted mask classes (0 excluded)
+    :param points_classes: class index of each point (-1 for 0 values)
+    :param first_grid: first grid point index to interpolate
+    :param last_grid: last grid point index to interpolate (excluded)
+    :param result: interpolated mask to fill
+    """
+    # classes scores (-1 for classes not found in the current cell)
+    scores = np.full(classes.size, -1.0, dtype=np.float64)
+    found_classes = np.zeros(classes.size, dtype=np.int64)
+
+    for i_grid in range(first_grid, last_grid):
+        n_start = neighbors_start[i_grid]
+        n_end = n_start + neighbors_count[i_grid]
+
+        # discard if grid point has no valid neighbor in point cloud
+        n_valid = 0
+        for pos in range(n_start, n_end):
+            if data_valid[neighbors_id[pos]]:
+                n_valid += 1
+                break
+        if n_valid == 0:
+            continue
+
+        # binary mask: no need to weight the neighbors
+        if classes.size == 1:
+            result[i_grid] = 0
+            for pos in range(n_start, n_end):
+                if points_classes[neighbors_id[pos]] >= 0:
+                    result[i_grid] = classes[0]
+                    break
+            continue
+
+        # accumulate the weights of each class
+        # (only masked points are taken into account)
+        nb_found_classes = 0
+        for pos in range(n_start, n_end):
+            point_idx = neighbors_id[pos]
+            class_idx = points_classes[point_idx]
+            if class_idx < 0:
+                continue
+
+            x_vec = mask_points[point_idx, 0] - grid_points[i_grid, 0]
+            y_vec = mask_points[point_idx, 1] - grid_points[i_grid, 1]
+            distance = np.sqrt(x_vec * x_vec + y_vec * y_vec)
+            weight = np.exp(-(distance ** 2) / (2 * sigma ** 2))
+
+            if scores[class_idx] < 0:
+                scores[class_idx] = weight
+                found_classes[nb_found_classes] = class_idx
+                nb_found_classes += 1
+            else:
+                scores[class_idx] += weight
+
+        # no masked points in the terrain cell
+        if nb_found_classes == 0:
+            result[i_grid] = 0
+            continue
+
+        # search for higher score
+        max_class_idx = found_classes[0]
+        for found_idx in range(1, nb_found_classes):
+            if scores[found_classes[found_idx]] > scores[max_class_idx]:
+                max_class_idx = found_classes[found_idx]
+
+        nb_max_classes = 0
+        for found_idx in range(nb_found_classes):
+            if scores[found_classes[found_idx]] == scores[max_class_idx]:
+                nb_max_classes += 1
+
+        if nb_max_classes == 1:
+            result[i_grid] = classes[max_class_idx]
+        else:
+            result[i_grid] = undefined_val
+
+        # reset the scores for the next cell
+        for found_idx in range(nb_found_classes):
+            scores[found_classes[found_idx]] = -1.0
+
+
+@njit(
+    [
+        (
+            points_type[:, :],
+            boolean[:],
+            int64[:],
+            int64[:],
+            int64[:],
+            float64[:, :],
+            float64,
+            int64,
+            int64,
+        )
+        for points_type in (float64, float32)
+    ],
     nogil=True,
     cache=True,
 )
@@ -691,92 +1576,351 @@ def mask_interp(
     """
     # mask rasterization result
     result = np.full((neighbors_count.size, 1), no_data_val, dtype=np.uint16)
-    for i_grid in range(neighbors_count.size):
-        p_sample = grid_points[i_grid]
 
-        neighbors = get_neighbors_from_points_array(
+    classes, points_classes = get_mask_classes(mask_points)
+    mask_interp_block(
+        mask_points,
+        data_valid,
+        neighbors_id,
+        neighbors_start,
+        neighbors_count,
+        grid_points,
+        sigma,
+        undefined_val,
+        classes,
+        points_classes,
+        0,
+        neighbors_count.size,
+        result,
+    )
+
+    return result
+
+
+@njit(
+    [
+        (
+            points_type[:, :],
+            boolean[:],
+            int64[:],
+            int64[:],
+            int64[:],
+            float64[:, :],
+            float64,
+            int64,
+            int64,
+        )
+        for points_type in (float64, float32)
+    ],
+    nogil=True,
+    parallel=True,
+    cache=True,
+)
+def mask_interp_parallel(
+    mask_points: np.ndarray,
+    data_valid: np.ndarray,
+    neighbors_id: np.ndarray,
+    neighbors_start: np.ndarray,
+    neighbors_count: np.ndarray,
+    grid_points: np.ndarray,
+    sigma: float,
+    no_data_val: int = 65535,
+    undefined_val: int = 65535,
+) -> np.ndarray:
+    """
+    Multi-threaded version of the mask_interp function:
+    the grid points are split in blocks distributed among the numba threads.
+
+    :param mask_points: mask data, one point per row
+        (first column is the x position, second is the y position,
+        last column is the mask value).
+    :param data_valid: flattened validity mask.
+    :param neighbors_id: flattened neighboring cloud point indices.
+    :param neighbors_start: flattened grid point neighbors start indices.
+    :param neighbors_count: flattened grid point neighbor count.
+    :param grid_points: grid point location, one per row.
+    :param sigma: sigma parameter for weights computation.
+    :param no_data_val: no data value.
+    :param undefined_val: value in case of score equality.
+    :return: The interpolated mask
+    """
+    # mask rasterization result
+    result = np.full((neighbors_count.size, 1), no_data_val, dtype=np.uint16)
+
+    classes, points_classes = get_mask_classes(mask_points)
+
+    # fixed size blocks of grid points to balance the load between threads
+    block_size = 256
+    nb_grid_points = neighbors_count.size
+    nb_blocks = (nb_grid_points + block_size - 1) // block_size
+    for block in prange(nb_blocks):
+        mask_interp_block(
             mask_points,
             data_valid,
-            i_grid,
             neighbors_id,
             neighbors_start,
             neighbors_count,
+            grid_points,
+            sigma,
+            undefined_val,
+            classes,
+            points_classes,
+            block * block_size,
+            min((block + 1) * block_size, nb_grid_points),
+            result,
         )
-        if neighbors is None:
-            continue
 
-        # grid point to neighbors distance
-        neighbors_vec = neighbors[:, :2] - p_sample
-        distances = np.sqrt(np.sum(neighbors_vec * neighbors_vec, axis=1))
+    return result
+
 
-        # score computation
-        weights = np.exp(-(distances ** 2) / (2 * sigma ** 2))
+@njit(
+    (int64, int64, boolean, boolean, boolean, boolean),
+    nogil=True,
+    cache=True,
+)
+def allocate_interp_statistics(
+    nb_cells,
+    nb_layers,
+    with_mean,
+    with_stdev,
+    with_n_pts,
+    with_pts_in_cell,
+):
+    """
+    Allocate the statistics layers filled by the gaussian_interp_cell function,
+    in their final layout (one row per layer).
+    The layers which are not requested are empty arrays.
+
+    :param nb_cells: number of grid points
+    :type nb_cells: int
+    :param nb_layers: number of interpolated layers (height and colors)
+    :type nb_layers: int
+    :param with_mean: allocate the mean statistics layers
+    :type with_mean: bool
+    :param with_stdev: allocate the standard deviation statistics layers
+    :type with_stdev: bool
+    :param with_n_pts: allocate the number of points statistics layer
+    :type with_n_pts: bool
+    :param with_pts_in_cell: allocate the number of points in cell
+        statistics layer
+    :type with_pts_in_cell: bool
+    :return: the mean, standard deviation, number of points
+        and number of points in cell layers
+    """
+    layer_mean = np.full(
+        (nb_layers, nb_cells if with_mean else 0), np.nan, dtype=np.float32
+    )
+    layer_stdev = np.full(
+        (nb_layers, nb_cells if with_stdev else 0), np.nan, dtype=np.float32
+    )
+    n_pts = np.zeros(nb_cells if with_n_pts else 0, np.uint16)
+    n_pts_in_cell = np.zeros(nb_cells if with_pts_in_cell else 0, np.uint16)
 
-        val = []
-        val_cum_weight = []
-        for neighbor_idx in range(len(neighbors)):
-            msk_val = neighbors[neighbor_idx, 2:]
+    return layer_mean, layer_stdev, n_pts, n_pts_in_cell
 
-            if msk_val != 0:  # only masked points are taken into account
-                if msk_val in val:
-                    msk_val_index = val.index(msk_val)
-                    val_cum_weight[msk_val_index] += weights[neighbor_idx]
-                else:
-                    val.append(msk_val)
-                    val_cum_weight.append(weights[neighbor_idx])
 
-        # search for higher score
-        if len(val) != 0:
-            arr_val_cum_weight = np.asarray(val_cum_weight)
-            ind_max_weight = np.argmax(arr_val_cum_weight)
-
-            max_weight_values = [
-                val[i]
-                for i in range(len(val))
-                if val_cum_weight[i] == val_cum_weight[ind_max_weight]
-            ]
-            if len(max_weight_values) == 1:
-                result[i_grid] = val[ind_max_weight]
-            else:
-                result[i_grid] = undefined_val
-        else:  # no masked points in the terrain cell
-            result[i_grid] = 0
+@njit(
+    [
+        (
+            points_type[:, :],
+            boolean[:],
+            float64[:],
+            int64[:],
+            int64[:],
+            int64[:],
+            float64[:, :],
+            float64,
+            float64,
+            int64,
+            float32[:, :],
+            float32[:, :],
+            float32[:, :],
+            uint16[:],
+            uint16[:],
+        )
+        for points_type in (float64, float32)
+    ],
+    nogil=True,
+    cache=True,
+)
+def gaussian_interp_cell(
+    cloud_points,
+    data_valid,
+    points_weights,
+    neighbors_id,
+    neighbors_start,
+    neighbors_count,
+    grid_points,
+    resolution,
+    sigma,
+    i_grid,
+    result,
+    layer_mean,
+    layer_stdev,
+    n_pts,
+    n_pts_in_cell,
+):
+    """
+    Interpolates point cloud data at the i_grid grid point location
+    and writes it with its quality statistics in the output arrays
+    (see the gaussian_interp function).
 
-    return result
+    :param cloud_points: point cloud data, one point per row.
+    :type cloud_points: float64 or float32 numpy.ndarray.
+    :param data_valid: flattened validity mask.
+    :type data_valid: bool numpy.ndarray.
+    :param points_weights: number of points represented by each point
+        of a decimated cloud (empty if the points are not weighted).
+    :type points_weights: float64 numpy.ndarray.
+    :param neighbors_id: flattened neighboring cloud point indices.
+    :type neighbors_id: int64 numpy.ndarray.
+    :param neighbors_start: flattened grid point neighbors start indices.
+    :type neighbors_start: int64 numpy.ndarray.
+    :param neighbors_count: flattened grid point neighbor count.
+    :type neighbors_count: int64 numpy.ndarray.
+    :param grid_points: grid point location, one per row.
+    :type grid_points: float64 numpy.ndarray.
+    :param resolution: rasterization resolution.
+    :type resolution: float.
+    :param sigma: sigma parameter of gaussian interpolation.
+    :type sigma: float
+    :param i_grid: index of the grid point to interpolate
+    :type i_grid: int
+    :param result: rasterization result to fill (one row per layer)
+    :type result: float32 numpy.ndarray.
+    :param layer_mean: mean statistics layers to fill
+        (empty if not computed)
+    :type layer_mean: float32 numpy.ndarray.
+    :param layer_stdev: standard deviation statistics layers to fill
+        (empty if not computed)
+    :type layer_stdev: float32 numpy.ndarray.
+    :param n_pts: number of points statistics layer to fill
+        (empty if not computed)
+    :type n_pts: uint16 numpy.ndarray.
+    :param n_pts_in_cell: number of points in cell statistics layer to fill
+        (empty if not computed)
+    :type n_pts_in_cell: uint16 numpy.ndarray.
+    """
+    p_sample = grid_points[i_grid]
+
+    neighbors = get_neighbors_from_points_array(
+        cloud_points,
+        data_valid,
+        i_grid,
+        neighbors_id,
+        neighbors_start,
+        neighbors_count,
+    )
+    if neighbors is None:
+        return
+
+    # grid point to neighbors distance
+    neighbors_vec = neighbors[:, :2] - p_sample
+    distances = np.sqrt(np.sum(neighbors_vec * neighbors_vec, axis=1))
+
+    # interpolation weights computation
+    min_dist = np.amin(distances)
+    weights = np.exp(-((distances - min_dist) ** 2) / (2 * sigma ** 2))
+
+    # the weighted points count as many points as they represent
+    in_cell = (np.abs(neighbors_vec[:, 0]) < 0.5 * resolution) & (
+        np.abs(neighbors_vec[:, 1]) < 0.5 * resolution
+    )
+    if points_weights.size > 0:
+        n_start = neighbors_start[i_grid]
+        neighbors_weights = points_weights[
+            neighbors_id[n_start : n_start + neighbors_count[i_grid]]
+        ]
+        weights *= neighbors_weights
+        nb_neighbors = np.sum(neighbors_weights)
+        nb_in_cell = np.sum(neighbors_weights[in_cell])
+    else:
+        neighbors_weights = np.empty(0, dtype=np.float64)
+        nb_neighbors = neighbors_vec.shape[0]
+        nb_in_cell = np.sum(in_cell)
+    total_weight = np.sum(weights)
+
+    # interpolate point cloud data
+    result[:, i_grid] = np.dot(weights, neighbors[:, 2:]) / total_weight
+
+    # compute the requested statistics for each layer
+    if n_pts.size > 0:
+        n_pts[i_grid] = nb_neighbors
+
+    for n_layer in range(2, cloud_points.shape[1]):
+        if points_weights.size > 0:
+            layer_values_mean = (
+                np.dot(neighbors_weights, neighbors[:, n_layer]) / nb_neighbors
+            )
+            deviations = neighbors[:, n_layer] - layer_values_mean
+            layer_values_std = np.sqrt(
+                np.dot(neighbors_weights, deviations * deviations)
+                / nb_neighbors
+            )
+        else:
+            layer_values_mean = np.mean(neighbors[:, n_layer])
+            layer_values_std = np.std(neighbors[:, n_layer])
+        if layer_stdev.size > 0:
+            layer_stdev[n_layer - 2, i_grid] = layer_values_std
+        if layer_mean.size > 0:
+            layer_mean[n_layer - 2, i_grid] = layer_values_mean
+
+    if n_pts_in_cell.size > 0:
+        n_pts_in_cell[i_grid] = nb_in_cell
 
 
 @njit(
-    (
-        float64[:, :],
-        boolean[:],
-        int64[:],
-        int64[:],
-        int64[:],
-        float64[:, :],
-        float64,
-        float64,
-    ),
+    [
+        (
+            points_type[:, :],
+            boolean[:],
+            float64[:],
+            int64[:],
+            int64[:],
+            int64[:],
+            float64[:, :],
+            float64,
+            float64,
+            boolean,
+            boolean,
+            boolean,
+            boolean,
+        )
+        for points_type in (float64, float32)
+    ],
     nogil=True,
     cache=True,
 )
 def gaussian_interp(
     cloud_points,
     data_valid,
+    points_weights,
     neighbors_id,
     neighbors_start,
     neighbors_count,
     grid_points,
     resolution,
     sigma,
+    with_mean=True,
+    with_stdev=True,
+    with_n_pts=True,
+    with_pts_in_cell=True,
 ):
     """
     Interpolates point cloud data at grid point locations and produces
     quality statistics.
 
+    If points_weights is not empty (decimated cloud, see
+    points_cloud.voxel_decimation), each point counts as many points
+    as it represents in the gaussian weights and in the statistics.
+
     :param cloud_points: point cloud data, one point per row.
-    :type cloud_points: float64 numpy.ndarray.
+    :type cloud_points: float64 or float32 numpy.ndarray.
     :param data_valid: flattened validity mask.
     :type data_valid: bool numpy.ndarray.
+    :param points_weights: number of points represented by each point
+        of a decimated cloud (empty if the points are not weighted).
+    :type points_weights: float64 numpy.ndarray.
     :param neighbors_id: flattened neighboring cloud point indices.
     :type neighbors_id: int64 numpy.ndarray.
     :param neighbors_start: flattened grid point neighbors start indices.
@@ -789,70 +1933,511 @@ def gaussian_interp(
     :type resolution: float.
     :param sigma: sigma parameter of gaussian interpolation.
     :type sigma: float
-    :return: a tuple with rasterization results and statistics.
+    :param with_mean: compute the mean statistics layers
+    :type with_mean: bool
+    :param with_stdev: compute the standard deviation statistics layers
+    :type with_stdev: bool
+    :param with_n_pts: compute the number of points statistics layer
+    :type with_n_pts: bool
+    :param with_pts_in_cell: compute the number of points in cell
+        statistics layer
+    :type with_pts_in_cell: bool
+    :return: a tuple with rasterization results and statistics,
+        with one row per layer for the results and the mean and standard
+        deviation statistics (the statistics which are not computed
+        are empty arrays).
     """
 
-    # rasterization result for both height and color(s)
+    # rasterization result for both height and color(s),
+    # one row per layer
     result = np.full(
-        (neighbors_count.size, cloud_points.shape[1] - 2),
+        (cloud_points.shape[1] - 2, neighbors_count.size),
         np.nan,
         dtype=np.float32,
     )
 
     # statistics layers
-    layer_mean = np.full(
-        (neighbors_count.size, cloud_points.shape[1] - 2),
-        np.nan,
-        dtype=np.float32,
+    (
+        layer_mean,
+        layer_stdev,
+        n_pts,
+        n_pts_in_cell,
+    ) = allocate_interp_statistics(
+        neighbors_count.size,
+        cloud_points.shape[1] - 2,
+        with_mean,
+        with_stdev,
+        with_n_pts,
+        with_pts_in_cell,
     )
-    layer_stdev = np.full(
-        (neighbors_count.size, cloud_points.shape[1] - 2),
+
+    for i_grid in range(neighbors_count.size):
+        gaussian_interp_cell(
+            cloud_points,
+            data_valid,
+            points_weights,
+            neighbors_id,
+            neighbors_start,
+            neighbors_count,
+            grid_points,
+            resolution,
+            sigma,
+            i_grid,
+            result,
+            layer_mean,
+            layer_stdev,
+            n_pts,
+            n_pts_in_cell,
+        )
+
+    return result, layer_mean, layer_stdev, n_pts, n_pts_in_cell
+
+
+@njit(
+    [
+        (
+            points_type[:, :],
+            boolean[:],
+            float64[:],
+            int64[:],
+            int64[:],
+            int64[:],
+            float64[:, :],
+            float64,
+            float64,
+            boolean,
+            boolean,
+            boolean,
+            boolean,
+        )
+        for points_type in (float64, float32)
+    ],
+    nogil=True,
+    parallel=True,
+    cache=True,
+)
+def gaussian_interp_parallel(
+    cloud_points,
+    data_valid,
+    points_weights,
+    neighbors_id,
+    neighbors_start,
+    neighbors_count,
+    grid_points,
+    resolution,
+    sigma,
+    with_mean=True,
+    with_stdev=True,
+    with_n_pts=True,
+    with_pts_in_cell=True,
+):
+    """
+    Multi-threaded version of the gaussian_interp function:
+    the grid points are distributed among the numba threads.
+
+    :param cloud_points: point cloud data, one point per row.
+    :type cloud_points: float64 or float32 numpy.ndarray.
+    :param data_valid: flattened validity mask.
+    :type data_valid: bool numpy.ndarray.
+    :param points_weights: number of points represented by each point
+        of a decimated cloud (empty if the points are not weighted).
+    :type points_weights: float64 numpy.ndarray.
+    :param neighbors_id: flattened neighboring cloud point indices.
+    :type neighbors_id: int64 numpy.ndarray.
+    :param neighbors_start: flattened grid point neighbors start indices.
+    :type neighbors_start: int64 numpy.ndarray.
+    :param neighbors_count: flattened grid point neighbor count.
+    :type neighbors_count: int64 numpy.ndarray.
+    :param grid_points: grid point location, one per row.
+    :type grid_points: float64 numpy.ndarray.
+    :param resolution: rasterization resolution.
+    :type resolution: float.
+    :param sigma: sigma parameter of gaussian interpolation.
+    :type sigma: float
+    :param with_mean: compute the mean statistics layers
+    :type with_mean: bool
+    :param with_stdev: compute the standard deviation statistics layers
+    :type with_stdev: bool
+    :param with_n_pts: compute the number of points statistics layer
+    :type with_n_pts: bool
+    :param with_pts_in_cell: compute the number of points in cell
+        statistics layer
+    :type with_pts_in_cell: bool
+    :return: a tuple with rasterization results and statistics,
+        with one row per layer for the results and the mean and standard
+        deviation statistics (the statistics which are not computed
+        are empty arrays).
+    """
+
+    # rasterization result for both height and color(s),
+    # one row per layer
+    result = np.full(
+        (cloud_points.shape[1] - 2, neighbors_count.size),
         np.nan,
         dtype=np.float32,
     )
-    n_pts = np.zeros(neighbors_count.size, np.uint16)
-    n_pts_in_cell = np.zeros(neighbors_count.size, np.uint16)
-
-    for i_grid in range(neighbors_count.size):
 
-        p_sample = grid_points[i_grid]
+    # statistics layers
+    (
+        layer_mean,
+        layer_stdev,
+        n_pts,
+        n_pts_in_cell,
+    ) = allocate_interp_statistics(
+        neighbors_count.size,
+        cloud_points.shape[1] - 2,
+        with_mean,
+        with_stdev,
+        with_n_pts,
+        with_pts_in_cell,
+    )
 
-        neighbors = get_neighbors_from_points_array(
+    for i_grid in prange(neighbors_count.size):
+        gaussian_interp_cell(
             cloud_points,
             data_valid,
-            i_grid,
+            points_weights,
             neighbors_id,
             neighbors_start,
             neighbors_count,
+            grid_points,
+            resolution,
+            sigma,
+            i_grid,
+            result,
+            layer_mean,
+            layer_stdev,
+            n_pts,
+            n_pts_in_cell,
         )
-        if neighbors is None:
-            continue
 
-        # grid point to neighbors distance
-        neighbors_vec = neighbors[:, :2] - p_sample
-        distances = np.sqrt(np.sum(neighbors_vec * neighbors_vec, axis=1))
+    return result, layer_mean, layer_stdev, n_pts, n_pts_in_cell
 
-        # interpolation weights computation
-        min_dist = np.amin(distances)
-        weights = np.exp(-((distances - min_dist) ** 2) / (2 * sigma ** 2))
-        total_weight = np.sum(weights)
 
-        n_pts[i_grid] = neighbors_vec.shape[0]
+@njit(
+    (float64[:, :], float64, float64, float64, int64, int64, int64, int64),
+    nogil=True,
+    cache=True,
+)
+def get_point_cells_range(
+    points,
+    x_start,
+    y_start,
+    resolution,
+    radius,
+    point_idx,
+    x_size,
+    y_size,
+):
+    """
+    Get the range of rasterization grid cells
+    which centers can be at most (radius + 0.5) * resolution
+    away from a point.
 
-        # interpolate point cloud data
-        result[i_grid] = np.dot(weights, neighbors[:, 2:]) / total_weight
+    :param points: points data, one point per row
+        (first column is the x position, second is the y position)
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param radius: Radius for hole filling.
+    :param point_idx: index of the point in the points array
+    :param x_size: x size of the rasterization grid
+    :param y_size: y size of the rasterization grid
+    :return: the first and last (included) rows and columns of the range
+        (the range is empty if the point has NaN coordinates)
+    """
+    col_pos = (points[point_idx, 0] - x_start) / resolution
+    row_pos = (y_start - points[point_idx, 1]) / resolution
+
+    # NaN coordinates give an empty range
+    if np.isnan(col_pos) or np.isnan(row_pos):
+        return 0, -1, 0, -1
 
-        # compute statistic for each layer
-        for n_layer in range(2, cloud_points.shape[1]):
-            layer_stdev[i_grid][n_layer - 2] = np.std(neighbors[:, n_layer])
-            layer_mean[i_grid][n_layer - 2] = np.mean(neighbors[:, n_layer])
+    first_col = max(int(np.ceil(col_pos - radius - 1)), 0)
+    last_col = min(int(np.floor(col_pos + radius)), x_size - 1)
+    first_row = max(int(np.ceil(row_pos - radius - 1)), 0)
+    last_row = min(int(np.floor(row_pos + radius)), y_size - 1)
 
-        n_pts_in_cell[i_grid] = np.sum(
-            (np.abs(neighbors_vec[:, 0]) < 0.5 * resolution)
-            & (np.abs(neighbors_vec[:, 1]) < 0.5 * resolution)
+    return first_row, last_row, first_col, last_col
+
+
+@njit(
+    (
+        float64[:, :],
+        boolean[:],
+        float64[:],
+        float64[:],
+        float64,
+        float64,
+        float64,
+        int64,
+        float64[:],
+        boolean[:],
+    ),
+    nogil=True,
+    cache=True,
+)
+def accumulate_min_distances(
+    points,
+    data_valid,
+    x_values_1d,
+    y_values_1d,
+    x_start,
+    y_start,
+    resolution,
+    radius,
+    min_dist,
+    has_valid,
+):
+    """
+    First accumulation pass: update for each grid cell
+    the minimal distance between its center and its neighbors
+    and whether it has at least one valid neighbor.
+
+    :param points: points chunk, one point per row
+        (first column is the x position, second is the y position)
+    :param data_valid: validity mask of the points chunk
+    :param x_values_1d: x coordinates of the grid cells centers
+    :param y_values_1d: y coordinates of the grid cells centers
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param radius: Radius for hole filling.
+    :param min_dist: minimal distance accumulator (one value per cell)
+    :param has_valid: valid neighbor accumulator (one value per cell)
+    """
+    x_size = x_values_1d.size
+    y_size = y_values_1d.size
+    max_dist = (radius + 0.5) * resolution
+
+    for point_idx in range(points.shape[0]):
+        first_row, last_row, first_col, last_col = get_point_cells_range(
+            points,
+            x_start,
+            y_start,
+            resolution,
+            radius,
+            point_idx,
+            x_size,
+            y_size,
         )
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                x_vec = points[point_idx, 0] - x_values_1d[col]
+                y_vec = points[point_idx, 1] - y_values_1d[row]
+                distance = np.sqrt(x_vec * x_vec + y_vec * y_vec)
+                if distance <= max_dist:
+                    i_grid = row * x_size + col
+                    min_dist[i_grid] = min(min_dist[i_grid], distance)
+                    if data_valid[point_idx]:
+                        has_valid[i_grid] = True
 
-    return result, layer_mean, layer_stdev, n_pts, n_pts_in_cell
+
+@njit(
+    (
+        float64[:, :],
+        float64[:],
+        float64[:],
+        float64[:],
+        float64,
+        float64,
+        float64,
+        int64,
+        float64,
+        float64[:],
+        float64[:, :],
+        float64[:],
+        float64[:],
+        float64[:],
+        float64[:, :],
+        float64[:, :],
+    ),
+    nogil=True,
+    cache=True,
+)
+def accumulate_points(
+    points,
+    points_weights,
+    x_values_1d,
+    y_values_1d,
+    x_start,
+    y_start,
+    resolution,
+    radius,
+    sigma,
+    min_dist,
+    weighted_sums,
+    weights_sums,
+    counts,
+    counts_in_cell,
+    means,
+    squares_sums,
+):
+    """
+    Second accumulation pass: add the contribution of a points chunk
+    to the running weighted sums, counts and Welford's
+    mean and variance accumulators of each grid cell.
+
+    :param points: points chunk, one point per row
+        (first column is the x position, second is the y position,
+        the other columns are the layers to rasterize)
+    :param points_weights: number of points represented by each point
+        of the chunk (empty if the points are not weighted)
+    :param x_values_1d: x coordinates of the grid cells centers
+    :param y_values_1d: y coordinates of the grid cells centers
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param radius: Radius for hole filling.
+    :param sigma: sigma parameter of gaussian interpolation.
+    :param min_dist: minimal distances computed by the first pass
+    :param weighted_sums: layers weighted sums accumulator
+    :param weights_sums: weights sums accumulator
+    :param counts: neighbors count accumulator
+        (sum of the neighbors weights)
+    :param counts_in_cell: count of neighbors strictly in the cell accumulator
+    :param means: Welford's layers weighted mean accumulator
+    :param squares_sums: Welford's layers sum of squared
+        differences from the mean accumulator
+    """
+    x_size = x_values_1d.size
+    y_size = y_values_1d.size
+    max_dist = (radius + 0.5) * resolution
+    nb_layers = points.shape[1] - 2
+
+    for point_idx in range(points.shape[0]):
+        first_row, last_row, first_col, last_col = get_point_cells_range(
+            points,
+            x_start,
+            y_start,
+            resolution,
+            radius,
+            point_idx,
+            x_size,
+            y_size,
+        )
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                x_vec = points[point_idx, 0] - x_values_1d[col]
+                y_vec = points[point_idx, 1] - y_values_1d[row]
+                distance = np.sqrt(x_vec * x_vec + y_vec * y_vec)
+                if distance > max_dist:
+                    continue
+
+                i_grid = row * x_size + col
+                point_weight = 1.0
+                if points_weights.size > 0:
+                    point_weight = points_weights[point_idx]
+                weight = point_weight * np.exp(
+                    -((distance - min_dist[i_grid]) ** 2) / (2 * sigma ** 2)
+                )
+                weights_sums[i_grid] += weight
+                counts[i_grid] += point_weight
+                half_res = 0.5 * resolution
+                if abs(x_vec) < half_res and abs(y_vec) < half_res:
+                    counts_in_cell[i_grid] += point_weight
+
+                for layer in range(nb_layers):
+                    value = points[point_idx, layer + 2]
+                    weighted_sums[i_grid, layer] += weight * value
+
+                    # Welford's (weighted) online mean and variance update
+                    delta = value - means[i_grid, layer]
+                    means[i_grid, layer] += (
+                        point_weight * delta / counts[i_grid]
+                    )
+                    squares_sums[i_grid, layer] += (
+                        point_weight * delta * (value - means[i_grid, layer])
+                    )
+
+
+@njit(
+    (
+        float64[:, :],
+        float64[:],
+        float64[:],
+        float64,
+        float64,
+        float64,
+        int64,
+        float64,
+        float64[:],
+        float64[:, :],
+    ),
+    nogil=True,
+    cache=True,
+)
+def accumulate_mask_classes(
+    mask_points,
+    x_values_1d,
+    y_values_1d,
+    x_start,
+    y_start,
+    resolution,
+    radius,
+    sigma,
+    classes,
+    classes_scores,
+):
+    """
+    Add the contribution of a points chunk to the accumulated weight
+    of each mask class in each grid cell (see the mask_interp function).
+    A class which has not been seen in a cell has a -inf score.
+
+    :param mask_points: mask data chunk, one point per row
+        (first column is the x position, second is the y position,
+        last column is the mask value).
+    :param x_values_1d: x coordinates of the grid cells centers
+    :param y_values_1d: y coordinates of the grid cells centers
+    :param x_start: x start of the rasterization grid
+    :param y_start: y start of the rasterization grid
+    :param resolution: Resolution of rasterized cells,
+        expressed in cloud CRS units.
+    :param radius: Radius for hole filling.
+    :param sigma: sigma parameter for weights computation.
+    :param classes: sorted mask classes (0 excluded)
+    :param classes_scores: classes scores accumulator
+        (one row per cell, one column per class)
+    """
+    x_size = x_values_1d.size
+    y_size = y_values_1d.size
+    max_dist = (radius + 0.5) * resolution
+
+    for point_idx in range(mask_points.shape[0]):
+        msk_val = mask_points[point_idx, 2]
+
+        # only masked points are taken into account
+        if msk_val == 0:
+            continue
+        class_idx = np.searchsorted(classes, msk_val)
+
+        first_row, last_row, first_col, last_col = get_point_cells_range(
+            mask_points,
+            x_start,
+            y_start,
+            resolution,
+            radius,
+            point_idx,
+            x_size,
+            y_size,
+        )
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                x_vec = mask_points[point_idx, 0] - x_values_1d[col]
+                y_vec = mask_points[point_idx, 1] - y_values_1d[row]
+                distance = np.sqrt(x_vec * x_vec + y_vec * y_vec)
+                if distance > max_dist:
+                    continue
+
+                i_grid = row * x_size + col
+                weight = np.exp(-(distance ** 2) / (2 * sigma ** 2))
+                if np.isinf(classes_scores[i_grid, class_idx]):
+                    classes_scores[i_grid, class_idx] = weight
+                else:
+                    classes_scores[i_grid, class_idx] += weight
 
 
 def create_raster_dataset(
@@ -865,16 +2450,20 @@ def create_raster_dataset(
     hgt_no_data: int,
     color_no_data: int,
     epsg: int,
-    mean: np.ndarray,
-    stdev: np.ndarray,
-    n_pts: np.ndarray,
-    n_in_cell: np.ndarray,
+    mean: Union[None, np.ndarray],
+    stdev: Union[None, np.ndarray],
+    n_pts: Union[None, np.ndarray],
+    n_in_cell: Union[None, np.ndarray],
     msk: np.ndarray = None,
 ) -> xr.Dataset:
     """
-    Create final raster xarray dataset
+    Create final raster xarray dataset.
+
+    The layers are expected in their final layout (bands first) and are
+    wrapped by the dataset without copy: the no data values of the height
+    and color layers are written in place.
 
-    :param raster: height and colors
+    :param raster: height and colors, of shape (nb_layers, y_size, x_size)
     :param x_start: x start of the rasterization grid
     :param y_start: y start of the rasterization grid
     :param x_size: x size of the rasterization grid
@@ -884,64 +2473,63 @@ def create_raster_dataset(
     :param hgt_no_data: no data value to use for height
     :param color_no_data: no data value to use for color
     :param epsg: epsg code for the CRS of the final raster
-    :param mean: mean of height and colors
-    :param stdev: standard deviation of height and colors
-    :param n_pts: number of points that are stricty in a cell
-    :param n_in_cell: number of points which contribute to a cell
-    :param msk: raster msk
+    :param mean: mean of height and colors, same shape as raster (or None)
+    :param stdev: standard deviation of height and colors,
+        same shape as raster (or None)
+    :param n_pts: number of points that are stricty in a cell (or None)
+    :param n_in_cell: number of points which contribute to a cell (or None)
+    :param msk: raster msk (or None)
     :return: the raster xarray dataset
     """
     raster_dims = (cst.Y, cst.X)
-    n_layers = raster.shape[-1]
+    n_layers = raster.shape[0]
     x_values_1d, y_values_1d = compute_values_1d(
         x_start, y_start, x_size, y_size, resolution
     )
     raster_coords = {cst.X: x_values_1d, cst.Y: y_values_1d}
-    hgt = np.nan_to_num(raster[..., 0], nan=hgt_no_data)
-    raster_out = xr.Dataset(
-        {cst.RASTER_HGT: ([cst.Y, cst.X], hgt)}, coords=raster_coords
-    )
 
-    if raster.shape[-1] > 1:  # rasterizer produced color output
-        band = range(1, raster.shape[-1])
+    np.nan_to_num(raster[0], copy=False, nan=hgt_no_data)
+    raster_vars = {cst.RASTER_HGT: (raster_dims, raster[0])}
+
+    if n_layers > 1:  # rasterizer produced color output
+        raster_coords[cst.BAND] = range(1, n_layers)
         # CAUTION: band/channel is set as the first dimension.
-        clr = np.nan_to_num(np.rollaxis(raster[:, :, 1:], 2), nan=color_no_data)
-        color_out = xr.Dataset(
-            {cst.RASTER_COLOR_IMG: ([cst.BAND, cst.Y, cst.X], clr)},
-            coords={**raster_coords, cst.BAND: band},
+        np.nan_to_num(raster[1:], copy=False, nan=color_no_data)
+        raster_vars[cst.RASTER_COLOR_IMG] = (
+            (cst.BAND,) + raster_dims,
+            raster[1:],
         )
-        # update raster output with color data
-        raster_out = xr.merge((raster_out, color_out))
-
-    raster_out.attrs[cst.EPSG] = epsg
-    raster_out.attrs[cst.RESOLUTION] = resolution
 
     # statics layer for height output
-    raster_out[cst.RASTER_HGT_MEAN] = xr.DataArray(
-        mean[..., 0], coords=raster_coords, dims=raster_dims
-    )
-    raster_out[cst.RASTER_HGT_STD_DEV] = xr.DataArray(
-        stdev[..., 0], coords=raster_coords, dims=raster_dims
-    )
+    if mean is not None:
+        raster_vars[cst.RASTER_HGT_MEAN] = (raster_dims, mean[0])
+    if stdev is not None:
+        raster_vars[cst.RASTER_HGT_STD_DEV] = (raster_dims, stdev[0])
 
     # add each band statistics
     for i_layer in range(1, n_layers):
-        raster_out["{}{}".format(cst.RASTER_BAND_MEAN, i_layer)] = xr.DataArray(
-            mean[..., i_layer], coords=raster_coords, dims=raster_dims
-        )
-        raster_out[
-            "{}{}".format(cst.RASTER_BAND_STD_DEV, i_layer)
-        ] = xr.DataArray(
-            stdev[..., i_layer], coords=raster_coords, dims=raster_dims
-        )
+        if mean is not None:
+            raster_vars["{}{}".format(cst.RASTER_BAND_MEAN, i_layer)] = (
+                raster_dims,
+                mean[i_layer],
+            )
+        if stdev is not None:
+            raster_vars["{}{}".format(cst.RASTER_BAND_STD_DEV, i_layer)] = (
+                raster_dims,
+                stdev[i_layer],
+            )
 
-    raster_out[cst.RASTER_NB_PTS] = xr.DataArray(n_pts, dims=raster_dims)
-    raster_out[cst.RASTER_NB_PTS_IN_CELL] = xr.DataArray(
-        n_in_cell, dims=raster_dims
-    )
+    if n_pts is not None:
+        raster_vars[cst.RASTER_NB_PTS] = (raster_dims, n_pts)
+    if n_in_cell is not None:
+        raster_vars[cst.RASTER_NB_PTS_IN_CELL] = (raster_dims, n_in_cell)
 
     if msk is not None:
-        raster_out[cst.RASTER_MSK] = xr.DataArray(msk, dims=raster_dims)
+        raster_vars[cst.RASTER_MSK] = (raster_dims, msk)
+
+    raster_out = xr.Dataset(raster_vars, coords=raster_coords)
+    raster_out.attrs[cst.EPSG] = epsg
+    raster_out.attrs[cst.RESOLUTION] = resolution
 
     return raster_out
 
@@ -960,6 +2548,11 @@ def rasterize(
     color_no_data: int = 0,
     msk_no_data: int = 65535,
     grid_points_division_factor: int = None,
+    neighbors_search: str = KDTREE_NEIGHBORS_SEARCH,
+    nb_threads: int = None,
+    accumulator_mode: bool = False,
+    output_layers: List[str] = None,
+    neighbors_cache_dir: str = None,
 ) -> Union[xr.Dataset, None]:
     """
     Rasterize a point cloud with its color bands to a Dataset
@@ -967,6 +2560,7 @@ def rasterize(
 
     :param cloud: Combined cloud
         as returned by the create_combined_cloud function
+        (reduced precision clouds are rasterized relatively to their origin)
     :param resolution: Resolution of rasterized cells,
         expressed in cloud CRS units or None.
     :param epsg: epsg code for the CRS of the final raster
@@ -983,6 +2577,21 @@ def rasterize(
         the grid points (memory optimization, reduce the highest memory peak).
         If it is not set, the factor is automatically set to
         construct 700000 points blocs.
+    :param neighbors_search: neighbors search engine to use,
+        one of NEIGHBORS_SEARCH_ENGINES
+    :param nb_threads: number of threads used by the interpolation kernels
+        (-1 for all the threads, if None or 1 the serial kernels are used)
+    :param accumulator_mode: activate to rasterize the cloud with
+        per cell accumulators instead of neighbors lists
+        (the neighbors_search, grid_points_division_factor and
+        nb_threads parameters are then not used)
+    :param output_layers: layers to compute, among OUTPUT_LAYERS
+        (if None, all the layers are computed). The height is always
+        computed, the other layers are not added to the output dataset
+        if they are not requested.
+    :param neighbors_cache_dir: directory where the neighbors of the grid
+        points are saved and reloaded from (if None, no cache is used,
+        not used by the accumulator mode)
     :return: Rasterized cloud color and statistics.
     """
     worker_logger = logging.getLogger("distributed.worker")
@@ -1004,30 +2613,78 @@ def rasterize(
         )
     )
 
-    out, mean, stdev, n_pts, n_in_cell, msk = compute_vector_raster_and_stats(
-        cloud,
-        data_valid,
-        x_start,
-        y_start,
-        x_size,
-        y_size,
-        resolution,
-        sigma,
-        radius,
-        msk_no_data,
-        worker_logger,
-        grid_points_division_factor,
-    )
+    # the grid is expressed in the cloud frame
+    # (shifted for the reduced precision clouds)
+    x_origin, y_origin, z_origin = points_cloud.get_cloud_origin(cloud)
 
-    # reshape data as a 2d grid.
+    if accumulator_mode:
+        (
+            out,
+            mean,
+            stdev,
+            n_pts,
+            n_in_cell,
+            msk,
+        ) = compute_vector_raster_and_stats_with_accumulators(
+            cloud,
+            data_valid,
+            x_start - x_origin,
+            y_start - y_origin,
+            x_size,
+            y_size,
+            resolution,
+            sigma,
+            radius,
+            msk_no_data,
+            worker_logger,
+            output_layers=output_layers,
+        )
+    else:
+        (
+            out,
+            mean,
+            stdev,
+            n_pts,
+            n_in_cell,
+            msk,
+        ) = compute_vector_raster_and_stats(
+            cloud,
+            data_valid,
+            x_start - x_origin,
+            y_start - y_origin,
+            x_size,
+            y_size,
+            resolution,
+            sigma,
+            radius,
+            msk_no_data,
+            worker_logger,
+            grid_points_division_factor,
+            neighbors_search=neighbors_search,
+            nb_threads=nb_threads,
+            output_layers=output_layers,
+            neighbors_cache_dir=neighbors_cache_dir,
+        )
+
+    # restore the absolute heights (the standard deviation is unchanged)
+    if z_origin != 0:
+        out[0] += z_origin
+        if mean is not None:
+            mean[0] += z_origin
+
+    # reshape data as 2d grids (views in the final layout, without copy)
     tic = time.process_time()
     shape_out = (y_size, x_size)
-    out = out.reshape(shape_out + (-1,))
-    mean = mean.reshape(shape_out + (-1,))
-    stdev = stdev.reshape(shape_out + (-1,))
-    n_pts = n_pts.reshape(shape_out)
-    n_in_cell = n_in_cell.reshape(shape_out)
-
+    out = out.reshape((-1,) + shape_out)
+
+    if mean is not None:
+        mean = mean.reshape((-1,) + shape_out)
+    if stdev is not None:
+        stdev = stdev.reshape((-1,) + shape_out)
+    if n_pts is not None:
+        n_pts = n_pts.reshape(shape_out)
+    if n_in_cell is not None:
+        n_in_cell = n_in_cell.reshape(shape_out)
     if msk is not None:
         msk = msk.reshape(shape_out)
 
@@ -44,7 +44,7 @@ def test_missing_abstract_methods():
     assert (
         str(error.value) == "Can't instantiate abstract class"
         " NoMethodClass with abstract methods "
-        "generate_epipolar_grids, triangulate"
+        "direct_loc, generate_epipolar_grids, triangulate"
     )
 
 
@@ -34,6 +34,7 @@ import rasterio as rio
 
 # CARS imports
 from cars.core.geometry import AbstractGeometry
+from cars.externals import otb_pipelines
 
 # CARS Tests imports
 from ...helpers import (
@@ -411,3 +412,43 @@ def test_generate_epipolar_grids_scaled_inputs():
 
     # unset otb geoid file
     otb_geoid_file_unset()
+
+
+@pytest.mark.unit_tests
+def test_direct_loc():
+    """
+    Test the batched localization against the point by point one
+    """
+    img = absolute_data_path("input/phr_ventoux/left_image.tif")
+    dem = absolute_data_path("input/phr_ventoux/srtm")
+
+    geo_plugin = (
+        AbstractGeometry(  # pylint: disable=abstract-class-instantiated
+            "OTBGeometry"
+        )
+    )
+
+    x_coords = np.array([0.0, 150.5, 300.0, 512.0])
+    y_coords = np.array([10.0, 200.0, 350.25, 500.0])
+
+    # altitudes given for each point
+    z_coords = np.array([100.0, 200.0, 300.0, 400.0])
+    llh = geo_plugin.direct_loc(img, x_coords, y_coords, z_coords)
+    assert llh.shape == (4, 3)
+    for x_coord, y_coord, z_coord, point_llh in zip(
+        x_coords, y_coords, z_coords, llh
+    ):
+        np.testing.assert_allclose(
+            point_llh,
+            otb_pipelines.sensor_to_geo(img, x_coord, y_coord, z_coord),
+        )
+
+    # single altitude and dem
+    llh = geo_plugin.direct_loc(img, x_coords, y_coords, 300.0)
+    np.testing.assert_allclose(llh[:, 2], 300.0)
+    llh = geo_plugin.direct_loc(img, x_coords, y_coords, dem=dem)
+    for x_coord, y_coord, point_llh in zip(x_coords, y_coords, llh):
+        np.testing.assert_allclose(
+            point_llh,
+            otb_pipelines.sensor_to_geo(img, x_coord, y_coord, dem=dem),
+        )
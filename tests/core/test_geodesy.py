@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Test module for cars/core/geodesy.py
+"""
+
+# Standard imports
+from __future__ import absolute_import
+
+# Third party imports
+import numpy as np
+import pytest
+from pyproj import Transformer
+
+# CARS imports
+from cars.core import geodesy
+
+
+def get_random_geographic_points(nb_points=10000, seed=0):
+    """
+    Draw random WGS84 geographic points (longitude, latitude, height)
+    in the UTM 31 zone, on both sides of the equator
+    """
+    rng = np.random.default_rng(seed)
+    lon = rng.uniform(0.0, 6.0, nb_points)
+    lat = rng.uniform(-80.0, 84.0, nb_points)
+    alt = rng.uniform(-500.0, 9000.0, nb_points)
+    return lon, lat, alt
+
+
+@pytest.mark.unit_tests
+def test_get_referential():
+    """
+    Test the referentials handled by the geodesy kernels
+    """
+    assert geodesy.get_referential(4326)[0] == geodesy.GEOGRAPHIC
+    assert geodesy.get_referential(4978)[0] == geodesy.ECEF
+    assert geodesy.get_referential(32631) == (geodesy.UTM, 3.0, 0.0)
+    assert geodesy.get_referential(32736) == (
+        geodesy.UTM,
+        33.0,
+        geodesy.UTM_SOUTH_FALSE_NORTHING,
+    )
+    assert geodesy.get_referential(2154) is None
+
+    # Not handled referentials are left to pyproj
+    coords = [np.zeros(2), np.zeros(2), np.zeros(2)]
+    assert not geodesy.geodetic_conversion(*coords, 4326, 2154)
+
+
+@pytest.mark.unit_tests
+@pytest.mark.parametrize("nb_threads", [None, 2, -1])
+@pytest.mark.parametrize(
+    "epsg_in,epsg_out,tolerance",
+    [
+        (4326, 4978, (1e-6, 1e-6, 1e-6)),
+        (4978, 4326, (1e-10, 1e-10, 1e-5)),
+        (4326, 32631, (1e-6, 1e-6, 1e-6)),
+        (4326, 32731, (1e-6, 1e-6, 1e-6)),
+        (4978, 32631, (1e-6, 1e-6, 1e-5)),
+    ],
+)
+def test_geodetic_conversion(epsg_in, epsg_out, tolerance, nb_threads):
+    """
+    Compare the geodesy kernels conversions to the pyproj ones
+    """
+    points = get_random_geographic_points()
+    if epsg_in != 4326:
+        points = Transformer.from_crs(4326, epsg_in, always_xy=True).transform(
+            *points
+        )
+    ref = Transformer.from_crs(epsg_in, epsg_out, always_xy=True).transform(
+        *points
+    )
+
+    coords = [np.array(coord, dtype=np.float64) for coord in points]
+    assert geodesy.geodetic_conversion(*coords, epsg_in, epsg_out, nb_threads)
+
+    for coord, coord_ref, tol in zip(coords, ref, tolerance):
+        np.testing.assert_allclose(coord, coord_ref, rtol=0, atol=tol)
+
+    # Back and forth conversions
+    assert geodesy.geodetic_conversion(*coords, epsg_out, epsg_in, nb_threads)
+    for coord, coord_ref in zip(coords, points):
+        np.testing.assert_allclose(coord, coord_ref, rtol=0, atol=1e-5)
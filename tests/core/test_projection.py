@@ -26,16 +26,19 @@ Test module for cars/core/projection.py
 from __future__ import absolute_import
 
 import os
+import shutil
 import tempfile
 
 # Third party imports
 import numpy as np
 import pandas
 import pytest
+import xarray as xr
 from shapely.affinity import translate
 from shapely.geometry import Polygon
 
 # CARS imports
+from cars.core import constants as cst
 from cars.core import inputs, projection
 
 # CARS Tests imports
@@ -77,6 +80,73 @@ def test_point_cloud_conversion_dataframe():
     np.testing.assert_allclose(utm_df.loc[:, ["x", "y", "z"]].values, utm_ref)
 
 
+@pytest.mark.unit_tests
+@pytest.mark.parametrize("nb_threads", [None, 2])
+def test_points_cloud_conversion_dataset(nb_threads):
+    """
+    Test points_cloud_conversion_dataset with the serial and parallel
+    geodesy kernels
+    """
+    llh = np.load(absolute_data_path("input/rasterization_input/llh.npy"))
+    utm_ref = np.load(absolute_data_path("ref_output/utm_cloud.npy"))
+
+    cloud = xr.Dataset(
+        {
+            cst.X: ([cst.ROW, cst.COL], llh[:, :, 0]),
+            cst.Y: ([cst.ROW, cst.COL], llh[:, :, 1]),
+            cst.Z: ([cst.ROW, cst.COL], llh[:, :, 2]),
+        },
+        attrs={cst.EPSG: 4326},
+    )
+    projection.points_cloud_conversion_dataset(cloud, 32630, nb_threads)
+
+    assert cloud.attrs[cst.EPSG] == 32630
+    for idx, coord in enumerate([cst.X, cst.Y, cst.Z]):
+        np.testing.assert_allclose(cloud[coord].values.ravel(), utm_ref[:, idx])
+
+
+@pytest.mark.unit_tests
+def test_points_coordinates_conversion():
+    """
+    Test the in place conversion of contiguous coordinates arrays
+    with the cached transformers
+    """
+    llh = np.load(absolute_data_path("input/rasterization_input/llh.npy"))
+    utm_ref = np.load(absolute_data_path("ref_output/utm_cloud.npy"))
+
+    coords = [
+        np.ascontiguousarray(llh[:, :, idx], dtype=np.float64)
+        for idx in range(3)
+    ]
+    utm = projection.points_coordinates_conversion(*coords, 4326, 32630)
+    for idx in range(3):
+        assert utm[idx] is coords[idx]
+        np.testing.assert_allclose(utm[idx].ravel(), utm_ref[:, idx])
+
+    # strided (or float32) arrays are converted on copies
+    llh_x = llh[:, :, 0]
+    utm = projection.points_coordinates_conversion(
+        llh_x, llh[:, :, 1], llh[:, :, 2], 4326, 32630
+    )
+    assert utm[0] is not llh_x
+    np.testing.assert_allclose(utm[0].ravel(), utm_ref[:, 0])
+
+    assert projection.get_transformer(4326, 32630) is (
+        projection.get_transformer(4326, 32630)
+    )
+
+
+@pytest.mark.unit_tests
+def test_get_cloud_filtering_epsg():
+    """
+    Test the filtering referential of projected and geographic outputs
+    """
+    assert projection.get_cloud_filtering_epsg(32630) == 32630
+    assert projection.get_cloud_filtering_epsg(2154) == 2154
+    assert projection.get_cloud_filtering_epsg(4326) == 4978
+    assert projection.get_cloud_filtering_epsg(4978) == 4978
+
+
 @pytest.mark.unit_tests
 def test_compute_dem_intersection_with_poly():
     """
@@ -132,6 +202,83 @@ def test_compute_dem_intersection_with_poly():
     )
 
 
+@pytest.mark.unit_tests
+def test_get_dem_tiles_index(monkeypatch):
+    """
+    Test the DEM tiles footprints index persistence and invalidation
+    """
+    inter_poly = Polygon(
+        [(4.8, 44.2), (4.8, 44.3), (6.2, 44.3), (6.2, 44.2), (4.8, 44.2)]
+    )
+    srtm_dir = absolute_data_path("input/utils_input/srtm_with_hole")
+
+    read_tiles = []
+    read_dem_tile_footprint = projection.read_dem_tile_footprint
+
+    def counted_read_dem_tile_footprint(tile_path):
+        read_tiles.append(os.path.basename(tile_path))
+        return read_dem_tile_footprint(tile_path)
+
+    monkeypatch.setattr(
+        projection, "read_dem_tile_footprint", counted_read_dem_tile_footprint
+    )
+
+    monkeypatch.setattr(projection, "_DEM_TILES_INDEXES", {})
+
+    with tempfile.TemporaryDirectory(
+        dir=temporary_dir()
+    ) as directory, tempfile.TemporaryDirectory(
+        dir=temporary_dir()
+    ) as cache_dir:
+        monkeypatch.setenv("XDG_CACHE_HOME", cache_dir)
+        for tile in ["N44E005.hgt", "N44E006.hgt"]:
+            shutil.copy(os.path.join(srtm_dir, tile), directory)
+
+        # the index is built and persisted out of the DEM directory
+        (
+            ref_inter_poly,
+            ref_cover,
+        ) = projection.compute_dem_intersection_with_poly(
+            directory, inter_poly, 4326
+        )
+        assert sorted(read_tiles) == ["N44E005.hgt", "N44E006.hgt"]
+        index_path = projection.get_dem_index_path(directory)
+        assert index_path.startswith(cache_dir)
+        assert os.path.isfile(index_path)
+        assert sorted(os.listdir(directory)) == ["N44E005.hgt", "N44E006.hgt"]
+
+        # the persisted index is used without reading the tiles
+        monkeypatch.setattr(projection, "_DEM_TILES_INDEXES", {})
+        read_tiles.clear()
+        dem_inter_poly, cover = projection.compute_dem_intersection_with_poly(
+            directory, inter_poly, 4326
+        )
+        assert read_tiles == []
+        assert dem_inter_poly.equals(ref_inter_poly)
+        assert cover == ref_cover
+
+        # only the modified tiles are read again
+        os.utime(os.path.join(directory, "N44E006.hgt"), ns=(0, 0))
+        os.remove(os.path.join(directory, "N44E005.hgt"))
+        tiles = projection.get_dem_tiles_index(directory)
+        assert read_tiles == ["N44E006.hgt"]
+        assert list(tiles) == ["N44E006.hgt"]
+        assert tiles["N44E006.hgt"]["epsg"] == 4326
+
+        # the in-memory index is used when it can not be persisted
+        unwritable_cache = os.path.join(cache_dir, "file")
+        with open(unwritable_cache, "w", encoding="utf-8"):
+            pass
+        monkeypatch.setenv("XDG_CACHE_HOME", unwritable_cache)
+        monkeypatch.setattr(projection, "_DEM_TILES_INDEXES", {})
+        read_tiles.clear()
+        projection.get_dem_tiles_index(directory)
+        assert read_tiles == ["N44E006.hgt"]
+        read_tiles.clear()
+        assert projection.get_dem_tiles_index(directory) == tiles
+        assert read_tiles == []
+
+
 @pytest.mark.unit_tests
 def test_ground_positions_from_envelopes():
     """
@@ -276,6 +276,76 @@ def test_tiles_pairing(
                 pass
 
 
+@pytest.mark.unit_tests
+def test_get_corresponding_tiles():
+    """
+    Test get_corresponding_tiles against a list_tiles look-up
+    of each terrain region epipolar region
+    """
+    rng = np.random.default_rng(0)
+    terrain_grid = tiling.grid(0, 0, 100, 70, 10, 10)
+    grid_shape = terrain_grid.shape[:2]
+
+    largest_epipolar_region = [0, 0, 612, 500]
+    epipolar_tile_size = 70
+    epipolar_regions = tiling.split(
+        *largest_epipolar_region, epipolar_tile_size, epipolar_tile_size
+    )
+    epipolar_regions_hash = [
+        tiling.region_hash_string(k) for k in epipolar_regions
+    ]
+
+    points_min = rng.uniform(-50, 650, (*grid_shape, 2))
+    points_max = points_min + rng.uniform(-20, 150, (*grid_shape, 2))
+    # some terrain grid points are not localized in the epipolar grid
+    points_min[0, 3] = np.nan
+
+    confdata = {
+        "c1": {
+            "epipolar_points_min": points_min,
+            "epipolar_points_max": points_max,
+            "largest_epipolar_region": largest_epipolar_region,
+            "opt_epipolar_tile_size": epipolar_tile_size,
+            "epipolar_regions_hash": epipolar_regions_hash,
+            "delayed_point_clouds": epipolar_regions,
+        }
+    }
+
+    terrain_regions, corresp_tiles, rank = tiling.get_corresponding_tiles(
+        terrain_grid, confdata
+    )
+
+    assert len(terrain_regions) == len(corresp_tiles) == len(rank) == 7 * 10
+    for terrain_region_dix, required_tiles in enumerate(corresp_tiles):
+        j, i = divmod(terrain_region_dix, grid_shape[1] - 1)
+        assert terrain_regions[terrain_region_dix] == [
+            *terrain_grid[j, i],
+            *terrain_grid[j + 1, i + 1],
+        ]
+        assert rank[terrain_region_dix] == i * i + j * j
+
+        corners_min = points_min[j : j + 2, i : i + 2].reshape(-1, 2)
+        corners_max = points_max[j : j + 2, i : i + 2].reshape(-1, 2)
+        corners = np.concatenate((corners_min, corners_max))
+        epipolar_region = tiling.crop(
+            [*np.min(corners, axis=0), *np.max(corners, axis=0)],
+            largest_epipolar_region,
+        )
+
+        ref_tiles = []
+        if not tiling.empty(epipolar_region):
+            ref_tiles = [
+                tile
+                for tile in tiling.list_tiles(
+                    epipolar_region,
+                    largest_epipolar_region,
+                    epipolar_tile_size,
+                )
+                if tile in epipolar_regions
+            ]
+        assert required_tiles == ref_tiles
+
+
 @pytest.mark.unit_tests
 def test_filter_simplices_on_the_edges():
     """
@@ -24,6 +24,7 @@ Test module for cars/core/utils.py
 # TODO: refacto/clean/dispatch with utils cars module
 
 # Third party imports
+import numba
 import numpy as np
 import pytest
 
@@ -59,3 +60,33 @@ def test_angle_vectors():
     angle_result = utils.angle_vectors(vector_1, vector_2)
 
     assert angle_result == angle_ref
+
+
+@pytest.mark.unit_tests
+def test_numba_threads():
+    """
+    Test the numba threads number setting and restoring
+    """
+    max_nb_threads = numba.config.NUMBA_NUM_THREADS
+    previous_nb_threads = numba.get_num_threads()
+
+    for nb_threads in [None, 0, 1]:
+        with utils.numba_threads(nb_threads) as parallel:
+            assert not parallel
+            assert numba.get_num_threads() == previous_nb_threads
+
+    for nb_threads, expected in [
+        (-1, max_nb_threads),
+        (2, min(2, max_nb_threads)),
+        (max_nb_threads + 1, max_nb_threads),
+    ]:
+        with utils.numba_threads(nb_threads) as parallel:
+            assert parallel
+            assert numba.get_num_threads() == expected
+        assert numba.get_num_threads() == previous_nb_threads
+
+    # the threads number is restored on errors
+    with pytest.raises(ValueError):
+        with utils.numba_threads(-1):
+            raise ValueError()
+    assert numba.get_num_threads() == previous_nb_threads
@@ -27,10 +27,17 @@ TODO: add conftest.py general tests conf with tests refactor.
 """
 
 # Standard imports
+import argparse
+import json
+import math
 import os
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
 
 # Third party imports
 import numpy as np
+import pandas
 import pandora
 import rasterio as rio
 from pandora.check_json import (
@@ -41,6 +48,7 @@ from pandora.check_json import (
 from pandora.state_machine import PandoraMachine
 
 # CARS imports
+from cars.core import constants as cst
 from cars.externals.matching.correlator_configuration.corr_conf import (
     check_input_section_custom_cars,
     get_config_input_custom_cars,
@@ -189,3 +197,168 @@ def create_corr_conf():
     # concatenate updated config
     cfg = concat_conf([cfg_input, cfg_pipeline])
     return cfg
+
+
+def generate_synthetic_cloud(
+    nb_points: int,
+    density: float,
+    nb_bands: int = 3,
+    with_mask: bool = False,
+    seed: int = 0,
+) -> pandas.DataFrame:
+    """
+    Generate a synthetic combined cloud for the benchmarks, as returned by
+    points_cloud.create_combined_cloud: points uniformly spread on a square
+    with a smooth terrain, random colors and optional mask classes.
+
+    :param nb_points: number of points of the cloud
+    :param density: number of points per square cloud CRS unit
+    :param nb_bands: number of color bands
+    :param with_mask: add a mask column with classes in [0, 3]
+    :param seed: seed of the random generator
+    :return: the synthetic cloud
+    """
+    rng = np.random.default_rng(seed)
+    side = math.sqrt(nb_points / density)
+
+    x_coords = rng.uniform(0, side, nb_points)
+    y_coords = rng.uniform(0, side, nb_points)
+    z_coords = (
+        50 * np.sin(x_coords / side * np.pi) * np.cos(y_coords / side * np.pi)
+        + rng.normal(0, 0.5, nb_points)
+        + 100
+    )
+
+    cloud = pandas.DataFrame(
+        {
+            cst.POINTS_CLOUD_VALID_DATA: np.ones(nb_points),
+            cst.X: x_coords,
+            cst.Y: y_coords,
+            cst.Z: z_coords,
+        }
+    )
+    for band in range(nb_bands):
+        cloud["{}{}".format(cst.POINTS_CLOUD_CLR_KEY_ROOT, band)] = rng.uniform(
+            0, 255, nb_points
+        )
+    if with_mask:
+        cloud[cst.POINTS_CLOUD_MSK] = rng.integers(0, 4, nb_points).astype(
+            np.float64
+        )
+
+    return cloud
+
+
+def measure(
+    func: Callable, *args, nb_repeats: int = 1, **kwargs
+) -> Tuple[object, float, float]:
+    """
+    Measure the execution time and the memory peak of a function call.
+    The time is the best of nb_repeats runs, the memory peak is traced
+    (numpy and python allocations) during an additional run, so that the
+    tracing overhead does not impact the measured time.
+
+    :param func: function to measure
+    :param args: positional arguments of the function
+    :param nb_repeats: number of timed runs
+    :param kwargs: keyword arguments of the function
+    :return: the function result, the time in seconds
+        and the memory peak in MB
+    """
+    elapsed = math.inf
+    for _ in range(nb_repeats):
+        tic = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = min(elapsed, time.perf_counter() - tic)
+
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, elapsed, peak / 1024 ** 2
+
+
+def format_benchmark(
+    benchmark: Dict, columns: List[Tuple[str, str, int, str]]
+) -> str:
+    """
+    Format a benchmark result as a text table
+
+    :param benchmark: benchmark result, with its "configuration" and the
+        results of each of its "stages"
+    :param columns: (result key, header, width, format) of each column
+    :return: the text table
+    """
+    lines = [
+        ", ".join(
+            "{}={}".format(key, value)
+            for key, value in benchmark["configuration"].items()
+        ),
+        "{:<24}".format("stage")
+        + "".join(
+            "{:>{}}".format(header, width) for _, header, width, _ in columns
+        ),
+    ]
+    for stage, results in benchmark["stages"].items():
+        lines.append(
+            "{:<24}".format(stage)
+            + "".join(
+                "{:>{}{}}".format(results[key], width, value_format)
+                for key, _, width, value_format in columns
+            )
+        )
+
+    return "\n".join(lines)
+
+
+def get_benchmark_parser(description: str) -> argparse.ArgumentParser:
+    """
+    Create the command line parser of a benchmark module, with the synthetic
+    clouds sizes and densities, the number of timed runs and the output file
+
+    :param description: description of the benchmarks
+    :return: the parser, to be completed with the benchmark arguments
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--nb_points", type=int, nargs="+", default=[100000, 1000000]
+    )
+    parser.add_argument(
+        "--density",
+        type=float,
+        nargs="+",
+        default=[4.0],
+        help="points per square cloud CRS unit",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="timed runs of each stage"
+    )
+    parser.add_argument("--output", help="json file to write the results")
+
+    return parser
+
+
+def report_benchmarks(
+    benchmarks: Iterable[Dict],
+    columns: List[Tuple[str, str, int, str]],
+    output: str = None,
+):
+    """
+    Print the benchmarks results as they are run,
+    and write them all in a json file
+
+    :param benchmarks: benchmarks results (see format_benchmark)
+    :param columns: columns of the printed tables (see format_benchmark)
+    :param output: json file to write the results, if not None
+    """
+    results = []
+    for benchmark in benchmarks:
+        print(format_benchmark(benchmark, columns) + "\n")
+        results.append(benchmark)
+
+    if output is not None:
+        with open(output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
@@ -25,12 +25,14 @@ Important : Uses conftest.py for shared pytest fixtures
 
 
 # Third party imports
+import numpy as np
 import pytest
 import xarray as xr
 
 # CARS imports
 from cars.core import constants as cst
 from cars.pipelines import wrappers
+from cars.steps import points_cloud
 
 # CARS Tests imports
 from ..helpers import absolute_data_path, assert_same_datasets, create_corr_conf
@@ -85,3 +87,90 @@ def test_images_pair_to_3d_points(
         absolute_data_path("ref_output/cloud1_ref_pandora.nc")
     )
     assert_same_datasets(cloud[cst.STEREO_REF], ref, atol=1.0e-3)
+
+    # The conversion to ECEF by the parallel geodesy kernels gives the same
+    # clouds as the serial one
+    ecef_clouds = [
+        wrappers.images_pair_to_3d_points(
+            configuration,
+            region,
+            corr_cfg,
+            disp_min=-13,
+            disp_max=14,
+            out_epsg=4978,
+            add_msk_info=True,
+            nb_threads=nb_threads,
+        )[0][cst.STEREO_REF]
+        for nb_threads in [None, 2]
+    ]
+    assert ecef_clouds[1].attrs[cst.EPSG] == 4978
+    assert_same_datasets(ecef_clouds[1], ecef_clouds[0], atol=1.0e-6)
+
+
+@pytest.mark.unit_tests
+def test_images_pair_to_3d_points_with_filtering(
+    images_and_grids_conf,
+    color1_conf,  # pylint: disable=redefined-outer-name
+    no_data_conf,
+    disparities_conf,  # pylint: disable=redefined-outer-name
+    epipolar_origins_spacings_conf,  # pylint: disable=redefined-outer-name
+    epipolar_sizes_conf,
+):  # pylint: disable=redefined-outer-name
+    """
+    Test images_pair_to_3d_points on ventoux dataset (epipolar geometry)
+    with the clouds filtering: the clouds are filtered with a halo which is
+    then removed, so that they cover the same region as without filtering
+    Note: Fixtures parameters are set and shared in conftest.py
+    """
+    configuration = images_and_grids_conf
+    configuration["input"].update(color1_conf["input"])
+    configuration["input"].update(no_data_conf["input"])
+    configuration["preprocessing"]["output"].update(
+        epipolar_sizes_conf["preprocessing"]["output"]
+    )
+    configuration["preprocessing"]["output"].update(
+        epipolar_origins_spacings_conf["preprocessing"]["output"]
+    )
+    configuration["preprocessing"]["output"].update(
+        disparities_conf["preprocessing"]["output"]
+    )
+
+    region = [420, 200, 530, 320]
+    corr_cfg = create_corr_conf()
+
+    cloud, color = wrappers.images_pair_to_3d_points(
+        configuration,
+        region,
+        corr_cfg,
+        disp_min=-13,
+        disp_max=14,
+        out_epsg=4978,
+        small_cpn_filter_params=points_cloud.SmallComponentsFilterParams(
+            0, 3.0, 50, None, False, 255, points_cloud.RADIUS_CONNECTIVITY
+        ),
+        statistical_filter_params=points_cloud.StatisticalFilterParams(
+            50, 5.0, False, 255
+        ),
+        filtering_halo=20,
+        nb_threads=2,
+    )
+
+    ref = xr.open_dataset(
+        absolute_data_path("ref_output/cloud1_ref_pandora.nc")
+    )
+    ref_cloud = cloud[cst.STEREO_REF]
+    np.testing.assert_array_equal(
+        ref_cloud[cst.ROW].values, ref[cst.ROW].values
+    )
+    np.testing.assert_array_equal(
+        ref_cloud[cst.COL].values, ref[cst.COL].values
+    )
+    np.testing.assert_array_equal(ref_cloud.attrs[cst.ROI], region)
+    assert color[cst.STEREO_REF][cst.ROW].size == ref[cst.ROW].size
+    assert color[cst.STEREO_REF][cst.COL].size == ref[cst.COL].size
+
+    # the filters do not empty the cloud
+    nb_valid = np.count_nonzero(
+        ref_cloud[cst.POINTS_CLOUD_CORR_MSK].values == 255
+    )
+    assert 0 < nb_valid < ref_cloud[cst.POINTS_CLOUD_CORR_MSK].size
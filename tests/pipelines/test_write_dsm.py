@@ -26,6 +26,7 @@ Test module for cars/pipelines/write_dsm.py
 # Standard imports
 import os
 import tempfile
+from glob import glob
 
 # Third party imports
 import dask
@@ -34,10 +35,11 @@ import pytest
 import rasterio as rio
 import xarray as xr
 from affine import Affine
-from osgeo import osr
+from osgeo import gdal, osr
 
 # CARS imports
 from cars.cluster.dask_mode import start_local_cluster, stop_local_cluster
+from cars.core import constants as cst
 from cars.pipelines import write_dsm
 from cars.steps import rasterization
 
@@ -138,9 +140,9 @@ def test_write_geotiff_dsm():
         msk_no_data = 255
         xstart, ystart, xsize, ysize = [0, 10, 10, 10]
 
-        raster = np.ndarray(shape=(10, 10, 2), dtype=np.float32)
-        mean = np.ndarray(shape=(10, 10, 2), dtype=np.float32)
-        stdev = np.ndarray(shape=(10, 10, 2), dtype=np.float32)
+        raster = np.ndarray(shape=(2, 10, 10), dtype=np.float32)
+        mean = np.ndarray(shape=(2, 10, 10), dtype=np.float32)
+        stdev = np.ndarray(shape=(2, 10, 10), dtype=np.float32)
         n_pts = np.ndarray(shape=(10, 10), dtype=np.uint16)
         n_in_cell = np.ndarray(shape=(10, 10), dtype=np.uint16)
         msk = np.ndarray(shape=(10, 10), dtype=np.uint16)
@@ -247,3 +249,237 @@ def test_write_geotiff_dsm():
                         assert rio_actual.read()[0][i][j] == msk_no_data
                     else:
                         assert rio_actual.read()[0][i][j] == msk[i][j]
+
+
+def average_raster(
+    raster: np.ndarray, factor: int, nodata: float
+) -> np.ndarray:
+    """
+    Average the valid pixels of the factor x factor blocks of a raster
+
+    :param raster: raster of shape (nb_bands, nb_rows, nb_cols)
+    :param factor: decimation factor
+    :param nodata: no data value of the raster
+    :return: the averaged raster
+    """
+    nb_bands, y_size, x_size = raster.shape
+    nb_rows = (y_size + factor - 1) // factor
+    nb_cols = (x_size + factor - 1) // factor
+    averaged = np.full((nb_bands, nb_rows, nb_cols), nodata, np.float32)
+    for band in range(nb_bands):
+        for row in range(nb_rows):
+            for col in range(nb_cols):
+                block = raster[
+                    band,
+                    row * factor : (row + 1) * factor,
+                    col * factor : (col + 1) * factor,
+                ]
+                block = block[np.logical_and(block != nodata, ~np.isnan(block))]
+                if block.size > 0:
+                    averaged[band, row, col] = np.mean(block)
+
+    return averaged
+
+
+@pytest.mark.unit_tests
+def test_overviews():
+    """
+    Test the overviews streamed while writing tiles not aligned on the
+    overviews grid and received in any order, directly or from the saved
+    decimated blocks of the tiles, against a direct decimation of the full
+    raster.
+    """
+    dsm_no_data = -32768
+    x_size, y_size = 53, 37
+    full_raster = np.arange(x_size * y_size, dtype=np.float32).reshape(
+        (1, y_size, x_size)
+    )
+    full_raster[0, 10:15, 20:22] = dsm_no_data
+    full_raster[0, 30, 40] = np.nan
+
+    tiles = [
+        (row_0, row_1, col_0, col_1)
+        for row_0, row_1 in [(0, 7), (7, 20), (20, y_size)]
+        for col_0, col_1 in [(0, 5), (5, 30), (30, x_size)]
+    ]
+    np.random.default_rng(0).shuffle(tiles)
+
+    nb_levels = 3
+    levels = {}
+    for averaged in [True, False]:
+        for from_blocks in [False, True]:
+            overviews = write_dsm.StreamedOverviews(
+                x_size, y_size, nb_levels, averaged, dsm_no_data, np.float32
+            )
+            streamed_levels = [
+                np.zeros(
+                    (
+                        1,
+                        (y_size + factor - 1) // factor,
+                        (x_size + factor - 1) // factor,
+                    ),
+                    np.float32,
+                )
+                for factor in [2, 4, 8]
+            ]
+            with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+                for row_0, row_1, col_0, col_1 in tiles:
+                    tile = full_raster[:, row_0:row_1, col_0:col_1]
+                    if from_blocks:
+                        tile_file = os.path.join(directory, "dsm.tif")
+                        write_dsm.save_overviews_blocks(
+                            tile_file,
+                            write_dsm.decimate_tile(
+                                tile,
+                                col_0,
+                                row_0,
+                                nb_levels,
+                                averaged,
+                                dsm_no_data,
+                            ),
+                            dsm_no_data,
+                            np.float32,
+                        )
+                        blocks, nodata, dtype = write_dsm.load_overviews_blocks(
+                            write_dsm.get_overviews_blocks_file(tile_file)
+                        )
+                        assert nodata == dsm_no_data
+                        assert dtype == np.float32
+                        windows = overviews.add_blocks(blocks)
+                    else:
+                        windows = overviews.add_tile(tile, col_0, row_0)
+
+                    for level, win_row, win_col, values in windows:
+                        streamed_levels[level][
+                            :,
+                            win_row : win_row + values.shape[1],
+                            win_col : win_col + values.shape[2],
+                        ] = values
+
+            # all the overview pixels are completed
+            assert all(len(pending) == 0 for pending in overviews.pending)
+            levels[averaged, from_blocks] = streamed_levels
+
+    for level, factor in enumerate([2, 4, 8]):
+        ref_level = average_raster(full_raster, factor, dsm_no_data)
+        for from_blocks in [False, True]:
+            np.testing.assert_allclose(
+                levels[True, from_blocks][level], ref_level
+            )
+            np.testing.assert_array_equal(
+                levels[False, from_blocks][level],
+                full_raster[:, ::factor, ::factor],
+            )
+
+    assert write_dsm.get_overviews_factors(1000, 300) == [2]
+    assert write_dsm.get_overviews_factors(100, 100) == []
+
+
+@pytest.mark.unit_tests
+def test_write_geotiff_dsm_overviews():
+    """
+    Test the internal overviews of the DSM written from tiles not aligned
+    on the overviews grid, by a single writer and from the decimated blocks
+    of a mosaic of tiles files.
+    """
+    resolution = 0.5
+    epsg = 32630
+    dsm_no_data = -32768
+    x_size, y_size = 600, 520
+    bounds = (0, 100, x_size * resolution, 100 + y_size * resolution)
+    full_raster = (
+        np.random.default_rng(0)
+        .uniform(0, 100, (1, y_size, x_size))
+        .astype(np.float32)
+    )
+    full_raster[0, 100:300, 200:250] = dsm_no_data
+
+    raster_tiles = []
+    for row_0, row_1 in [(0, 201), (201, 377), (377, y_size)]:
+        for col_0, col_1 in [(0, 255), (255, 433), (433, x_size)]:
+            raster_tiles.append(
+                rasterization.create_raster_dataset(
+                    full_raster[:, row_0:row_1, col_0:col_1].copy(),
+                    bounds[0] + col_0 * resolution,
+                    bounds[3] - row_0 * resolution,
+                    col_1 - col_0,
+                    row_1 - row_0,
+                    resolution,
+                    dsm_no_data,
+                    0,
+                    epsg,
+                    None,
+                    None,
+                    None,
+                    None,
+                )
+            )
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        # single writer
+        write_dsm.write_geotiff_dsm(
+            raster_tiles,
+            directory,
+            x_size,
+            y_size,
+            bounds,
+            resolution,
+            epsg,
+            1,
+            dsm_no_data,
+            0,
+            output_layers=[rasterization.DSM_LAYER],
+            overviews=True,
+        )
+        dsm_files = [os.path.join(directory, "dsm.tif")]
+
+        # tiles files mosaicked
+        tmp_dir = os.path.join(directory, "tmp")
+        os.makedirs(tmp_dir)
+        for idx, raster_tile in enumerate(raster_tiles):
+            tile_x_size = raster_tile[cst.X].size
+            tile_y_size = raster_tile[cst.Y].size
+            tile_x_0 = float(raster_tile[cst.X].min()) - 0.5 * resolution
+            tile_y_0 = float(raster_tile[cst.Y].max()) + 0.5 * resolution
+            write_dsm.write_geotiff_dsm(
+                [raster_tile],
+                tmp_dir,
+                tile_x_size,
+                tile_y_size,
+                (
+                    tile_x_0,
+                    tile_y_0 - tile_y_size * resolution,
+                    tile_x_0 + tile_x_size * resolution,
+                    tile_y_0,
+                ),
+                resolution,
+                epsg,
+                1,
+                dsm_no_data,
+                0,
+                prefix="{}_".format(idx),
+                output_layers=[rasterization.DSM_LAYER],
+                overviews=True,
+                overviews_bounds=bounds,
+            )
+        mosaic_file = os.path.join(directory, "mosaic_dsm.tif")
+        vrt_file = os.path.join(directory, "dsm.vrt")
+        gdal.BuildVRT(vrt_file, glob(os.path.join(tmp_dir, "*_dsm.tif")))
+        gdal.Translate(mosaic_file, gdal.Open(vrt_file))
+        write_dsm.write_overviews_from_blocks(
+            mosaic_file,
+            rasterization.DSM_LAYER,
+            glob(os.path.join(tmp_dir, "*_dsm_overviews.npz")),
+        )
+        dsm_files.append(mosaic_file)
+
+        for dsm_file in dsm_files:
+            with rio.open(dsm_file) as dsm:
+                assert dsm.overviews(1) == [2]
+                np.testing.assert_array_equal(dsm.read(), full_raster)
+            with rio.open(dsm_file, overview_level=0) as overview:
+                np.testing.assert_allclose(
+                    overview.read(),
+                    average_raster(full_raster, 2, dsm_no_data),
+                    rtol=1e-6,
+                )
@@ -365,6 +365,12 @@ def test_create_combined_cloud():
 
     assert np.allclose(cloud, ref_cloud_coords)
 
+    # each column keeps its own type
+    assert cloud[cst.POINTS_CLOUD_VALID_DATA].dtype == np.uint8
+    assert cloud[cst.X].dtype == np.float64
+    assert cloud[cst.POINTS_CLOUD_COORD_EPI_GEOM_I].dtype == np.int32
+    assert cloud[cst.POINTS_CLOUD_IDX_IM_EPI].dtype == np.int32
+
     # test exception
     with pytest.raises(Exception) as test_error:
         points_cloud.create_combined_cloud(
@@ -422,6 +428,87 @@ def test_detect_small_components():
     assert sorted(indexes_to_filter) == [0, 1, 3, 4, 5, 6, 24]
 
 
+@pytest.mark.unit_tests
+def test_small_components_epipolar_grid_connectivity():
+    """
+    Create fake epipolar clouds to process and test the small components
+    filtering with the epipolar grid connectivity
+    """
+    # first epipolar image: a 10x10 plane with a point above it
+    rows, cols = np.mgrid[0:10, 0:10]
+    rows, cols = rows.ravel(), cols.ravel()
+    z_coord = np.zeros(100)
+    z_coord[55] = 10
+    # second epipolar image: a 2x2 patch lying on the first plane
+    # (same positions of the images are not connected)
+    patch_rows, patch_cols = np.mgrid[2:4, 2:4]
+    patch_rows, patch_cols = patch_rows.ravel(), patch_cols.ravel()
+
+    cloud = pandas.DataFrame(
+        {
+            cst.X: np.concatenate((cols, patch_cols + 0.5)).astype(float),
+            cst.Y: np.concatenate((rows, patch_rows + 0.5)).astype(float),
+            cst.Z: np.concatenate((z_coord, np.zeros(4))),
+            cst.POINTS_CLOUD_COORD_EPI_GEOM_I: np.concatenate(
+                (rows, patch_rows + 40)
+            ),
+            cst.POINTS_CLOUD_COORD_EPI_GEOM_J: np.concatenate(
+                (cols, patch_cols + 100)
+            ),
+            cst.POINTS_CLOUD_IDX_IM_EPI: np.repeat([0, 1], [100, 4]),
+        }
+    )
+    cloud_xyz = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
+    epipolar_positions = cloud.loc[
+        :,
+        [
+            cst.POINTS_CLOUD_COORD_EPI_GEOM_I,
+            cst.POINTS_CLOUD_COORD_EPI_GEOM_J,
+            cst.POINTS_CLOUD_IDX_IM_EPI,
+        ],
+    ].values
+
+    # the radius connectivity connects the patch to the plane
+    assert points_cloud.detect_small_components(cloud_xyz, 1.5, 5) == [55]
+
+    # the diagonal neighbors are connected, not the other images points
+    pairs = points_cloud.get_epipolar_grid_pairs(
+        cloud_xyz, epipolar_positions, 1.5
+    )
+    assert len(pairs) == 2 * 9 * 10 + 2 * 9 * 9 - 8 + 6
+    assert np.all(
+        cloud[cst.POINTS_CLOUD_IDX_IM_EPI].values[pairs[:, 0]]
+        == cloud[cst.POINTS_CLOUD_IDX_IM_EPI].values[pairs[:, 1]]
+    )
+    assert points_cloud.detect_small_components(
+        cloud_xyz, 1.5, 5, epipolar_positions=epipolar_positions
+    ) == [55, 100, 101, 102, 103]
+
+    # the second level of filtering keeps the patch near the plane
+    filtered_cloud, removed_pos = points_cloud.small_components_filtering(
+        cloud,
+        1.5,
+        5,
+        1,
+        filtered_elt_pos=True,
+        connectivity=points_cloud.EPIPOLAR_GRID_CONNECTIVITY,
+    )
+    assert len(filtered_cloud) == 103
+    assert removed_pos.values.tolist() == [[5, 5, 0]]
+
+    with pytest.raises(NotImplementedError):
+        points_cloud.small_components_filtering(
+            cloud, 1.5, 5, connectivity="unknown"
+        )
+    with pytest.raises(Exception):
+        points_cloud.small_components_filtering(
+            cloud.loc[:, [cst.X, cst.Y, cst.Z]],
+            1.5,
+            5,
+            connectivity=points_cloud.EPIPOLAR_GRID_CONNECTIVITY,
+        )
+
+
 @pytest.mark.unit_tests
 def test_detect_statistical_outliers():
     """
@@ -465,6 +552,102 @@ def test_detect_statistical_outliers():
     assert sorted(removed_elt_pos) == [23, 29]
 
 
+@pytest.mark.unit_tests
+def test_filters_spatial_index():
+    """
+    Test that the filters give the same results with a spatial index
+    shared with a previous filter (built on all the points, with the
+    removed points masked) as with their own kd-tree
+    """
+    rng = np.random.default_rng(0)
+    cloud_xyz = np.concatenate(
+        [rng.uniform(0, 10, (2000, 3)), rng.uniform(20, 40, (50, 3))]
+    )
+
+    spatial_index = points_cloud.CloudSpatialIndex(cloud_xyz)
+    removed_elt_pos = points_cloud.detect_small_components(
+        cloud_xyz, 0.6, 10, None, spatial_index
+    )
+    assert removed_elt_pos == points_cloud.detect_small_components(
+        cloud_xyz, 0.6, 10, None
+    )
+    spatial_index.remove(removed_elt_pos)
+    kept_xyz = np.delete(cloud_xyz, removed_elt_pos, axis=0)
+
+    for k in [5, 20]:
+        assert points_cloud.detect_statistical_outliers(
+            kept_xyz, k, 1.0, chunk_size=500, spatial_index=spatial_index
+        ) == points_cloud.detect_statistical_outliers(kept_xyz, k, 1.0)
+
+    # the positions of the remaining points follow the removals
+    removed_elt_pos = list(range(0, len(kept_xyz), 3))
+    spatial_index.remove(removed_elt_pos)
+    kept_xyz = np.delete(kept_xyz, removed_elt_pos, axis=0)
+    assert np.count_nonzero(spatial_index.positions >= 0) == len(kept_xyz)
+    assert points_cloud.detect_small_components(
+        kept_xyz, 0.6, 10, 2.0, spatial_index
+    ) == points_cloud.detect_small_components(kept_xyz, 0.6, 10, 2.0)
+
+
+@pytest.mark.unit_tests
+def test_filter_epipolar_clouds():
+    """
+    Create fake reference and secondary epipolar clouds
+    and test their filtering with filter_epipolar_clouds
+    """
+    rows, cols = np.mgrid[0:10, 0:10].astype(np.float64)
+
+    def get_cloud_ds(z_coord):
+        """
+        Create a 10x10 epipolar cloud on a plane
+        """
+        cloud = xr.Dataset(
+            {
+                cst.X: ([cst.ROW, cst.COL], cols),
+                cst.Y: ([cst.ROW, cst.COL], rows),
+                cst.Z: ([cst.ROW, cst.COL], z_coord),
+                cst.POINTS_CLOUD_CORR_MSK: (
+                    [cst.ROW, cst.COL],
+                    np.full((10, 10), 255, dtype=np.uint8),
+                ),
+            },
+            coords={cst.ROW: np.arange(10, 20), cst.COL: np.arange(10)},
+        )
+        cloud.attrs[cst.EPSG] = 4978
+        return cloud
+
+    # an isolated point in the reference cloud
+    # and a small cluster in the secondary one
+    ref_z = np.zeros((10, 10))
+    ref_z[2, 3] = 50
+    sec_z = np.zeros((10, 10)) + 0.5
+    sec_z[7:9, 7:9] = -40
+    cloud_list = [get_cloud_ds(ref_z), get_cloud_ds(sec_z)]
+
+    small_cpn_filter_params = points_cloud.SmallComponentsFilterParams(
+        0, 2.0, 5, None, True, 255, points_cloud.RADIUS_CONNECTIVITY
+    )
+    points_cloud.filter_epipolar_clouds(cloud_list, small_cpn_filter_params)
+
+    ref_msk = np.full((10, 10), 255)
+    ref_msk[2, 3] = 0
+    sec_msk = np.full((10, 10), 255)
+    sec_msk[7:9, 7:9] = 0
+    np.testing.assert_array_equal(
+        cloud_list[0][cst.POINTS_CLOUD_CORR_MSK].values, ref_msk
+    )
+    np.testing.assert_array_equal(
+        cloud_list[1][cst.POINTS_CLOUD_CORR_MSK].values, sec_msk
+    )
+    np.testing.assert_array_equal(
+        cloud_list[1]["filtered_elt_mask"].values, 255 - sec_msk
+    )
+
+    # the filtered points are not combined anymore
+    combined_cloud, _ = points_cloud.create_combined_cloud(cloud_list, 4978)
+    assert len(combined_cloud) == 195
+
+
 @pytest.mark.unit_tests
 def test_filter_cloud():
     """
@@ -556,6 +739,11 @@ def test_add_cloud_filtering_msk():
     assert_same_datasets(ds0_ref, ds0)
     assert_same_datasets(ds1_ref, ds1)
 
+    # test without any filtered element
+    ds2 = xr.Dataset({}, coords={"row": rows, "col": cols})
+    points_cloud.add_cloud_filtering_msk([ds2], elt_remove[:0], "mask", 255)
+    assert np.all(ds2["mask"].values == 0)
+
     # test exceptions
     with pytest.raises(Exception) as index_error:
         np_pos = np.array([[1, 2, 2], [2, 2, 1]])
@@ -600,3 +788,43 @@ def test_add_cloud_filtering_msk():
         str(index_error.value) == "Point at location (11,2) is not "
         "accessible in an image of size (5,10)"
     )
+
+
+@pytest.mark.unit_tests
+def test_voxel_decimation():
+    """
+    Create fake cloud and test voxel_decimation function
+    """
+    cloud = pandas.DataFrame(
+        {
+            cst.POINTS_CLOUD_VALID_DATA: np.array([1, 1, 1, 0, 1], np.uint8),
+            cst.X: [0.1, 0.3, 0.2, 0.2, 2.5],
+            cst.Y: [0.1, 0.1, 0.4, 0.2, 0.5],
+            cst.Z: [10.0, 10.2, 10.4, 10.2, 10.0],
+            cst.POINTS_CLOUD_MSK: np.array([0, 0, 0, 0, 3], np.uint16),
+            cst.POINTS_CLOUD_CLR_KEY_ROOT + "0": [10.0, 20.0, 60.0, 0.0, 5.0],
+            cst.POINTS_CLOUD_IDX_IM_EPI: np.array([0, 1, 1, 1, 0], np.int32),
+        }
+    )
+
+    decimated = points_cloud.voxel_decimation(cloud, 1.0)
+
+    # the first three points are merged, the invalid one is not
+    assert list(decimated.columns) == list(cloud.columns) + [
+        cst.POINTS_CLOUD_WEIGHT
+    ]
+    assert len(decimated) == 3
+    merged = decimated.loc[decimated[cst.POINTS_CLOUD_WEIGHT] == 3].iloc[0]
+    assert merged[cst.X] == pytest.approx(0.2)
+    assert merged[cst.Z] == pytest.approx(10.2)
+    assert merged[cst.POINTS_CLOUD_CLR_KEY_ROOT + "0"] == pytest.approx(30.0)
+    assert merged[cst.POINTS_CLOUD_IDX_IM_EPI] == 0
+    assert decimated[cst.POINTS_CLOUD_MSK].dtype == np.uint16
+    assert sorted(decimated[cst.POINTS_CLOUD_WEIGHT]) == [1, 1, 3]
+
+    # decimating again sums the weights
+    decimated = points_cloud.voxel_decimation(decimated, 10.0)
+    assert sorted(decimated[cst.POINTS_CLOUD_WEIGHT]) == [1, 1, 3]
+    decimated[cst.POINTS_CLOUD_MSK] = np.uint16(0)
+    decimated = points_cloud.voxel_decimation(decimated, 10.0)
+    assert sorted(decimated[cst.POINTS_CLOUD_WEIGHT]) == [1, 4]
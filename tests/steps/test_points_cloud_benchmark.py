@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Benchmark module for cars/steps/points_cloud.py:
+times the statistical outliers detection on synthetic points clouds,
+queried at once in a single thread or by chunks with several threads.
+
+The benchmarks can be run with pytest (benchmark_tests marker) or as a
+script to compare releases on a set of configurations:
+python -m tests.steps.test_points_cloud_benchmark --help
+"""
+
+# Standard imports
+import itertools
+import logging
+import math
+from typing import Dict, List
+
+# Third party imports
+import pytest
+
+# CARS imports
+from cars.core import constants as cst
+from cars.steps import points_cloud
+
+# CARS Tests imports
+from ..helpers import (
+    format_benchmark,
+    generate_synthetic_cloud,
+    get_benchmark_parser,
+    measure,
+    report_benchmarks,
+)
+
+# Columns of the printed benchmark tables
+STATISTICAL_FILTER_BENCHMARK_COLUMNS = [
+    ("time_s", "time (s)", 12, ".4f"),
+    ("points_per_s", "points/s", 16, ".4g"),
+    ("speedup", "speedup", 10, ".2f"),
+    ("peak_memory_mb", "peak mem (MB)", 16, ".2f"),
+]
+
+
+def run_statistical_filter_benchmark(
+    nb_points: int = 100000,
+    density: float = 4.0,
+    k: int = 50,
+    nb_threads_list: List[int] = (1, -1),
+    chunk_size: int = points_cloud.STATISTICAL_FILTER_CHUNK_SIZE,
+    nb_repeats: int = 1,
+) -> Dict:
+    """
+    Benchmark the statistical outliers detection on a synthetic cloud:
+    the whole cloud queried at once in a single thread (reference)
+    and the chunked queries with each number of threads
+
+    :param nb_points: number of points of the cloud
+    :param density: number of points per square cloud CRS unit
+    :param k: number of neighbors of the filter
+    :param nb_threads_list: numbers of threads of the chunked runs
+        (-1 uses all the threads)
+    :param chunk_size: number of points queried at once in the chunked runs
+    :param nb_repeats: number of timed runs of each configuration
+    :return: the benchmark configuration and the results of each run
+        (time in seconds, points/s throughput, speedup against the reference
+        and memory peak in MB)
+    """
+    cloud = generate_synthetic_cloud(nb_points, density, nb_bands=0)
+    cloud_xyz = cloud.loc[:, [cst.X, cst.Y, cst.Z]].values
+
+    runs = {"reference": (None, None)}
+    for nb_threads in nb_threads_list:
+        runs["chunked_{}_threads".format(nb_threads)] = (
+            chunk_size,
+            nb_threads,
+        )
+
+    stages = {}
+    reference_result = None
+    for name, (run_chunk_size, nb_threads) in runs.items():
+        result, elapsed, peak = measure(
+            points_cloud.detect_statistical_outliers,
+            cloud_xyz,
+            k,
+            3.0,
+            chunk_size=run_chunk_size,
+            nb_threads=nb_threads,
+            nb_repeats=nb_repeats,
+        )
+        if reference_result is None:
+            reference_result, reference_time = result, elapsed
+        stages[name] = {
+            "time_s": elapsed,
+            "points_per_s": nb_points / elapsed if elapsed > 0 else math.inf,
+            "speedup": reference_time / elapsed if elapsed > 0 else math.inf,
+            "peak_memory_mb": peak,
+            "same_result": result == reference_result,
+        }
+
+    return {
+        "configuration": {
+            "nb_points": nb_points,
+            "density": density,
+            "k": k,
+            "chunk_size": chunk_size,
+        },
+        "stages": stages,
+    }
+
+
+@pytest.mark.benchmark_tests
+@pytest.mark.parametrize("nb_points,k", [(50000, 10), (50000, 50)])
+def test_statistical_filter_benchmark(nb_points, k):
+    """
+    Run the statistical filter benchmark on small synthetic clouds
+    """
+    benchmark = run_statistical_filter_benchmark(
+        nb_points, k=k, chunk_size=10000
+    )
+    logging.info(
+        format_benchmark(benchmark, STATISTICAL_FILTER_BENCHMARK_COLUMNS)
+    )
+
+    assert set(benchmark["stages"]) == {
+        "reference",
+        "chunked_1_threads",
+        "chunked_-1_threads",
+    }
+    for results in benchmark["stages"].values():
+        assert results["same_result"]
+        assert results["time_s"] >= 0
+        assert results["peak_memory_mb"] >= 0
+
+
+def main(args_list: List[str] = None):
+    """
+    Run the statistical filter benchmarks on all the combinations
+    of the command line configurations
+    """
+    parser = get_benchmark_parser(
+        "Statistical outliers filter benchmarks on synthetic points clouds"
+    )
+    parser.add_argument("--k", type=int, nargs="+", default=[50])
+    parser.add_argument(
+        "--nb_threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, -1],
+        help="numbers of threads of the chunked runs (-1 for all)",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=points_cloud.STATISTICAL_FILTER_CHUNK_SIZE,
+    )
+    args = parser.parse_args(args_list)
+
+    report_benchmarks(
+        (
+            run_statistical_filter_benchmark(
+                nb_points,
+                density,
+                k,
+                args.nb_threads,
+                args.chunk_size,
+                args.repeats,
+            )
+            for nb_points, density, k in itertools.product(
+                args.nb_points, args.density, args.k
+            )
+        ),
+        STATISTICAL_FILTER_BENCHMARK_COLUMNS,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,8 @@ TODO: refactor with code source
 from __future__ import absolute_import
 
 import logging
+import os
+import tempfile
 
 # Third party imports
 import numpy as np
@@ -36,10 +38,14 @@ import xarray as xr
 
 # CARS imports
 from cars.core import constants as cst
-from cars.steps import rasterization
+from cars.steps import points_cloud, rasterization
 
 # CARS Tests imports
-from ..helpers import absolute_data_path, assert_same_datasets
+from ..helpers import (
+    absolute_data_path,
+    assert_same_datasets,
+    temporary_dir,
+)
 
 
 @pytest.mark.unit_tests
@@ -290,6 +296,507 @@ def test_simple_rasterization_multiple_datasets():
     assert_same_datasets(raster, raster_ref, atol=1.0e-10, rtol=1.0e-10)
 
 
+@pytest.mark.unit_tests
+def test_grid_bins_neighbors_search():
+    """
+    Test that the grid bins neighbors search finds the same neighbors
+    as the kd-tree one, and that rasterize gives the same results with both
+    """
+    worker_logger = logging.getLogger("distributed.worker")
+
+    cloud_xr = xr.open_dataset(
+        absolute_data_path(
+            "input/rasterization_input/ref_single_cloud_in_df.nc"
+        )
+    )
+    cloud_df = cloud_xr.to_dataframe()
+
+    resolution = 0.5
+    radius = 2
+    xstart, ystart, xsize, ysize = rasterization.compute_xy_starts_and_sizes(
+        resolution, cloud_df
+    )
+    # crop the grid to have points outside of it
+    xstart += 5 * resolution
+    xsize -= 10
+    grid_points = rasterization.compute_grid_points(
+        xstart, ystart, xsize, ysize, resolution
+    )
+
+    ref_id, ref_start, ref_count = rasterization.get_flatten_neighbors(
+        grid_points, cloud_df, radius, resolution, worker_logger
+    )
+    (
+        bins_id,
+        bins_start,
+        bins_count,
+    ) = rasterization.get_flatten_neighbors_from_grid_bins(
+        grid_points,
+        cloud_df,
+        xstart,
+        ystart,
+        xsize,
+        ysize,
+        radius,
+        resolution,
+        worker_logger,
+    )
+
+    np.testing.assert_array_equal(bins_count, ref_count)
+    np.testing.assert_array_equal(bins_start, ref_start)
+    for start, count in zip(ref_start, ref_count):
+        np.testing.assert_array_equal(
+            np.sort(bins_id[start : start + count]),
+            np.sort(ref_id[start : start + count]),
+        )
+
+    raster_kdtree = rasterization.rasterize(
+        cloud_df, resolution, 32630, xstart, ystart, xsize, ysize, 0.3, radius
+    )
+    raster_bins = rasterization.rasterize(
+        cloud_df,
+        resolution,
+        32630,
+        xstart,
+        ystart,
+        xsize,
+        ysize,
+        0.3,
+        radius,
+        neighbors_search=rasterization.GRID_BINS_NEIGHBORS_SEARCH,
+    )
+    assert_same_datasets(raster_bins, raster_kdtree, atol=1.0e-10, rtol=1.0e-7)
+
+
+@pytest.mark.unit_tests
+def test_multi_threaded_interpolation():
+    """
+    Test that the multi-threaded interpolation kernels give
+    the same results as the serial ones
+    """
+    cloud_xr = xr.open_dataset(
+        absolute_data_path(
+            "input/rasterization_input/ref_single_cloud_in_df.nc"
+        )
+    )
+    cloud_df = cloud_xr.to_dataframe()
+
+    # add a mask layer with several classes
+    cloud_df[cst.POINTS_CLOUD_MSK] = np.arange(cloud_df.shape[0]) % 3
+
+    resolution = 0.5
+    xstart, ystart, xsize, ysize = rasterization.compute_xy_starts_and_sizes(
+        resolution, cloud_df
+    )
+
+    raster_serial = rasterization.rasterize(
+        cloud_df, resolution, 32630, xstart, ystart, xsize, ysize, 0.3, 3
+    )
+    raster_parallel = rasterization.rasterize(
+        cloud_df,
+        resolution,
+        32630,
+        xstart,
+        ystart,
+        xsize,
+        ysize,
+        0.3,
+        3,
+        nb_threads=2,
+    )
+    assert_same_datasets(raster_parallel, raster_serial)
+
+    # all the numba threads
+    raster_parallel = rasterization.rasterize(
+        cloud_df,
+        resolution,
+        32630,
+        xstart,
+        ystart,
+        xsize,
+        ysize,
+        0.3,
+        3,
+        nb_threads=-1,
+    )
+    assert_same_datasets(raster_parallel, raster_serial)
+
+
+@pytest.mark.unit_tests
+def test_accumulator_mode_rasterization():
+    """
+    Test that the accumulator mode gives the same results
+    as the neighbors lists one, with several points chunks
+    """
+    worker_logger = logging.getLogger("distributed.worker")
+
+    cloud_xr = xr.open_dataset(
+        absolute_data_path(
+            "input/rasterization_input/ref_single_cloud_in_df.nc"
+        )
+    )
+    cloud_df = cloud_xr.to_dataframe()
+
+    # add a mask layer with several classes and some invalid points
+    cloud_df[cst.POINTS_CLOUD_MSK] = np.arange(cloud_df.shape[0]) % 3
+    cloud_df.loc[cloud_df.index[::7], cst.POINTS_CLOUD_VALID_DATA] = 0
+
+    resolution = 0.5
+    radius = 3
+    sigma = 0.3
+    msk_no_data = 65535
+    xstart, ystart, xsize, ysize = rasterization.compute_xy_starts_and_sizes(
+        resolution, cloud_df
+    )
+    data_valid = cloud_df[cst.POINTS_CLOUD_VALID_DATA].values
+
+    ref_outputs = rasterization.compute_vector_raster_and_stats(
+        cloud_df,
+        data_valid,
+        xstart,
+        ystart,
+        xsize,
+        ysize,
+        resolution,
+        sigma,
+        radius,
+        msk_no_data,
+        worker_logger,
+        None,
+    )
+    acc_outputs = (
+        rasterization.compute_vector_raster_and_stats_with_accumulators(
+            cloud_df,
+            data_valid,
+            xstart,
+            ystart,
+            xsize,
+            ysize,
+            resolution,
+            sigma,
+            radius,
+            msk_no_data,
+            worker_logger,
+            points_chunk_size=1000,
+        )
+    )
+
+    # out, mean, stdev, n_pts, n_in_cell, msk
+    for acc_output, ref_output in zip(acc_outputs, ref_outputs):
+        assert acc_output.shape == ref_output.shape
+        assert acc_output.dtype == ref_output.dtype
+        np.testing.assert_allclose(acc_output, ref_output, rtol=1e-5, atol=1e-4)
+
+
+@pytest.mark.unit_tests
+def test_reduced_precision_rasterization():
+    """
+    Test that the reduced precision mode (float32 cloud with coordinates
+    as offsets from an origin) gives the same raster as the full precision
+    one from test cloud cloud1_ref_epsg_32630.nc, with and without
+    xstart, ystart, xsize, ysize values
+    """
+    cloud = xr.open_dataset(
+        absolute_data_path("input/rasterization_input/cloud1_ref_epsg_32630.nc")
+    )
+    color = xr.open_dataset(
+        absolute_data_path("input/intermediate_results/data1_ref_clr.nc")
+    )
+    resolution = 0.5
+
+    for roi in [(1154790, 4927552, 114, 112), (None, None, None, None)]:
+        rasters = []
+        for reduced_precision in [False, True]:
+            raster, filtered_cloud = rasterization.simple_rasterization_dataset(
+                [cloud],
+                resolution,
+                32630,
+                [color],
+                *roi,
+                0.3,
+                3,
+                dump_filter_cloud=True,
+                reduced_precision=reduced_precision,
+            )
+            rasters.append(raster)
+
+        # the coordinates are stored relatively to the origin in float32
+        assert filtered_cloud[cst.X].dtype == np.float32
+        x_origin, y_origin, _ = filtered_cloud.attrs[cst.POINTS_CLOUD_ORIGIN]
+        assert 1154000 < x_origin < 1156000
+        assert 4926000 < y_origin < 4928000
+
+        assert_same_datasets(rasters[1], rasters[0], atol=1.0e-3, rtol=1.0e-6)
+
+
+@pytest.mark.unit_tests
+def test_rasterization_output_layers():
+    """
+    Test that only the requested output layers are computed,
+    with the same values as when all the layers are computed
+    """
+    cloud_xr = xr.open_dataset(
+        absolute_data_path(
+            "input/rasterization_input/ref_single_cloud_in_df.nc"
+        )
+    )
+    cloud_df = cloud_xr.to_dataframe()
+    cloud_df[cst.POINTS_CLOUD_MSK] = np.arange(cloud_df.shape[0]) % 3
+
+    resolution = 0.5
+    xstart, ystart, xsize, ysize = rasterization.compute_xy_starts_and_sizes(
+        resolution, cloud_df
+    )
+    raster_args = (cloud_df, resolution, 32630, xstart, ystart, xsize, ysize)
+
+    raster_ref = rasterization.rasterize(*raster_args, 0.3, 3)
+
+    for accumulator_mode in [False, True]:
+        raster = rasterization.rasterize(
+            *raster_args,
+            0.3,
+            3,
+            accumulator_mode=accumulator_mode,
+            output_layers=[
+                rasterization.DSM_LAYER,
+                rasterization.STD_LAYER,
+                rasterization.PTS_IN_CELL_LAYER,
+            ],
+        )
+        assert set(raster.data_vars) == {
+            cst.RASTER_HGT,
+            cst.RASTER_HGT_STD_DEV,
+            cst.RASTER_NB_PTS_IN_CELL,
+        }
+        for var in raster.data_vars:
+            np.testing.assert_allclose(
+                raster[var].values, raster_ref[var].values, rtol=1e-5, atol=1e-4
+            )
+
+
+@pytest.mark.unit_tests
+def test_create_raster_dataset_without_copy():
+    """
+    Test that the raster dataset wraps the rasterization layers
+    without copying them
+    """
+    x_size, y_size = 4, 3
+    raster = np.full((4, y_size, x_size), np.nan, dtype=np.float32)
+    raster[:, 1, 2] = [10, 1, 2, 3]
+    mean = np.ones((4, y_size, x_size), dtype=np.float32)
+    stdev = np.zeros((4, y_size, x_size), dtype=np.float32)
+    n_pts = np.ones((y_size, x_size), dtype=np.uint16)
+    msk = np.zeros((y_size, x_size), dtype=np.uint16)
+
+    raster_out = rasterization.create_raster_dataset(
+        raster,
+        0,
+        10,
+        x_size,
+        y_size,
+        0.5,
+        -32768,
+        0,
+        32630,
+        mean,
+        stdev,
+        n_pts,
+        None,
+        msk,
+    )
+
+    assert raster_out[cst.RASTER_HGT].values[1, 2] == 10
+    assert raster_out[cst.RASTER_HGT].values[0, 0] == -32768
+    np.testing.assert_array_equal(
+        raster_out[cst.RASTER_COLOR_IMG].values[:, 1, 2], [1, 2, 3]
+    )
+    assert np.all(raster_out[cst.RASTER_COLOR_IMG].values[:, 0, 0] == 0)
+    assert cst.RASTER_NB_PTS_IN_CELL not in raster_out
+
+    for var, layer in [
+        (cst.RASTER_HGT, raster),
+        (cst.RASTER_COLOR_IMG, raster),
+        (cst.RASTER_HGT_MEAN, mean),
+        ("{}{}".format(cst.RASTER_BAND_STD_DEV, 3), stdev),
+        (cst.RASTER_NB_PTS, n_pts),
+        (cst.RASTER_MSK, msk),
+    ]:
+        assert np.shares_memory(raster_out[var].values, layer)
+
+
+@pytest.mark.unit_tests
+def test_rasterization_neighbors_cache(monkeypatch):
+    """
+    Test that the neighbors saved in the cache directory are reloaded
+    when the same cloud is rasterized with another sigma
+    and searched again when the radius changes
+    """
+    cloud_xr = xr.open_dataset(
+        absolute_data_path(
+            "input/rasterization_input/ref_single_cloud_in_df.nc"
+        )
+    )
+    cloud_df = cloud_xr.to_dataframe()
+
+    resolution = 0.5
+    xstart, ystart, xsize, ysize = rasterization.compute_xy_starts_and_sizes(
+        resolution, cloud_df
+    )
+    raster_args = (cloud_df, resolution, 32630, xstart, ystart, xsize, ysize)
+
+    with tempfile.TemporaryDirectory(dir=temporary_dir()) as directory:
+        cache_dir = os.path.join(directory, "neighbors")
+        raster = rasterization.rasterize(
+            *raster_args, 0.3, 3, neighbors_cache_dir=cache_dir
+        )
+        assert_same_datasets(
+            raster, rasterization.rasterize(*raster_args, 0.3, 3)
+        )
+        assert len(os.listdir(cache_dir)) == 1
+
+        # the neighbors are reloaded: the search must not be called
+        search_func = rasterization.search_flatten_neighbors
+
+        def no_search(*args, **kwargs):  # pylint: disable=unused-argument
+            raise AssertionError("unexpected neighbors search")
+
+        monkeypatch.setattr(
+            rasterization, "search_flatten_neighbors", no_search
+        )
+        raster = rasterization.rasterize(
+            *raster_args, 0.6, 3, neighbors_cache_dir=cache_dir
+        )
+        monkeypatch.setattr(
+            rasterization, "search_flatten_neighbors", search_func
+        )
+        assert_same_datasets(
+            raster, rasterization.rasterize(*raster_args, 0.6, 3)
+        )
+
+        # another radius gives another cache file
+        rasterization.rasterize(
+            *raster_args, 0.3, 2, neighbors_cache_dir=cache_dir
+        )
+        assert len(os.listdir(cache_dir)) == 2
+
+
+@pytest.mark.unit_tests
+def test_weighted_points_rasterization():
+    """
+    Test that the points of a decimated cloud are rasterized as the
+    points they represent: a cloud with each point repeated 3 times gives
+    the same rasters as its decimation in 3 points weighted voxels,
+    with the neighbors lists and the accumulator modes
+    """
+    worker_logger = logging.getLogger("distributed.worker")
+
+    cloud_xr = xr.open_dataset(
+        absolute_data_path(
+            "input/rasterization_input/ref_single_cloud_in_df.nc"
+        )
+    )
+    cloud_df = cloud_xr.to_dataframe().reset_index(drop=True)
+    repeated_cloud = cloud_df.loc[np.repeat(cloud_df.index, 3)]
+    repeated_cloud = repeated_cloud.reset_index(drop=True)
+
+    decimated_cloud = points_cloud.voxel_decimation(repeated_cloud, 1e-6)
+    assert len(decimated_cloud) == len(cloud_df)
+    assert np.all(decimated_cloud[cst.POINTS_CLOUD_WEIGHT] == 3)
+
+    resolution = 0.5
+    xstart, ystart, xsize, ysize = rasterization.compute_xy_starts_and_sizes(
+        resolution, cloud_df
+    )
+    for raster_func, raster_args in [
+        (rasterization.compute_vector_raster_and_stats, (None,)),
+        (rasterization.compute_vector_raster_and_stats_with_accumulators, ()),
+    ]:
+        outputs = [
+            raster_func(
+                cloud,
+                cloud[cst.POINTS_CLOUD_VALID_DATA].values,
+                xstart,
+                ystart,
+                xsize,
+                ysize,
+                resolution,
+                0.3,
+                3,
+                65535,
+                worker_logger,
+                *raster_args,
+            )
+            for cloud in [repeated_cloud, decimated_cloud]
+        ]
+
+        # out, mean, stdev, n_pts, n_in_cell, msk
+        for decimated_output, ref_output in zip(outputs[1], outputs[0]):
+            if ref_output is None:
+                assert decimated_output is None
+                continue
+            assert decimated_output.dtype == ref_output.dtype
+            np.testing.assert_allclose(
+                decimated_output, ref_output, rtol=1e-5, atol=1e-4
+            )
+
+
+@pytest.mark.unit_tests
+def test_filtered_cloud_decimation():
+    """
+    Test that the voxel decimation does not remove dense surfaces with the
+    small components filter: a 400 points cluster (with one isolated point)
+    merged in a few voxels is kept, as without decimation
+    """
+    rows, cols = np.mgrid[0:20, 0:20].astype(np.float64)
+    x_coord = 1000 + cols * 0.02
+    y_coord = 2000 + rows * 0.02
+    z_coord = 100 + rows * 0.01
+    x_coord[0, 0] += 50
+
+    cloud = xr.Dataset(
+        {
+            cst.X: ([cst.ROW, cst.COL], x_coord),
+            cst.Y: ([cst.ROW, cst.COL], y_coord),
+            cst.Z: ([cst.ROW, cst.COL], z_coord),
+            cst.POINTS_CLOUD_CORR_MSK: (
+                [cst.ROW, cst.COL],
+                np.full((20, 20), 255, dtype=np.uint8),
+            ),
+        },
+        coords={cst.ROW: np.arange(20), cst.COL: np.arange(20)},
+    )
+    cloud.attrs[cst.EPSG] = 32630
+
+    small_cpn_filter_params = points_cloud.SmallComponentsFilterParams(
+        0, 0.5, 50, None, False, 255, points_cloud.RADIUS_CONNECTIVITY
+    )
+
+    filtered_clouds = []
+    for decimation_voxel_size in [None, 0.25]:
+        raster, filtered_cloud = rasterization.simple_rasterization_dataset(
+            [cloud],
+            0.5,
+            32630,
+            None,
+            None,
+            None,
+            None,
+            None,
+            0.3,
+            1,
+            small_cpn_filter_params=small_cpn_filter_params,
+            dump_filter_cloud=True,
+            decimation_voxel_size=decimation_voxel_size,
+        )
+        assert np.any(raster[cst.RASTER_HGT].values != -32768)
+        filtered_clouds.append(filtered_cloud)
+
+    # only the isolated point is removed
+    assert len(filtered_clouds[0]) == 399
+    assert len(filtered_clouds[1]) < 399
+    assert filtered_clouds[1][cst.POINTS_CLOUD_WEIGHT].sum() == 399
+
+
 # Mask interpolation tests
 
 
@@ -700,3 +1207,80 @@ def test_mask_interp_case5(
     res = res[::-1, :]
 
     assert np.allclose(msk, res)
+
+
+@pytest.mark.unit_tests
+def test_mask_interp_case6(
+    mask_interp_inputs,
+):  # pylint: disable=redefined-outer-name
+    """
+    case 6 - several classes aiming the same terrain cells
+    (one majority class, one minority class and one equality)
+    """
+    worker_logger = logging.getLogger("distributed.worker")
+
+    # read fixture inputs and set parameters
+    row = mask_interp_inputs[cst.ROW]
+    col = mask_interp_inputs[cst.COL]
+    resolution = mask_interp_inputs[cst.RESOLUTION]
+    cloud = mask_interp_inputs["cloud"]
+    msk = mask_interp_inputs["msk"]
+    grid_points = mask_interp_inputs["grid_points"]
+    data_valid = mask_interp_inputs[cst.POINTS_CLOUD_VALID_DATA]
+    radius = 0
+    sigma = 1
+    undefined_val = 254
+    nodata_val = 255
+
+    # (x, y, msk) of the additional points:
+    # - one farther point of class 50 in the (1, 1) cell: 100 is kept
+    # - two points of class 50 in the (2, 2) cell: 50 wins
+    # - one point of class 50 on the (3, 3) point: undefined value
+    cloud_case6 = np.array(
+        [
+            [1.1, 1.0, 50],
+            [1.9, 2.0, 50],
+            [2.1, 2.0, 50],
+            [3.0, 3.0, 50],
+        ],
+        dtype=np.float64,
+    )
+    cloud_case6 = np.concatenate((cloud, cloud_case6), axis=0)
+    data_valid_case6 = np.concatenate(
+        (data_valid, np.ones(4, dtype=bool)), axis=0
+    )
+
+    ref_msk = np.copy(msk)
+    ref_msk[2, 2] = 50
+    ref_msk[3, 3] = undefined_val
+
+    # create panda dataframe and search for neighbors
+    cloud_pd_case6 = pandas.DataFrame(
+        cloud_case6, columns=[cst.X, cst.Y, cst.POINTS_CLOUD_MSK]
+    )
+
+    neighbors_id, start_ids, n_count = rasterization.get_flatten_neighbors(
+        grid_points, cloud_pd_case6, radius, resolution, worker_logger
+    )
+
+    # test mask_interp function and its multi-threaded version
+    for mask_interp_func in [
+        rasterization.mask_interp,
+        rasterization.mask_interp_parallel,
+    ]:
+        res = mask_interp_func(
+            cloud_case6,
+            data_valid_case6,
+            neighbors_id,
+            start_ids,
+            n_count,
+            grid_points,
+            sigma,
+            nodata_val,
+            undefined_val,
+        )
+
+        res = res.reshape((row, col))
+        res = res[::-1, :]
+
+        assert np.allclose(ref_msk, res)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# coding: utf8
+#
+# Copyright (c) 2020 Centre National d'Etudes Spatiales (CNES).
+#
+# This file is part of CARS
+# (see https://github.com/CNES/cars).
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Benchmark module for cars/steps/rasterization.py:
+times each rasterization stage on synthetic points clouds.
+
+The benchmarks can be run with pytest (benchmark_tests marker) or as a
+script to compare releases on a set of configurations:
+python -m tests.steps.test_rasterization_benchmark --help
+"""
+
+# Standard imports
+import itertools
+import logging
+import math
+from typing import Dict, List
+
+# Third party imports
+import pytest
+from scipy.spatial import cKDTree  # pylint: disable=no-name-in-module
+
+# CARS imports
+from cars.core import constants as cst
+from cars.steps import rasterization
+
+# CARS Tests imports
+from ..helpers import (
+    format_benchmark,
+    generate_synthetic_cloud,
+    get_benchmark_parser,
+    measure,
+    report_benchmarks,
+)
+
+# Columns of the printed benchmark tables
+RASTERIZATION_BENCHMARK_COLUMNS = [
+    ("time_s", "time (s)", 12, ".4f"),
+    ("points_per_s", "points/s", 16, ".4g"),
+    ("cells_per_s", "cells/s", 16, ".4g"),
+    ("peak_memory_mb", "peak mem (MB)", 16, ".2f"),
+]
+
+
+def run_rasterization_benchmark(
+    nb_points: int = 100000,
+    density: float = 4.0,
+    radius: int = 1,
+    nb_bands: int = 3,
+    with_mask: bool = False,
+    resolution: float = 0.5,
+    nb_repeats: int = 1,
+) -> Dict:
+    """
+    Benchmark the rasterization stages on a synthetic cloud
+
+    :param nb_points: number of points of the cloud
+    :param density: number of points per square cloud CRS unit
+    :param radius: rasterization radius
+    :param nb_bands: number of color bands
+    :param with_mask: add a mask to the cloud
+    :param resolution: rasterization resolution
+    :param nb_repeats: number of timed runs of each stage
+    :return: the benchmark configuration and the results of each stage
+        (time in seconds, points/s and cells/s throughputs
+        and memory peak in MB)
+    """
+    worker_logger = logging.getLogger("distributed.worker")
+    cloud = generate_synthetic_cloud(nb_points, density, nb_bands, with_mask)
+    data_valid = cloud[cst.POINTS_CLOUD_VALID_DATA].values.astype(bool)
+    sigma = resolution
+
+    (
+        x_start,
+        y_start,
+        x_size,
+        y_size,
+    ) = rasterization.compute_xy_starts_and_sizes(resolution, cloud)
+    nb_cells = x_size * y_size
+    stages = {}
+
+    def add_stage(name, func, *args, **kwargs):
+        """
+        Measure a stage and store its results
+        """
+        result, elapsed, peak = measure(
+            func, *args, nb_repeats=nb_repeats, **kwargs
+        )
+        stages[name] = {
+            "time_s": elapsed,
+            "points_per_s": nb_points / elapsed if elapsed > 0 else math.inf,
+            "cells_per_s": nb_cells / elapsed if elapsed > 0 else math.inf,
+            "peak_memory_mb": peak,
+        }
+        return result
+
+    grid_points = add_stage(
+        "compute_grid_points",
+        rasterization.compute_grid_points,
+        x_start,
+        y_start,
+        x_size,
+        y_size,
+        resolution,
+    )
+    cloud_tree = add_stage(
+        "cloud_kdtree", cKDTree, cloud.loc[:, [cst.X, cst.Y]].values
+    )
+    add_stage(
+        "search_neighbors",
+        rasterization.search_neighbors,
+        grid_points,
+        cloud_tree,
+        radius,
+        resolution,
+        worker_logger,
+    )
+    neighbors_id, start_ids, n_count = add_stage(
+        "get_flatten_neighbors",
+        rasterization.get_flatten_neighbors,
+        grid_points,
+        cloud,
+        radius,
+        resolution,
+        worker_logger,
+    )
+    out, mean, stdev, n_pts, n_in_cell = add_stage(
+        "gaussian_interp",
+        rasterization.gaussian_interp,
+        cloud.loc[
+            :,
+            rasterization.get_interpolated_bands(
+                cloud, rasterization.OUTPUT_LAYERS
+            ),
+        ].values,
+        data_valid,
+        rasterization.get_points_weights(cloud),
+        neighbors_id,
+        start_ids,
+        n_count,
+        grid_points,
+        resolution,
+        sigma,
+        True,
+        True,
+        True,
+        True,
+    )
+    msk = None
+    if with_mask:
+        msk = add_stage(
+            "mask_interp",
+            rasterization.mask_interp,
+            cloud.loc[:, [cst.X, cst.Y, cst.POINTS_CLOUD_MSK]].values,
+            data_valid,
+            neighbors_id,
+            start_ids,
+            n_count,
+            grid_points,
+            sigma,
+            65535,
+            65535,
+        ).reshape((y_size, x_size))
+
+    shape_out = (y_size, x_size)
+    add_stage(
+        "create_raster_dataset",
+        rasterization.create_raster_dataset,
+        out.reshape((-1,) + shape_out),
+        x_start,
+        y_start,
+        x_size,
+        y_size,
+        resolution,
+        -32768,
+        0,
+        32630,
+        mean.reshape((-1,) + shape_out),
+        stdev.reshape((-1,) + shape_out),
+        n_pts.reshape(shape_out),
+        n_in_cell.reshape(shape_out),
+        msk,
+    )
+    add_stage(
+        "rasterize",
+        rasterization.rasterize,
+        cloud,
+        resolution,
+        32630,
+        x_start,
+        y_start,
+        x_size,
+        y_size,
+        sigma,
+        radius,
+    )
+
+    return {
+        "configuration": {
+            "nb_points": nb_points,
+            "density": density,
+            "radius": radius,
+            "nb_bands": nb_bands,
+            "with_mask": with_mask,
+            "resolution": resolution,
+            "nb_cells": nb_cells,
+        },
+        "stages": stages,
+    }
+
+
+@pytest.mark.benchmark_tests
+@pytest.mark.parametrize(
+    "nb_points,density,radius,nb_bands,with_mask",
+    [(20000, 4.0, 1, 3, False), (20000, 1.0, 2, 1, True)],
+)
+def test_rasterization_benchmark(
+    nb_points, density, radius, nb_bands, with_mask
+):
+    """
+    Run the rasterization benchmark on small synthetic clouds
+    """
+    benchmark = run_rasterization_benchmark(
+        nb_points, density, radius, nb_bands, with_mask
+    )
+    logging.info(format_benchmark(benchmark, RASTERIZATION_BENCHMARK_COLUMNS))
+
+    expected_stages = [
+        "compute_grid_points",
+        "cloud_kdtree",
+        "search_neighbors",
+        "get_flatten_neighbors",
+        "gaussian_interp",
+        "create_raster_dataset",
+        "rasterize",
+    ]
+    if with_mask:
+        expected_stages.append("mask_interp")
+    assert set(benchmark["stages"]) == set(expected_stages)
+    for results in benchmark["stages"].values():
+        assert results["time_s"] >= 0
+        assert results["points_per_s"] > 0
+        assert results["peak_memory_mb"] >= 0
+
+
+def main(args_list: List[str] = None):
+    """
+    Run the rasterization benchmarks on all the combinations
+    of the command line configurations
+    """
+    parser = get_benchmark_parser(
+        "Rasterization benchmarks on synthetic points clouds"
+    )
+    parser.add_argument("--radius", type=int, nargs="+", default=[1])
+    parser.add_argument("--nb_bands", type=int, nargs="+", default=[3])
+    parser.add_argument(
+        "--mask", action="store_true", help="add a mask to the clouds"
+    )
+    parser.add_argument("--resolution", type=float, default=0.5)
+    args = parser.parse_args(args_list)
+
+    # compile or load the numba kernels before timing them
+    run_rasterization_benchmark(1000, 1.0, 1, 1, args.mask, args.resolution)
+
+    report_benchmarks(
+        (
+            run_rasterization_benchmark(
+                nb_points,
+                density,
+                radius,
+                nb_bands,
+                args.mask,
+                args.resolution,
+                args.repeats,
+            )
+            for nb_points, density, radius, nb_bands in itertools.product(
+                args.nb_points, args.density, args.radius, args.nb_bands
+            )
+        ),
+        RASTERIZATION_BENCHMARK_COLUMNS,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()